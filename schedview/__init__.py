@@ -6,6 +6,6 @@ except PackageNotFoundError:
     # package is not installed
     pass
 
-from .dayobs import DayObs
+from .dayobs import DayObs, DayObsArray
 from .sphere import *
 from .util import DECL_COL, POINTING_COL, RA_COL, band_column
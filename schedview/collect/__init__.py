@@ -13,6 +13,7 @@ __all__ = [
     "read_consdb",
     "read_ddf_visits",
     "read_multiple_prenights",
+    "read_multiple_prenights_normalized",
     "read_opsim",
     "read_rewards",
     "read_scheduler",
@@ -59,12 +60,17 @@ from .footprint import get_footprint
 from .metrics import get_metric_path
 
 try:
-    from .multisim import read_multiple_prenights
+    from .multisim import read_multiple_prenights, read_multiple_prenights_normalized
 except ModuleNotFoundError as missing_module:
 
     def read_multiple_prenights(*args, **kwargs):
         assert False, "read_multiple_prenights cannot run without optional module " + missing_module.msg
 
+    def read_multiple_prenights_normalized(*args, **kwargs):
+        assert False, (
+            "read_multiple_prenights_normalized cannot run without optional module " + missing_module.msg
+        )
+
 
 from .nightreport import get_night_narrative, get_night_report
 from .opsim import read_ddf_visits, read_opsim
@@ -1,10 +1,13 @@
+from functools import partial
+
 import numpy as np
+import rubin_scheduler
 from rubin_scheduler.scheduler.utils import CurrentAreaMap
 
+from schedview.sharedcache import get_shared_array
 
-def get_footprint(nside=32):
-    """Get the survey footprint."""
 
+def _compute_footprint(nside):
     # Load up a default footprint from rubin_scheduler
     sky_area_generator = CurrentAreaMap(nside=nside)
     band_footprints, _ = sky_area_generator.return_maps()
@@ -12,3 +15,15 @@ def get_footprint(nside=32):
 
     footprint[footprint == 0] = np.nan
     return footprint
+
+
+def get_footprint(nside=32):
+    """Get the survey footprint.
+
+    The footprint is computed once and shared by all processes that use it,
+    as described in `schedview.sharedcache`, so the array returned is
+    read-only.
+    """
+    return get_shared_array(
+        f"footprint_{rubin_scheduler.__version__}_{nside}", partial(_compute_footprint, nside)
+    )
@@ -15,15 +15,177 @@ except ModuleNotFoundError as missing_module:
     HAVE_SIM_ARCHIVE = False
     MISSING_MODULE_ERROR = missing_module
 
-from schedview import DayObs
+from schedview import DayObs, band_column
 from schedview.collect.visits import NIGHT_STACKERS
+from schedview.compute.multisim import (
+    FIELD_KEY_COLUMN,
+    FIELD_KEY_MAX_NSIDE,
+    SIM_METADATA_COLUMNS,
+    encode_field_key,
+)
 from schedview.compute.visits import add_coords_tuple
 
+SIM_METADATA_RENAMES = {"visitseq_label": "label", "daily_id": "sim_index"}
+# The keys in the prenight index of the simulation metadata columns, plus
+# the daily_id from which the sim_index is taken. The visitseq_uuid is the
+# index of the prenight index, so it is handled separately.
+SIM_METADATA_KEYS = tuple(
+    {column: key for key, column in SIM_METADATA_RENAMES.items()}.get(column, column)
+    for column in SIM_METADATA_COLUMNS
+    if column != "visitseq_uuid"
+) + ("daily_id",)
+
+
+def _make_visit_query(
+    day_obs: DayObs,
+    bands: list[str] | None = None,
+    mjd_range: tuple[float, float] | None = None,
+    target_names: list[str] | None = None,
+) -> str:
+    """Build a `pandas.DataFrame.query` expression selecting visits.
+
+    Parameters
+    ----------
+    day_obs : `DayObs`
+        The night for which to select visits.
+    bands : `list` [`str`] or `None`, optional
+        Bands of visits to select. By default, select all bands.
+    mjd_range : `tuple` [`float`, `float`] or `None`, optional
+        The minimum (inclusive) and maximum (exclusive) values of
+        ``observationStartMJD`` to select. By default, select the whole night.
+    target_names : `list` [`str`] or `None`, optional
+        Values of ``target_name`` to select. By default, select all targets.
+
+    Returns
+    -------
+    query : `str`
+        The query expression.
+    """
+    conditions = [f"floor(observationStartMJD-0.5)=={day_obs.mjd}"]
+    if bands is not None:
+        conditions.append(f"band in {list(bands)!r}")
+    if mjd_range is not None:
+        conditions.append(f"{float(mjd_range[0])!r} <= observationStartMJD < {float(mjd_range[1])!r}")
+    if target_names is not None:
+        conditions.append(f"target_name in {list(target_names)!r}")
+    return " and ".join(f"({condition})" for condition in conditions)
+
+
+def _filter_visits(
+    visits: pd.DataFrame,
+    bands: list[str] | None = None,
+    mjd_range: tuple[float, float] | None = None,
+    target_names: list[str] | None = None,
+) -> pd.DataFrame:
+    """Select a subset of a night's visits.
+
+    The selection is applied after stackers have been run on the full night,
+    because some stackers (e.g. `rubin_sim.maf.stackers.OverheadStacker`)
+    depend on the preceding visit, whether or not it is selected.
+
+    Parameters
+    ----------
+    visits : `pandas.DataFrame`
+        The visits from which to select.
+    bands : `list` [`str`] or `None`, optional
+        Bands of visits to select. By default, select all bands.
+    mjd_range : `tuple` [`float`, `float`] or `None`, optional
+        The minimum (inclusive) and maximum (exclusive) values of
+        ``observationStartMJD`` to select. By default, select all times.
+    target_names : `list` [`str`] or `None`, optional
+        Values of ``target_name`` to select. By default, select all targets.
+
+    Returns
+    -------
+    visits : `pandas.DataFrame`
+        The selected visits.
+    """
+    mask = np.ones(len(visits), dtype=bool)
+    if bands is not None:
+        mask &= visits["band"].isin(list(bands)).values
+    if mjd_range is not None:
+        mjd = visits["observationStartMJD"].values
+        mask &= (mjd >= mjd_range[0]) & (mjd < mjd_range[1])
+    if target_names is not None:
+        mask &= visits["target_name"].isin(list(target_names)).values
+
+    if mask.all():
+        return visits
+    return visits.loc[mask, :].copy()
+
+
+def _add_field_key(visits: pd.DataFrame) -> pd.DataFrame:
+    """Add a `FIELD_KEY_COLUMN` column to a table of visits.
+
+    Parameters
+    ----------
+    visits : `pandas.DataFrame`
+        The visits, with ``fieldRA``, ``fieldDec``, a band column, and
+        ``visitExposureTime``.
+
+    Returns
+    -------
+    visits : `pandas.DataFrame`
+        The visits, with the field key added, if it can be encoded.
+
+    Notes
+    -----
+    The keys are always computed from ``fieldRA`` and ``fieldDec`` with an
+    ``nside`` of `FIELD_KEY_MAX_NSIDE` (never from a ``fieldHpid`` column),
+    which is the form the functions in `schedview.compute.multisim` expect
+    to find in a ``fieldKey`` column.
+    """
+    try:
+        key_columns = ["fieldRA", "fieldDec", band_column(visits), "visitExposureTime"]
+        visits[FIELD_KEY_COLUMN] = encode_field_key(visits.loc[:, key_columns], nside=FIELD_KEY_MAX_NSIDE)
+    except (KeyError, ValueError):
+        # Leave out the key if the visits cannot be encoded,
+        # e.g. because they use bands that cannot be packed into one.
+        pass
+    return visits
+
+
+def _stackers_for_columns(stackers: list, columns: list[str]) -> tuple[list, set[str]]:
+    """Find the stackers and source columns needed for requested columns.
+
+    Parameters
+    ----------
+    stackers : `list`
+        Stackers, in the order in which they would be run.
+    columns : `list` [`str`]
+        The columns requested.
+
+    Returns
+    -------
+    needed_stackers : `list`
+        The stackers that add requested columns, or columns needed by
+        other needed stackers, in their original order.
+    needed_columns : `set` [`str`]
+        The requested columns, plus all columns needed by needed stackers.
+    """
+    needed_columns = set(columns)
+    if "coords" in needed_columns:
+        needed_columns |= {"fieldRA", "fieldDec"}
+    if FIELD_KEY_COLUMN in needed_columns:
+        needed_columns |= {"fieldRA", "fieldDec", "band", "visitExposureTime"}
+
+    needed_stackers = []
+    for stacker in reversed(stackers):
+        if needed_columns & set(stacker.cols_added):
+            needed_stackers.insert(0, stacker)
+            needed_columns |= set(stacker.cols_req)
+
+    return needed_stackers, needed_columns
+
 
 def read_multiple_prenights(
     sim_date: datetime.date | int | str | DayObs,
     day_obs: datetime.date | int | str | DayObs,
     stackers: list | None = NIGHT_STACKERS,
+    columns: list[str] | None = None,
+    bands: list[str] | None = None,
+    mjd_range: tuple[float, float] | None = None,
+    target_names: list[str] | None = None,
     **kwargs: Any,
 ):
     """Read results of multiple simulations for a time period from an archive.
@@ -36,6 +198,30 @@ def read_multiple_prenights(
         The day_obs of the first night for which to load visits.
     stackers : `list` or `None`
         A list of stackers to apply.
+    columns : `list` [`str`] or `None`, optional
+        Visit columns to return (in addition to ``sim_index``). Only the
+        stackers that add requested columns (or columns they depend on)
+        are run, and only requested simulation metadata columns are added.
+        These may include ``fieldKey``, with field keys made by
+        `schedview.compute.multisim.encode_field_key` (with an ``nside`` of
+        ``2**18``), so that the functions in `schedview.compute.multisim`
+        need not compute them again.
+        By default, return all columns except ``fieldKey``.
+    bands : `list` [`str`] or `None`, optional
+        Bands of visits to return. By default, return all bands.
+    mjd_range : `tuple` [`float`, `float`] or `None`, optional
+        The minimum (inclusive) and maximum (exclusive) values of
+        ``observationStartMJD`` of visits to return, within the night.
+        By default, return the whole night.
+    target_names : `list` [`str`] or `None`, optional
+        Values of ``target_name`` of visits to return. By default,
+        return all targets.
+        If no stackers are run, the ``bands``, ``mjd_range``, and
+        ``target_names`` selections are passed to the archive with the
+        selection of the night. Otherwise, they are applied after the
+        stackers have been run on the whole night, so that stackers that
+        depend on preceding visits give the same values as they would for
+        an unfiltered read.
 
     Returns
     -------
@@ -65,7 +251,98 @@ def read_multiple_prenights(
         the same ``visits`` ``pd.DataFrame``. To get the visits from only
         one simulation of interest, the user needs to filter by the desired
         ``sim_index`` value.
+
+    See Also
+    --------
+    read_multiple_prenights_normalized
+        Read the simulation metadata into a separate table rather than
+        repeating it on every visit.
+    """
+    visits, _ = _read_multiple_prenights(
+        sim_date,
+        day_obs,
+        stackers=stackers,
+        columns=columns,
+        bands=bands,
+        mjd_range=mjd_range,
+        target_names=target_names,
+        normalized=False,
+        **kwargs,
+    )
+    return visits
+
+
+def read_multiple_prenights_normalized(
+    sim_date: datetime.date | int | str | DayObs,
+    day_obs: datetime.date | int | str | DayObs,
+    stackers: list | None = NIGHT_STACKERS,
+    columns: list[str] | None = None,
+    bands: list[str] | None = None,
+    mjd_range: tuple[float, float] | None = None,
+    target_names: list[str] | None = None,
+    **kwargs: Any,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Read results of multiple simulations, with the simulation metadata
+    in a separate table.
+
+    Parameters
+    ----------
+    sim_date : `datetime.date` or `int` or `str` or `DayObs`
+        The date (dayobs) on which the simulations to be run.
+    day_obs : `datetime.date` or `int` or `str` or `DayObs`
+        The day_obs of the first night for which to load visits.
+    stackers : `list` or `None`
+        A list of stackers to apply.
+    columns : `list` [`str`] or `None`, optional
+        Visit columns to return (in addition to ``sim_index``), as for
+        `read_multiple_prenights`. By default, return all columns.
+    bands : `list` [`str`] or `None`, optional
+        Bands of visits to return. By default, return all bands.
+    mjd_range : `tuple` [`float`, `float`] or `None`, optional
+        The minimum (inclusive) and maximum (exclusive) values of
+        ``observationStartMJD`` of visits to return, within the night.
+        By default, return the whole night.
+    target_names : `list` [`str`] or `None`, optional
+        Values of ``target_name`` of visits to return. By default,
+        return all targets.
+
+    Returns
+    -------
+    visits : `pandas.DataFrame`
+        Data on the visits, as returned by `read_multiple_prenights`, but
+        with ``sim_index`` as the only column of simulation metadata.
+    simulations : `pandas.DataFrame`
+        A table indexed by ``sim_index``, with the remaining simulation
+        metadata columns (with ``visitseq_label`` renamed ``label``) and
+        ``visitseq_uuid``. Use `schedview.compute.multisim.join_sim_metadata`
+        to add them to the visits when needed.
     """
+    return _read_multiple_prenights(
+        sim_date,
+        day_obs,
+        stackers=stackers,
+        columns=columns,
+        bands=bands,
+        mjd_range=mjd_range,
+        target_names=target_names,
+        normalized=True,
+        **kwargs,
+    )
+
+
+def _read_multiple_prenights(
+    sim_date: datetime.date | int | str | DayObs,
+    day_obs: datetime.date | int | str | DayObs,
+    stackers: list | None = NIGHT_STACKERS,
+    normalized: bool = False,
+    columns: list[str] | None = None,
+    bands: list[str] | None = None,
+    mjd_range: tuple[float, float] | None = None,
+    target_names: list[str] | None = None,
+    **kwargs: Any,
+) -> tuple[pd.DataFrame, pd.DataFrame | None]:
+    # Read visits as described in read_multiple_prenights, returning the
+    # simulations table if normalized, and None otherwise.
     assert HAVE_SIM_ARCHIVE, "Missing optional module " + MISSING_MODULE_ERROR.msg
     sim_date = DayObs.from_date(sim_date)
     assert isinstance(sim_date, DayObs)
@@ -86,29 +363,79 @@ def read_multiple_prenights(
         # make it the index if the corresponding column exists.
         prenights_for_night.set_index(["visitseq_uuid"], inplace=True)
 
-    sim_metadata_keys = [
-        "visitseq_label",
-        "config_url",
-        "scheduler_version",
-        "sim_runner_kwargs",
-        "sim_creation_day_obs",
-        "daily_id",
-        "tags",
-    ]
+    sim_metadata_keys = list(SIM_METADATA_KEYS)
+    if stackers is None:
+        stackers = []
+
+    filter_columns = set()
+    if bands is not None:
+        filter_columns.add("band")
+    if mjd_range is not None:
+        filter_columns.add("observationStartMJD")
+    if target_names is not None:
+        filter_columns.add("target_name")
+
+    if columns is not None:
+        # Metadata columns are added to each visit locally, so skip any
+        # that were not requested. The sim_index is always needed.
+        metadata_columns = {SIM_METADATA_RENAMES.get(key, key): key for key in sim_metadata_keys}
+        sim_metadata_keys = [
+            key for column, key in metadata_columns.items() if column in columns or column == "sim_index"
+        ]
+        visit_columns = [c for c in columns if c not in metadata_columns and c != "visitseq_uuid"]
+        needed_stackers, needed_columns = _stackers_for_columns(stackers, visit_columns)
+        needed_columns |= filter_columns
+
+    # get_visits applies its query before running stackers, and some
+    # stackers (e.g. OverheadStacker) depend on the preceding visit, so
+    # other selections can be included in the query only if no stackers are
+    # run. Otherwise, the query selects the whole night, and the other
+    # selections are applied after the stackers have been run on it.
+    filter_in_query = len(stackers if columns is None else needed_stackers) == 0
+    if filter_in_query:
+        query = _make_visit_query(day_obs, bands=bands, mjd_range=mjd_range, target_names=target_names)
+    else:
+        query = _make_visit_query(day_obs)
 
     visits_list = []
     for visitseq_uuid, prenight_metadata in prenights_for_night.iterrows():
-        these_visits = vseqarchive.get_visits(
-            prenight_metadata["visitseq_url"],
-            query=f"floor(observationStartMJD-0.5)=={day_obs.mjd}",
-            stackers=stackers,
-        )
-        these_visits["visitseq_uuid"] = visitseq_uuid
-        these_visits = add_coords_tuple(these_visits)
+        if columns is None:
+            these_visits = vseqarchive.get_visits(
+                prenight_metadata["visitseq_url"],
+                query=query,
+                stackers=stackers,
+            )
+            if not filter_in_query:
+                these_visits = _filter_visits(these_visits, bands, mjd_range, target_names)
+            these_visits = add_coords_tuple(these_visits)
+        else:
+            # get_visits cannot select columns from the archived file, so
+            # drop unneeded ones immediately, before running only the
+            # stackers that make requested columns.
+            these_visits = vseqarchive.get_visits(prenight_metadata["visitseq_url"], query=query)
+            these_visits = these_visits.loc[:, [c for c in these_visits.columns if c in needed_columns]]
+            if len(needed_stackers) > 0:
+                visit_records = these_visits.to_records(index=False)
+                for stacker in needed_stackers:
+                    visit_records = stacker.run(visit_records)
+                these_visits = pd.DataFrame(visit_records, index=these_visits.index)
+            if not filter_in_query:
+                these_visits = _filter_visits(these_visits, bands, mjd_range, target_names)
+            if "coords" in visit_columns:
+                these_visits = add_coords_tuple(these_visits)
+            if FIELD_KEY_COLUMN in visit_columns:
+                these_visits = _add_field_key(these_visits)
+            these_visits = these_visits.loc[:, [c for c in visit_columns if c in these_visits.columns]]
 
-        for key in sim_metadata_keys:
-            value = prenight_metadata[key] if key in prenight_metadata else None
-            these_visits[key] = [value] * len(these_visits)
+        if normalized:
+            these_visits["daily_id"] = prenight_metadata["daily_id"]
+        else:
+            if columns is None or "visitseq_uuid" in columns:
+                these_visits["visitseq_uuid"] = visitseq_uuid
+
+            for key in sim_metadata_keys:
+                value = prenight_metadata[key] if key in prenight_metadata else None
+                these_visits[key] = [value] * len(these_visits)
 
         visits_list.append(these_visits)
 
@@ -119,10 +446,25 @@ def read_multiple_prenights(
         visits = SchemaConverter().obs2opsim(ObservationArray()[0:0])
         visits["start_timestamp"] = pd.Series(dtype=np.dtype("<M8[ns]"))
         visits["daily_id"] = pd.Series(dtype=np.dtype("int64"))
-        for key in sim_metadata_keys:
-            if key in visits.columns:
-                continue
-            visits[key] = pd.Series()
+        if columns is not None:
+            visits[FIELD_KEY_COLUMN] = pd.Series(dtype=np.dtype("int64"))
+            visits = visits.loc[:, [c for c in visit_columns if c in visits.columns] + ["daily_id"]]
+        if not normalized:
+            for key in sim_metadata_keys:
+                if key in visits.columns:
+                    continue
+                visits[key] = pd.Series()
 
-    visits.rename(columns={"visitseq_label": "label", "daily_id": "sim_index"}, inplace=True)
-    return visits
+    visits.rename(columns=SIM_METADATA_RENAMES, inplace=True)
+
+    if normalized:
+        simulations = (
+            prenights_for_night.reindex(columns=list(SIM_METADATA_KEYS))
+            .rename_axis("visitseq_uuid")
+            .reset_index()
+            .rename(columns=SIM_METADATA_RENAMES)
+            .set_index("sim_index")
+        )
+        return visits, simulations
+
+    return visits, None
@@ -1,8 +1,12 @@
+import hashlib
 import os
 from collections import OrderedDict
+from functools import partial
 
 import pandas as pd
 
+from schedview.sharedcache import get_shared_dataframe
+
 BSC5_URL = "http://tdc-www.harvard.edu/catalogs/bsc5.dat.gz"
 
 
@@ -18,6 +22,11 @@ def load_bright_stars(fname=None):
     -------
     bright_stars : `pandas.DataFrame`
         The catalog of bright stars.
+
+    Notes
+    -----
+    The catalog is read once for each file name, and shared by all
+    processes that use it, as described in `schedview.sharedcache`.
     """
     if fname is None:
         try:
@@ -25,6 +34,11 @@ def load_bright_stars(fname=None):
         except KeyError:
             fname = BSC5_URL
 
+    name = f"bright_stars_{hashlib.sha256(fname.encode('utf-8')).hexdigest()[:16]}"
+    return get_shared_dataframe(name, partial(_read_bright_stars, fname))
+
+
+def _read_bright_stars(fname):
     ybs_columns = OrderedDict(
         (
             ("HR", (0, 4)),
@@ -3,6 +3,9 @@ __all__ = [
     "night_events",
     "compute_sun_moon_positions",
     "LsstCameraFootprintPerimeter",
+    "compute_visit_coverage",
+    "compute_hpix_coverage_map",
+    "compute_body_coords",
     "replay_visits",
     "compute_basis_function_reward_at_time",
     "compute_basis_function_rewards",
@@ -15,32 +18,49 @@ __all__ = [
     "compute_hpix_metric_in_bands",
     "compute_scalar_metric_at_one_mjd",
     "compute_scalar_metric_at_mjds",
+    "compute_scalar_metric_at_sorted_mjds",
     "compute_mixed_scalar_metric",
     "compute_obs_sim_offsets",
     "compute_offset_stats",
     "offsets_of_coord_band",
     "often_repeated_fields",
+    "cluster_pointings",
     "count_visits_by_sim",
     "match_visits_across_sims",
     "compute_matched_visit_delta_statistics",
+    "encode_field_key",
+    "decode_field_key",
+    "normalize_sim_metadata",
+    "join_sim_metadata",
     "munge_sim_archive_metadata",
     "find_nearest_pointing_ids",
+    "ReferencePointingMatcher",
     "combine_completed_with_sims",
+    "combine_completed_with_normalized_sims",
 ]
 
 from .astro import compute_sun_moon_positions, convert_evening_date_to_night_of_survey, night_events
 from .camera import LsstCameraFootprintPerimeter
 from .comparesim import (
+    ReferencePointingMatcher,
+    combine_completed_with_normalized_sims,
     combine_completed_with_sims,
     compute_obs_sim_offsets,
     compute_offset_stats,
     find_nearest_pointing_ids,
     offsets_of_coord_band,
 )
+from .coverage import compute_hpix_coverage_map, compute_visit_coverage
+from .ephemeris import compute_body_coords
 from .multisim import (
+    cluster_pointings,
     compute_matched_visit_delta_statistics,
     count_visits_by_sim,
+    decode_field_key,
+    encode_field_key,
+    join_sim_metadata,
     match_visits_across_sims,
+    normalize_sim_metadata,
     often_repeated_fields,
 )
 from .scheduler import (
@@ -61,6 +81,7 @@ try:
         compute_mixed_scalar_metric,
         compute_scalar_metric_at_mjds,
         compute_scalar_metric_at_one_mjd,
+        compute_scalar_metric_at_sorted_mjds,
     )
 except ModuleNotFoundError as e:
     if not e.args == ("No module named 'rubin_sim'",):
@@ -1,25 +1,136 @@
 import datetime
+import os
 from functools import cache
+from pathlib import Path
 
 import numpy as np
 import pandas as pd
 import pytz
+from astropy.coordinates import EarthLocation
 from astropy.time import Time
 from rubin_scheduler.scheduler.model_observatory import ModelObservatory
 from rubin_scheduler.site_models.almanac import Almanac
 from rubin_scheduler.skybrightness_pre import SkyModelPre
+from rubin_scheduler.utils import Site
 
 from schedview.dayobs import DayObs
+from schedview.sharedcache import get_shared_array
+
+NIGHT_EVENTS_TABLE_VERSION = 1
+NIGHT_EVENTS_DIR_ENV_VAR = "SCHEDVIEW_NIGHT_EVENTS_DIR"
+NIGHT_EVENT_NAMES = (
+    "sunset",
+    "sun_n12_setting",
+    "sun_n18_setting",
+    "sun_n18_rising",
+    "sun_n12_rising",
+    "sunrise",
+    "moonrise",
+    "moonset",
+    "night_middle",
+)
+MJD_UNIX_EPOCH = 40587
+MODEL_SKY_SUMMARY_TABLE_VERSION = 1
+MODEL_SKY_SUMMARY_DIR_ENV_VAR = "SCHEDVIEW_MODEL_SKY_SUMMARY_DIR"
+MODEL_SKY_BANDS = ("u", "g", "r", "i", "z", "y")
+
+# Model sky summary tables loaded in this process, keyed by path.
+_MODEL_SKY_SUMMARY_TABLES: dict[Path, np.ndarray] = {}
 
 
 @cache
-def _compute_all_night_events():
-    # Loading the alamac takes a while, so generate it with a function
-    # that caches the result (using the functools.cache decorator).
-    almanac = Almanac()
-    all_nights_events = pd.DataFrame(almanac.sunsets)
-    all_nights_events["night_middle"] = (all_nights_events["sunrise"] + all_nights_events["sunset"]) / 2
-    return all_nights_events
+def _default_site() -> EarthLocation:
+    # The location ModelObservatory uses, without building one.
+    site = Site("LSST")
+    return EarthLocation(lat=site.latitude, lon=site.longitude, height=site.height)
+
+
+def _night_events_table_path(directory: str | Path) -> Path:
+    return Path(directory).joinpath(f"night_events_v{NIGHT_EVENTS_TABLE_VERSION}.npy")
+
+
+def make_night_events_table() -> np.ndarray:
+    """Compute a table of night events for all nights in the almanac.
+
+    Returns
+    -------
+    night_events_table : `numpy.ndarray`
+        A structured array with one row per night of survey, sorted by night,
+        with the ``night`` of survey, the MJD of each event in
+        `NIGHT_EVENT_NAMES`, and the apparent local sidereal time (in
+        degrees) of each event at the Rubin Observatory (in columns with the
+        event name followed by ``_lst``). Nights without a moon rise or set
+        take the time from the closer of the prior and following nights.
+    """
+    sunsets = Almanac().sunsets
+    num_nights = len(sunsets)
+
+    table = np.zeros(
+        num_nights,
+        dtype=[("night", np.int64)]
+        + [(name, np.float64) for name in NIGHT_EVENT_NAMES]
+        + [(f"{name}_lst", np.float64) for name in NIGHT_EVENT_NAMES],
+    )
+    table["night"] = sunsets["night"]
+    for name in NIGHT_EVENT_NAMES[:-1]:
+        table[name] = sunsets[name]
+    table["night_middle"] = (table["sunrise"] + table["sunset"]) / 2
+
+    # Not all night have both a moon rise and moon set. If a night is missing
+    # one, use the value from the following night or prior night, whichever
+    # is closer to night_middle
+    for name in NIGHT_EVENT_NAMES[:-1]:
+        missing = np.flatnonzero(table[name] <= 0)
+        next_night = np.minimum(missing + 1, num_nights - 1)
+        prior_night = np.maximum(missing - 1, 0)
+        next_dt = np.abs(table[name][next_night] - table["night_middle"][missing])
+        prior_dt = np.abs(table[name][prior_night] - table["night_middle"][missing])
+        table[name][missing] = np.where(next_dt < prior_dt, table[name][next_night], table[name][prior_night])
+
+    # Compute sidereal times for all events at once.
+    event_mjds = np.stack([table[name] for name in NIGHT_EVENT_NAMES], axis=1)
+    valid = np.isfinite(event_mjds)
+    event_lsts = np.full(event_mjds.shape, np.nan)
+    event_times = Time(event_mjds[valid], format="mjd", scale="utc", location=_default_site())
+    event_lsts[valid] = event_times.sidereal_time("apparent").deg
+    for column, name in enumerate(NIGHT_EVENT_NAMES):
+        table[f"{name}_lst"] = event_lsts[:, column]
+
+    return table
+
+
+def write_night_events_table(directory: str | Path) -> Path:
+    """Write the table of night events to a file.
+
+    Parameters
+    ----------
+    directory : `str` or `pathlib.Path`
+        The directory in which to write the table.
+
+    Returns
+    -------
+    path : `pathlib.Path`
+        The path of the file written, whose name includes the version of the
+        table format.
+    """
+    path = _night_events_table_path(directory)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Write to a temporary file and rename it, so that other processes never
+    # see a partially written table.
+    temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(temp_path, "wb") as temp_file:
+        np.save(temp_file, make_night_events_table())
+    os.replace(temp_path, path)
+    return path
+
+
+def _night_events_table() -> np.ndarray:
+    # If a directory for the table is set (for night events in particular,
+    # or for shared arrays in general), generate the table there once, and
+    # memory-map it in every process, otherwise compute it in memory.
+    directory = os.environ.get(NIGHT_EVENTS_DIR_ENV_VAR) or None
+    return get_shared_array(_night_events_table_path(".").stem, make_night_events_table, directory)
 
 
 @cache
@@ -38,14 +149,23 @@ def convert_evening_date_to_night_of_survey(night_date, timezone="Chile/Continen
     night_of_survey : `int`
         The night of survey, starting from 0.
     """
-    sample_time = Time(
+    sample_datetime = (
         pytz.timezone(timezone)
         .localize(datetime.datetime(night_date.year, night_date.month, night_date.day, 23, 59, 59))
         .astimezone(pytz.timezone("UTC"))
     )
-    all_nights_events = _compute_all_night_events()
-    closest_middle_iloc = np.abs(sample_time.mjd - all_nights_events["night_middle"]).argsort()[0]
-    night_of_survey = all_nights_events.iloc[closest_middle_iloc, :]["night"]
+    sample_mjd = sample_datetime.timestamp() / (24 * 60 * 60) + MJD_UNIX_EPOCH
+
+    # Find the night with the closest night_middle.
+    night_middles = _night_events_table()["night_middle"]
+    following_iloc = min(int(np.searchsorted(night_middles, sample_mjd)), len(night_middles) - 1)
+    prior_iloc = max(following_iloc - 1, 0)
+    closest_middle_iloc = (
+        prior_iloc
+        if abs(sample_mjd - night_middles[prior_iloc]) <= abs(night_middles[following_iloc] - sample_mjd)
+        else following_iloc
+    )
+    night_of_survey = int(_night_events_table()["night"][closest_middle_iloc])
     return night_of_survey
 
 
@@ -65,48 +185,43 @@ def night_events(night_date=None, site=None, timezone="Chile/Continental"):
     -------
     events : `pandas.DataFrame`
         A DataFrame of night events.
+
+    Notes
+    -----
+    Events are looked up in a table computed once per process from the
+    `rubin_scheduler` almanac, or, if the ``SCHEDVIEW_NIGHT_EVENTS_DIR`` or
+    ``SCHEDVIEW_SHARED_CACHE_DIR`` environment variable is set, in a table
+    written once in that directory and memory-mapped by every process that
+    uses it.
     """
     if night_date is None:
         night_date = datetime.date.today()
 
-    if site is None:
-        site = ModelObservatory(no_sky=True).location
-
-    all_nights_events = _compute_all_night_events().set_index("night")
+    table = _night_events_table()
     night_of_survey = convert_evening_date_to_night_of_survey(night_date, timezone=timezone)
-    mjds = all_nights_events.loc[night_of_survey]
-
-    # Not all night have both a moon rise and moon set. If a night is missing
-    # one, use the value from the following night or prior night, whichever
-    # is closer to night_middle
-    for event in mjds.index:
-        if mjds[event] <= 0:
-            next_night = night_of_survey + 1
-            prior_night = night_of_survey - 1
-            night_middle = mjds["night_middle"]
-            next_dt = np.abs(all_nights_events.loc[next_night, event] - night_middle)
-            proir_dt = np.abs(all_nights_events.loc[prior_night, event] - night_middle)
-            closest_night = next_night if next_dt < proir_dt else prior_night
-            mjds[event] = all_nights_events.loc[closest_night, event]
-
-    # We need to use masked_invalid before passing mjds to Time
-    # because there are occasional nights where the moon either
-    # doesn't rise or doesn't set.
-    ap_times = Time(np.ma.masked_invalid(mjds), format="mjd", scale="utc", location=site)
+    night_events_row = table[night_of_survey - table["night"][0]]
+    mjds = np.array([night_events_row[name] for name in NIGHT_EVENT_NAMES])
+
+    if site is None or bool(np.all(site == _default_site())):
+        lsts = np.array([night_events_row[f"{name}_lst"] for name in NIGHT_EVENT_NAMES])
+    else:
+        # We need to use masked_invalid before passing mjds to Time
+        # because there are occasional nights where the moon either
+        # doesn't rise or doesn't set.
+        ap_times = Time(np.ma.masked_invalid(mjds), format="mjd", scale="utc", location=site)
+        lsts = np.where(np.isfinite(mjds), ap_times.sidereal_time("apparent").deg, np.nan)
+
+    # If a value is invalid, indicate so by a NaN or NaT
     time_df = pd.DataFrame(
         {
-            "MJD": ap_times.mjd,
-            "LST": ap_times.sidereal_time("apparent").deg,
-            "UTC": pd.to_datetime(ap_times.to_datetime()).tz_localize("UTC"),
+            "MJD": mjds,
+            "LST": lsts,
+            "UTC": pd.to_datetime((mjds - MJD_UNIX_EPOCH) * 24 * 60 * 60, unit="s", utc=True),
         },
-        index=mjds.index,
+        index=pd.Index(NIGHT_EVENT_NAMES, name="event"),
     )
-    # If a value is masked, indicate so by a NaN or NaT
-    time_df.loc[ap_times.mask, "MJD"] = np.nan
-    time_df.loc[ap_times.mask, "UTC"] = np.nan
 
     time_df[timezone] = time_df["UTC"].dt.tz_convert(timezone)
-    time_df.index.name = "event"
 
     return time_df
 
@@ -178,7 +293,223 @@ def compute_sun_moon_positions(observatory: ModelObservatory) -> pd.DataFrame:
     return body_positions
 
 
-def get_median_model_sky(day_obs: DayObs, bands: tuple[str] = ("u", "g", "r", "i", "z", "y")) -> pd.DataFrame:
+def _model_sky_summary_dtype(percentiles: tuple[float, ...] = ()) -> np.dtype:
+    return np.dtype(
+        [("day_obs_mjd", np.int64), ("mjd", np.float64)]
+        + [(name, np.float64) for name in ("sun_alt", "moon_alt", "moon_phase")]
+        + [(band, np.float64) for band in MODEL_SKY_BANDS]
+        + [
+            (_model_sky_percentile_column(band, percentile), np.float64)
+            for band in MODEL_SKY_BANDS
+            for percentile in percentiles
+        ]
+    )
+
+
+def _model_sky_percentile_column(band: str, percentile: float) -> str:
+    return f"{band}_p{percentile:g}"
+
+
+def _model_sky_summary_table_path(directory: str | Path, percentiles: tuple[float, ...] = ()) -> Path:
+    percentile_suffix = "".join(f"_p{percentile:g}" for percentile in percentiles)
+    return Path(directory).joinpath(
+        f"model_sky_summary_v{MODEL_SKY_SUMMARY_TABLE_VERSION}{percentile_suffix}.npy"
+    )
+
+
+def make_model_sky_summary(day_obs: DayObs, percentiles: tuple[float, ...] = ()) -> np.ndarray:
+    """Summarize the pre-computed model sky over the sky for one day_obs.
+
+    Parameters
+    ----------
+    day_obs : `DayObs`
+        The day of observing.
+    percentiles : `tuple` [`float`], optional
+        Percentiles (from 0 to 100) of the sky brightness over the sky to
+        include, in addition to the median, by default none.
+
+    Returns
+    -------
+    model_sky_summary : `numpy.ndarray`
+        A structured array with one row for each time sample of the model
+        sky loaded for ``day_obs``, with the ``day_obs_mjd``, the ``mjd`` of
+        the sample, the ``sun_alt``, ``moon_alt`` (both in degrees) and
+        ``moon_phase``, the median sky brightness over all healpixels in each
+        band (in a column named by the band), and the requested percentiles
+        (in columns named by the band followed by ``_p`` and the percentile,
+        for example ``r_p90``).
+    """
+    sky_model = SkyModelPre(mjd0=day_obs.start.mjd, load_length=1)
+    mjds = sky_model.mjds
+
+    summary = np.zeros(len(mjds), dtype=_model_sky_summary_dtype(percentiles))
+    summary["day_obs_mjd"] = day_obs.mjd
+    summary["mjd"] = mjds
+
+    sun_moon_positions = Almanac().get_sun_moon_positions(mjds)
+    summary["sun_alt"] = np.degrees(sun_moon_positions["sun_alt"])
+    summary["moon_alt"] = np.degrees(sun_moon_positions["moon_alt"])
+    summary["moon_phase"] = sun_moon_positions["moon_phase"]
+
+    for band in MODEL_SKY_BANDS:
+        # Compute the median and all percentiles in one pass over the maps.
+        band_percentiles = np.nanpercentile(np.array(sky_model.sb[band]), (50, *percentiles), axis=1)
+        summary[band] = band_percentiles[0]
+        for percentile, values in zip(percentiles, band_percentiles[1:]):
+            summary[_model_sky_percentile_column(band, percentile)] = values
+
+    return summary
+
+
+def _save_model_sky_summary_table(path: Path, table: np.ndarray) -> None:
+    # Write to a temporary file and rename it, so that other processes never
+    # see a partially written table. If two processes add nights at the same
+    # time, the nights added by one may be lost, and get computed again when
+    # next requested.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(temp_path, "wb") as temp_file:
+        np.save(temp_file, table)
+    os.replace(temp_path, path)
+
+
+def _load_model_sky_summary_table(path: Path, percentiles: tuple[float, ...] = ()) -> np.ndarray:
+    if path.exists():
+        table = np.load(path, mmap_mode="r")
+    else:
+        table = np.zeros(0, dtype=_model_sky_summary_dtype(percentiles))
+    _MODEL_SKY_SUMMARY_TABLES[path] = table
+    return table
+
+
+def _add_to_model_sky_summary_table(path: Path, table: np.ndarray, summaries: list[np.ndarray]) -> np.ndarray:
+    # Keep the table sorted by day_obs_mjd (and the samples within each
+    # day_obs by mjd), so that lookups can use a binary search.
+    table = np.concatenate([np.asarray(table)] + summaries)
+    table = table[np.lexsort((table["mjd"], table["day_obs_mjd"]))]
+    _save_model_sky_summary_table(path, table)
+    return _load_model_sky_summary_table(path)
+
+
+def _day_obs_rows(table: np.ndarray, day_obs_mjd: int) -> slice:
+    first_row, last_row = np.searchsorted(table["day_obs_mjd"], [day_obs_mjd, day_obs_mjd + 1])
+    return slice(int(first_row), int(last_row))
+
+
+def write_model_sky_summary_table(
+    directory: str | Path,
+    first_day_obs: DayObs | None = None,
+    last_day_obs: DayObs | None = None,
+    percentiles: tuple[float, ...] = (),
+) -> Path:
+    """Add summaries of the model sky to the table of them in a directory.
+
+    Parameters
+    ----------
+    directory : `str` or `pathlib.Path`
+        The directory with the table.
+    first_day_obs : `DayObs` or `None`, optional
+        The first day_obs to summarize. By default, the first day_obs covered
+        by the pre-computed model sky.
+    last_day_obs : `DayObs` or `None`, optional
+        The last day_obs to summarize. By default, the last day_obs covered
+        by the pre-computed model sky.
+    percentiles : `tuple` [`float`], optional
+        Percentiles to include, as for `make_model_sky_summary`.
+        Tables with different percentiles are kept in different files.
+
+    Returns
+    -------
+    path : `pathlib.Path`
+        The path of the table, whose name includes the version of the table
+        format and the percentiles.
+
+    Notes
+    -----
+    The table is generated incrementally: only day_obs not already in the
+    table are summarized, so the table can be extended as the pre-computed
+    model sky is extended, or filled in over several runs. Day_obs not
+    covered by the pre-computed model sky are skipped.
+    """
+    path = _model_sky_summary_table_path(directory, percentiles)
+    table = _load_model_sky_summary_table(path, percentiles)
+
+    if first_day_obs is None or last_day_obs is None:
+        sky_model = SkyModelPre(init_load_length=None)
+        if first_day_obs is None:
+            first_day_obs = DayObs.from_time(float(np.min(sky_model.mjd_left)))
+        if last_day_obs is None:
+            last_day_obs = DayObs.from_time(float(np.max(sky_model.mjd_right)))
+
+    summarized_day_obs_mjds = set(np.unique(table["day_obs_mjd"]).tolist())
+    summaries = []
+    for day_obs_mjd in range(first_day_obs.mjd, last_day_obs.mjd + 1):
+        if day_obs_mjd in summarized_day_obs_mjds:
+            continue
+        try:
+            summaries.append(
+                make_model_sky_summary(DayObs.from_date(day_obs_mjd, int_format="mjd"), percentiles)
+            )
+        except ValueError:
+            # The model sky does not cover this day_obs.
+            continue
+
+    if len(summaries) > 0:
+        _add_to_model_sky_summary_table(path, table, summaries)
+
+    return path
+
+
+def get_model_sky_summary(day_obs: DayObs, percentiles: tuple[float, ...] = ()) -> np.ndarray:
+    """Get summaries of the model sky for a day_obs.
+
+    Parameters
+    ----------
+    day_obs : `DayObs`
+        The day of observing.
+    percentiles : `tuple` [`float`], optional
+        Percentiles to include, as for `make_model_sky_summary`.
+
+    Returns
+    -------
+    model_sky_summary : `numpy.ndarray`
+        The summary, as returned by `make_model_sky_summary`.
+
+    Notes
+    -----
+    If the ``SCHEDVIEW_MODEL_SKY_SUMMARY_DIR`` environment variable is set,
+    the summary is looked up in a table in that directory (memory-mapped
+    and shared by every process that uses it), and computed and added to
+    the table if it is not already there. Otherwise, it is computed.
+    """
+    directory = os.environ.get(MODEL_SKY_SUMMARY_DIR_ENV_VAR)
+    if not directory:
+        return make_model_sky_summary(day_obs, percentiles)
+
+    path = _model_sky_summary_table_path(directory, tuple(percentiles))
+    table = _MODEL_SKY_SUMMARY_TABLES.get(path)
+    if table is None:
+        table = _load_model_sky_summary_table(path, percentiles)
+
+    rows = _day_obs_rows(table, day_obs.mjd)
+    if rows.start == rows.stop:
+        # Another process may have added it since the table was loaded.
+        table = _load_model_sky_summary_table(path, percentiles)
+        rows = _day_obs_rows(table, day_obs.mjd)
+
+    if rows.start == rows.stop:
+        summary = make_model_sky_summary(day_obs, percentiles)
+        table = _add_to_model_sky_summary_table(path, table, [summary])
+        rows = _day_obs_rows(table, day_obs.mjd)
+
+    return table[rows]
+
+
+def get_median_model_sky(
+    day_obs: DayObs,
+    bands: tuple[str] = ("u", "g", "r", "i", "z", "y"),
+    percentiles: tuple[float, ...] = (),
+) -> pd.DataFrame:
     """Get model sky and ephemeris values suitable for a timeline plot.
 
     Parameters
@@ -187,20 +518,30 @@ def get_median_model_sky(day_obs: DayObs, bands: tuple[str] = ("u", "g", "r", "i
         The day of observing.
     bands : `tuple`, optional
         Bands to get sky values for, by default ("u", "g", "r", "i", "z", "y")
+    percentiles : `tuple` [`float`], optional
+        Percentiles (from 0 to 100) of the sky brightness over the sky to
+        include, in columns named by the band followed by ``_p`` and the
+        percentile (for example ``r_p90``), by default none.
 
     Returns
     -------
     median_model_sky : `pd.DataFrame`
         A pandas.DataFrame with the median model sky values and sun and moon
         parameters.
-    """
-    sky_model = SkyModelPre(mjd0=day_obs.start.mjd, load_length=1)
-    mjds = sky_model.mjds
 
-    whole_day_obs = pd.DataFrame(Almanac().get_sun_moon_positions(mjds), index=pd.Index(mjds, name="mjd"))
+    Notes
+    -----
+    The values come from `get_model_sky_summary`, so they are read from a
+    table of summaries rather than computed from the full model sky if the
+    ``SCHEDVIEW_MODEL_SKY_SUMMARY_DIR`` environment variable is set.
+    """
+    summary = get_model_sky_summary(day_obs, percentiles)
+    mjds = np.array(summary["mjd"])
 
-    for band in bands:
-        whole_day_obs[band] = np.nanmedian(np.array(sky_model.sb[band]), axis=1)
+    whole_day_obs = pd.DataFrame(
+        {name: np.array(summary[name]) for name in summary.dtype.names[2:]},
+        index=pd.Index(mjds, name="mjd"),
+    )
 
     # Get edges of span over which the sample can be plotted
     sample_mjds = mjds[1:-1]
@@ -219,9 +560,15 @@ def get_median_model_sky(day_obs: DayObs, bands: tuple[str] = ("u", "g", "r", "i
     whole_day_obs.loc[sample_mjds, "time"] = Time(sample_mjds, format="mjd").datetime64
     whole_day_obs.loc[sample_mjds, "end_time"] = Time((sample_mjds + next_mjds) / 2, format="mjd").datetime64
 
-    result_columns = ["time", "begin_time", "end_time"] + list(bands) + ["sun_alt", "moon_alt", "moon_phase"]
+    percentile_columns = [
+        _model_sky_percentile_column(band, percentile) for band in bands for percentile in percentiles
+    ]
+    result_columns = (
+        ["time", "begin_time", "end_time"]
+        + list(bands)
+        + percentile_columns
+        + ["sun_alt", "moon_alt", "moon_phase"]
+    )
 
     night = whole_day_obs.loc[night_mjds, result_columns]
-    night["sun_alt"] = np.degrees(night["sun_alt"])
-    night["moon_alt"] = np.degrees(night["moon_alt"])
     return night
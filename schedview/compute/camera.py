@@ -4,6 +4,8 @@ import pandas as pd
 from astropy.coordinates import SkyCoord
 from numpy.typing import NDArray
 
+from schedview.sphere import offset_sep_bear
+
 
 class LsstCameraFootprintPerimeter(object):
     """Compute vertices surrounding the LSST camera footprint."""
@@ -108,10 +110,53 @@ class LsstCameraFootprintPerimeter(object):
         )
         assert rotation_array.shape == ra.shape
 
-        vertex_ras, vertex_decls = [], []
-        for this_ra, this_decl, this_rotation in zip(ra, decl, rotation_array):
-            this_vertex_ra, this_vertex_decl = self.single_eq_vertices(this_ra, this_decl, this_rotation)
-            vertex_ras.append(this_vertex_ra)
-            vertex_decls.append(this_vertex_decl)
+        vertex_ras, vertex_decls = self.eq_vertices(ra, decl, rotation_array)
+
+        # Callers expect one array of vertices for each pointing, so that
+        # they can be assigned to a column of a DataFrame.
+        return list(vertex_ras), list(vertex_decls)
+
+    def eq_vertices(
+        self,
+        ra: float | NDArray[np.floating] | pd.Series,
+        decl: float | NDArray[np.floating] | pd.Series,
+        rotation: float | NDArray[np.floating] | pd.Series = 0.0,
+    ) -> tuple[NDArray[np.floating], NDArray[np.floating]]:
+        """Compute vertices for many pointings in one vectorized call.
+
+        Parameters
+        ----------
+        ra : `float` or `np.ndarray`
+            The R.A. of pointings (in degrees)
+        decl : `float` or `np.ndarray`
+            The declination of pointings (in degrees)
+        rotation : `float` or `np.ndarray`
+            The camera rotation(s) (in degrees)
+
+        Returns
+        -------
+        ra : `np.ndarray`
+            An array of shape (N, 13), with the R.A. of the vertices of
+            the polygon surrounding the footprint of each of N pointings
+            (degrees, in the range [0, 360)).
+        decl : `np.ndarray`
+            An array of shape (N, 13), with the declinations of the vertices
+            of the polygon surrounding the footprint of each of N pointings
+            (degrees).
+        """
+        center_ra = np.atleast_1d(np.asarray(ra, dtype=float))[:, np.newaxis]
+        center_decl = np.atleast_1d(np.asarray(decl, dtype=float))[:, np.newaxis]
+        center_rotation = np.atleast_1d(np.asarray(rotation, dtype=float))[:, np.newaxis]
+
+        # rotation matches the sense used by
+        # rubin_scheduler.utils.camera_footprint.LsstCameraFootprint
+        vertex_ra, vertex_decl = offset_sep_bear(
+            center_ra,
+            center_decl,
+            self.vertices.r.values[np.newaxis, :],
+            self.vertices.angle.values[np.newaxis, :] + center_rotation,
+            degrees=True,
+        )
+        vertex_ra = vertex_ra % 360.0
 
-        return vertex_ras, vertex_decls
+        return vertex_ra, vertex_decl
@@ -1,20 +1,100 @@
-from functools import partial
 from typing import Optional, Tuple
 
 import astropy.units as u
 import numpy as np
 import numpy.typing as npt
 import pandas as pd
-from astropy.coordinates import Angle, SkyCoord
+import scipy.spatial
+from astropy.coordinates import Angle
 
 from .. import DECL_COL, POINTING_COL, RA_COL
-from .multisim import match_visits_across_sims
+from .multisim import _field_codes, _match_visit_runs, match_visits_across_sims
 
 # Static type checks can get confused by astropy units following
 # the u.myunit idiom. Using u.Unit helps them.
 DEG: u.Unit = u.Unit("deg")
 
 
+class ReferencePointingMatcher:
+    """Match coordinates to the nearest of a set of reference pointings.
+
+    The search tree is built once, when the matcher is created, so one
+    matcher can be reused to match any number of sets of coordinates.
+
+    Parameters
+    ----------
+    pointing_ids : `numpy.ndarray` of `int`
+        Array of pointing IDs corresponding to the reference pointings.
+    pointing_ras : `numpy.ndarray` of `float`
+        Right ascension values of reference pointings in degrees.
+    pointing_decls : `numpy.ndarray` of `float`
+        Declination values of reference pointings in degrees.
+    """
+
+    def __init__(
+        self,
+        pointing_ids: npt.NDArray[np.integer],
+        pointing_ras: npt.NDArray[np.floating],
+        pointing_decls: npt.NDArray[np.floating],
+    ):
+        self.pointing_ids = np.asarray(pointing_ids)
+        self.tree = scipy.spatial.cKDTree(_unit_vectors(pointing_ras, pointing_decls))
+
+    @classmethod
+    def from_dataframe(cls, reference_pointings: pd.DataFrame) -> "ReferencePointingMatcher":
+        """Create a matcher from a table of reference pointings.
+
+        Parameters
+        ----------
+        reference_pointings : `pd.DataFrame`
+            Reference pointings indexed by pointing id, with R.A. and
+            declination in decimal degrees in columns named by
+            `schedview.RA_COL` and `schedview.DECL_COL`.
+
+        Returns
+        -------
+        matcher : `ReferencePointingMatcher`
+            The matcher.
+        """
+        return cls(
+            reference_pointings.index.to_numpy(),
+            reference_pointings.loc[:, RA_COL].to_numpy(),
+            reference_pointings.loc[:, DECL_COL].to_numpy(),
+        )
+
+    def match(
+        self, ra: npt.NDArray[np.floating], decl: npt.NDArray[np.floating]
+    ) -> Tuple[npt.NDArray[np.integer], npt.NDArray[np.floating]]:
+        """Find the nearest reference pointing to each coordinate.
+
+        Parameters
+        ----------
+        ra : `numpy.ndarray` of `float`
+            Right ascension values of input coordinates in degrees.
+        decl : `numpy.ndarray` of `float`
+            Declination values of input coordinates in degrees.
+
+        Returns
+        -------
+        matched_ids : `numpy.ndarray` of `int`
+            Array of pointing IDs corresponding to the nearest pointings.
+        match_separation : `numpy.ndarray` of `float`
+            Array of angular separations in degrees between input coordinates
+            and their nearest reference pointings.
+        """
+        chord, match_index = self.tree.query(_unit_vectors(ra, decl))
+        matched_ids = self.pointing_ids[match_index]
+        match_sep_deg = np.degrees(2 * np.arcsin(np.minimum(chord / 2, 1.0)))
+        return matched_ids, match_sep_deg
+
+
+def _unit_vectors(ra: npt.ArrayLike, decl: npt.ArrayLike) -> npt.NDArray[np.floating]:
+    ra_rad = np.radians(np.asarray(ra, dtype=float))
+    decl_rad = np.radians(np.asarray(decl, dtype=float))
+    cos_decl = np.cos(decl_rad)
+    return np.stack([cos_decl * np.cos(ra_rad), cos_decl * np.sin(ra_rad), np.sin(decl_rad)], axis=-1)
+
+
 def find_nearest_pointing_ids(
     ra: npt.NDArray[np.floating],
     decl: npt.NDArray[np.floating],
@@ -46,22 +126,20 @@ def find_nearest_pointing_ids(
     match_separation : `numpy.ndarray` of `float`
         Array of angular separations in degrees between input coordinates
         and their nearest reference pointings.
-    """
 
-    input_coordinates = SkyCoord(ra, decl, unit="deg", frame="icrs")
-    reference_coords = SkyCoord(pointing_ras, pointing_decls, unit="deg", frame="icrs")
-    match_index, match_sep, _ = input_coordinates.match_to_catalog_sky(reference_coords)
-    matched_ids = pointing_ids[match_index]
-
-    match_sep_deg = match_sep.to(DEG).value
-    return matched_ids, match_sep_deg
+    Notes
+    -----
+    To match several sets of coordinates against the same reference
+    pointings, create a `ReferencePointingMatcher` once and reuse it.
+    """
+    return ReferencePointingMatcher(pointing_ids, pointing_ras, pointing_decls).match(ra, decl)
 
 
 def combine_completed_with_sims(
     simulated_visits: pd.DataFrame,
     completed_visits: pd.DataFrame,
     scheduler_version: str,
-    reference_pointings: pd.DataFrame | None = None,
+    reference_pointings: pd.DataFrame | ReferencePointingMatcher | None = None,
     pointing_tolerance: float = 0.002,
 ) -> pd.DataFrame:
     """Combine a DataFrame of simulated visits with one of completed visits.
@@ -82,8 +160,10 @@ def combine_completed_with_sims(
         `schedview.DECL_COL`.
     scheduler_version : `str`
         Version string of the scheduler used to generate the visits.
-    reference_pointings : `pd.DataFrame` or `None`, optional
-        DataFrame containing reference pointing coordinates for matching.
+    reference_pointings : `pd.DataFrame` or `ReferencePointingMatcher` \
+            or `None`, optional
+        DataFrame containing reference pointing coordinates for matching,
+        or a matcher already built from them.
         If provided, completed visits will be matched to the nearest reference
         pointing. Default is None.
     pointing_tolerance : `float`, optional
@@ -104,8 +184,83 @@ def combine_completed_with_sims(
         the provided ``reference_pointings`` ``pd.DataFrame`` if there are
         any within ``pointing_tolerance``.
         (Otherwise, they are left unchanged.)
+
+    See Also
+    --------
+    combine_completed_with_normalized_sims
+        Combine visits whose simulation metadata is in a separate table.
     """
+    visits, _ = _combine_completed_with_sims(
+        simulated_visits, completed_visits, scheduler_version, reference_pointings, pointing_tolerance
+    )
+    return visits
+
 
+def combine_completed_with_normalized_sims(
+    simulated_visits: pd.DataFrame,
+    simulations: pd.DataFrame,
+    completed_visits: pd.DataFrame,
+    scheduler_version: str,
+    reference_pointings: pd.DataFrame | ReferencePointingMatcher | None = None,
+    pointing_tolerance: float = 0.002,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Combine normalized simulated visits with completed visits.
+
+    Parameters
+    ----------
+    simulated_visits : `pd.DataFrame`
+        DataFrame containing simulated visits, as returned by
+        `schedview.collect.multisim.read_multiple_prenights_normalized`.
+    simulations : `pd.DataFrame`
+        The table of simulation metadata indexed by ``sim_index``, as
+        returned by
+        `schedview.collect.multisim.read_multiple_prenights_normalized`.
+    completed_visits : `pd.DataFrame`
+        DataFrame containing completed (observed) visits, as for
+        `combine_completed_with_sims`.
+    scheduler_version : `str`
+        Version string of the scheduler used to generate the visits.
+    reference_pointings : `pd.DataFrame` or `ReferencePointingMatcher` \
+            or `None`, optional
+        Reference pointings to which to match completed visits, as for
+        `combine_completed_with_sims`. Default is None.
+    pointing_tolerance : `float`, optional
+        Tolerance in degrees for matching completed visits to reference
+        pointings. Default is 0.002 degrees.
+
+    Returns
+    -------
+    visits : `pd.DataFrame`
+        Combined DataFrame of simulated and completed visits, as returned by
+        `combine_completed_with_sims`, but without the simulation metadata
+        columns.
+    simulations : `pd.DataFrame`
+        A copy of ``simulations`` with a row for the completed visits
+        (``sim_index`` 0) added.
+    """
+    visits, simulations = _combine_completed_with_sims(
+        simulated_visits,
+        completed_visits,
+        scheduler_version,
+        reference_pointings,
+        pointing_tolerance,
+        simulations,
+    )
+    assert simulations is not None
+    return visits, simulations
+
+
+def _combine_completed_with_sims(
+    simulated_visits: pd.DataFrame,
+    completed_visits: pd.DataFrame,
+    scheduler_version: str,
+    reference_pointings: pd.DataFrame | ReferencePointingMatcher | None = None,
+    pointing_tolerance: float = 0.002,
+    simulations: pd.DataFrame | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame | None]:
+    # Combine visits as described in combine_completed_with_sims, adding
+    # the completed visits to simulations (rather than repeating their
+    # metadata on each visit) if it is provided.
     if 0 in simulated_visits.sim_index.values:
         raise ValueError(
             "Simulated visits must not include a sim_index of 0, "
@@ -118,21 +273,23 @@ def combine_completed_with_sims(
             completed_visits["start_date"], format="ISO8601"
         ).dt.tz_localize("UTC")
         completed_visits["filter"] = completed_visits["band"]
-        completed_visits["sim_creation_day_obs"] = None
         completed_visits["sim_index"] = 0
-        completed_visits["label"] = "Completed"
-        completed_visits["config_url"] = ""
-        completed_visits["scheduler_version"] = scheduler_version
-        completed_visits["sim_runner_kwargs"] = {}
-        completed_visits.loc[:, "tags"] = len(completed_visits) * [["completed"]]
+        if simulations is None:
+            completed_visits["sim_creation_day_obs"] = None
+            completed_visits["label"] = "Completed"
+            completed_visits["config_url"] = ""
+            completed_visits["scheduler_version"] = scheduler_version
+            completed_visits["sim_runner_kwargs"] = {}
+            completed_visits.loc[:, "tags"] = len(completed_visits) * [["completed"]]
 
         if reference_pointings is not None:
-            nearest_pointing_id, match_separation = find_nearest_pointing_ids(
+            if isinstance(reference_pointings, ReferencePointingMatcher):
+                pointing_matcher = reference_pointings
+            else:
+                pointing_matcher = ReferencePointingMatcher.from_dataframe(reference_pointings)
+            nearest_pointing_id, match_separation = pointing_matcher.match(
                 completed_visits.loc[:, RA_COL].to_numpy(),
                 completed_visits.loc[:, DECL_COL].to_numpy(),
-                reference_pointings.index.to_numpy(),
-                reference_pointings.loc[:, RA_COL].to_numpy(),
-                reference_pointings.loc[:, DECL_COL].to_numpy(),
             )
             match_mask = match_separation < pointing_tolerance
             completed_visits.loc[match_mask, POINTING_COL] = nearest_pointing_id[match_mask]
@@ -141,7 +298,22 @@ def combine_completed_with_sims(
     else:
         visits = simulated_visits.copy()
 
-    return visits
+    if simulations is not None:
+        completed_metadata = {
+            "label": "Completed",
+            "config_url": "",
+            "scheduler_version": scheduler_version,
+            "sim_runner_kwargs": {},
+            "sim_creation_day_obs": None,
+            "tags": ["completed"],
+        }
+        completed_simulation = pd.DataFrame(
+            {column: [completed_metadata.get(column)] for column in simulations.columns},
+            index=pd.Index([0], name=simulations.index.name),
+        )
+        simulations = pd.concat([completed_simulation, simulations])
+
+    return visits, simulations
 
 
 def offsets_of_coord_band(sim_index: int, visits: pd.DataFrame, obs_index: int = 0) -> pd.DataFrame:
@@ -210,19 +382,30 @@ def compute_obs_sim_offsets(
         Offsets for every simulated visit, indexed by ``sim_index``,
         the value of `schedview.POINTING_COL` and ``band``.
     """
-    sim_indexes = visits.sim_index.unique()
-    sim_indexes = sim_indexes[sim_indexes != obs_index]
-
-    sim_offsets = []
-    for i in sim_indexes:
-        sim_offsets.append(
-            visits.set_index([POINTING_COL, "band"])
-            .groupby([POINTING_COL, "band"])
-            .apply(partial(offsets_of_coord_band, i))
-            .reset_index()
-        )
-
-    offsets = pd.concat(sim_offsets, ignore_index=True).set_index(["sim_index", POINTING_COL, "band"])
+    field_code, field_index = _field_codes(visits, (POINTING_COL, "band"))
+    sim_code, sim_values = pd.factorize(visits["sim_index"])
+    start_ns = visits["start_timestamp"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    obs_code = sim_values.get_loc(obs_index) if obs_index in sim_values else -1
+
+    # Sort all simulations together so that the visits to each field in
+    # each simulation are contiguous, and match them all in one pass.
+    rows = np.flatnonzero(field_code >= 0)
+    visit_order = rows[np.lexsort((start_ns[rows], sim_code[rows], field_code[rows]))]
+    obs_position, sim_position, _ = _match_visit_runs(
+        field_code[visit_order], sim_code[visit_order], start_ns[visit_order], obs_code
+    )
+    obs_rows, sim_rows = visit_order[obs_position], visit_order[sim_position]
+
+    # Order the offsets by simulation, then field, then time.
+    match_order = np.lexsort((sim_position, field_code[sim_rows], sim_code[sim_rows]))
+    obs_rows, sim_rows = obs_rows[match_order], sim_rows[match_order]
+
+    offsets = field_index.to_frame(index=False).iloc[field_code[sim_rows]].reset_index(drop=True)
+    offsets.insert(0, "sim_index", sim_values[sim_code[sim_rows]])
+    offsets["obs_time"] = visits["start_timestamp"].array[obs_rows]
+    offsets["sim_time"] = visits["start_timestamp"].array[sim_rows]
+    offsets["delta"] = (start_ns[obs_rows] - start_ns[sim_rows]) / 1e9
+    offsets = offsets.set_index(["sim_index", POINTING_COL, "band"])
 
     return offsets
 
@@ -254,12 +437,10 @@ def compute_offset_stats(
         A table where each row corresponds to a ``sim_index`` and columns
         include match counts, MAD, and the usual descriptive statistics.
     """
-    abs_delta = offsets["delta"].abs()
-    abs_delta.name = "abs_delta"
-
-    offset_stats = offsets.groupby("sim_index")["delta"].describe()
+    grouped_offsets = offsets.assign(abs_delta=offsets["delta"].abs()).groupby("sim_index")
+    offset_stats = grouped_offsets["delta"].describe()
     offset_stats.insert(0, "match count", offset_stats["count"].astype(int))
-    offset_stats.insert(1, "MAD", abs_delta.to_frame().groupby("sim_index")["abs_delta"].median())
+    offset_stats.insert(1, "MAD", grouped_offsets["abs_delta"].median())
 
     if visits is not None:
         visit_counts = visits.groupby("sim_index").agg({"label": "count"}).rename(columns={"label": "counts"})
@@ -0,0 +1,177 @@
+import hashlib
+from pathlib import Path
+
+import healpy as hp
+import numpy as np
+import pandas as pd
+import scipy.sparse
+import scipy.spatial
+
+from .camera import LsstCameraFootprintPerimeter
+
+__all__ = ["compute_visit_coverage", "compute_hpix_coverage_map"]
+
+# Increment when the way coverage is computed changes, so that
+# coverage matrices cached on disk by earlier versions are not reused.
+_COVERAGE_CACHE_VERSION = 1
+
+
+def _in_camera_footprint(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    # Test offsets (in degrees, in the camera frame) against the footprint
+    # outlined by LsstCameraFootprintPerimeter: a square of wide rafts with
+    # one raft missing from each corner.
+    half_width = LsstCameraFootprintPerimeter.footprint_width_deg / 2
+    raft_width = (
+        LsstCameraFootprintPerimeter.footprint_width_deg / LsstCameraFootprintPerimeter.footprint_wide_rafts
+    )
+    abs_x, abs_y = np.abs(x), np.abs(y)
+    in_square = (abs_x <= half_width) & (abs_y <= half_width)
+    in_corner = (abs_x > half_width - raft_width) & (abs_y > half_width - raft_width)
+    return in_square & ~in_corner
+
+
+def _coverage_cache_path(
+    cache_dir: str | Path, ra: np.ndarray, decl: np.ndarray, rotation: np.ndarray, nside: int
+) -> Path:
+    digest = hashlib.sha256()
+    digest.update(f"{_COVERAGE_CACHE_VERSION} {nside} {len(ra)}".encode("utf-8"))
+    for values in (ra, decl, rotation):
+        digest.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    return Path(cache_dir).joinpath(f"visit_coverage_{nside}_{digest.hexdigest()[:16]}.npz")
+
+
+def compute_visit_coverage(
+    visits: pd.DataFrame,
+    nside: int = 32,
+    cache_dir: str | Path | None = None,
+    ra_column: str = "fieldRA",
+    decl_column: str = "fieldDec",
+    rot_column: str | None = "rotSkyPos",
+) -> scipy.sparse.csr_array:
+    """Compute which healpixels fall in the camera footprint of each visit.
+
+    Parameters
+    ----------
+    visits : `pandas.DataFrame`
+        The visits, with pointing and camera rotation columns.
+    nside : `int`
+        The healpix nside of the healpixels, by default 32.
+    cache_dir : `str` or `pathlib.Path` or `None`
+        If set, the directory in which to save the coverage matrix, and from
+        which to load it again for visits with the same pointings and
+        rotations and the same ``nside``. By default, do not cache.
+    ra_column : `str`
+        The column with the R.A. of each visit (degrees).
+    decl_column : `str`
+        The column with the declination of each visit (degrees).
+    rot_column : `str` or `None`
+        The column with the camera rotation of each visit (degrees), in the
+        sense used by
+        `schedview.compute.camera.LsstCameraFootprintPerimeter`.
+        If `None`, use a rotation of 0.
+
+    Returns
+    -------
+    coverage : `scipy.sparse.csr_array`
+        A boolean array with one row for each visit (in the order of
+        ``visits``) and one column for each healpixel (in RING order),
+        `True` where the center of the healpixel is in the footprint
+        of the visit.
+
+    Notes
+    -----
+    Maps for any subset of the visits can then be computed with
+    `compute_hpix_coverage_map`, without recomputing the coverage.
+    """
+    ra = np.asarray(visits[ra_column], dtype=float)
+    decl = np.asarray(visits[decl_column], dtype=float)
+    rotation = np.zeros_like(ra) if rot_column is None else np.asarray(visits[rot_column], dtype=float)
+    num_visits = len(ra)
+    npix = hp.nside2npix(nside)
+
+    cache_path = None
+    if cache_dir is not None:
+        cache_path = _coverage_cache_path(cache_dir, ra, decl, rotation, nside)
+        if cache_path.exists():
+            return scipy.sparse.csr_array(scipy.sparse.load_npz(cache_path))
+
+    # Find candidate healpixels within the circle that circumscribes the
+    # footprint, all visits in one query of a tree of healpixel centers.
+    hpix_vecs = np.array(hp.pix2vec(nside, np.arange(npix))).T
+    visit_vecs = hp.ang2vec(ra, decl, lonlat=True).reshape(num_visits, 3)
+    max_sep = np.radians(np.sqrt(2) * LsstCameraFootprintPerimeter.footprint_width_deg / 2)
+    candidate_lists = scipy.spatial.cKDTree(hpix_vecs).query_ball_point(
+        visit_vecs, r=2 * np.sin(max_sep / 2) * (1 + 1e-9), return_sorted=True
+    )
+    num_candidates = np.fromiter((len(c) for c in candidate_lists), dtype=np.int64, count=num_visits)
+    candidate_visit = np.repeat(np.arange(num_visits), num_candidates)
+    candidate_hpid = (
+        np.concatenate(candidate_lists).astype(np.int64) if num_visits > 0 else np.zeros(0, dtype=np.int64)
+    )
+
+    # Polar coordinates of each candidate healpixel center relative to the
+    # visit pointing: the separation, and the bearing east of north less the
+    # camera rotation, just as LsstCameraFootprintPerimeter places vertices.
+    visit_ra = np.radians(ra[candidate_visit])
+    visit_decl = np.radians(decl[candidate_visit])
+    hpix_ra, hpix_decl = hp.pix2ang(nside, candidate_hpid, lonlat=True)
+    hpix_ra, hpix_decl = np.radians(hpix_ra), np.radians(hpix_decl)
+    delta_ra = hpix_ra - visit_ra
+    cos_sep = np.sin(visit_decl) * np.sin(hpix_decl) + np.cos(visit_decl) * np.cos(hpix_decl) * np.cos(
+        delta_ra
+    )
+    sep = np.degrees(np.arccos(np.clip(cos_sep, -1, 1)))
+    bearing = np.arctan2(
+        np.sin(delta_ra) * np.cos(hpix_decl),
+        np.cos(visit_decl) * np.sin(hpix_decl) - np.sin(visit_decl) * np.cos(hpix_decl) * np.cos(delta_ra),
+    )
+    camera_angle = bearing - np.radians(rotation[candidate_visit])
+    covered = _in_camera_footprint(sep * np.cos(camera_angle), sep * np.sin(camera_angle))
+
+    coverage = scipy.sparse.csr_array(
+        (
+            np.ones(np.count_nonzero(covered), dtype=bool),
+            (candidate_visit[covered], candidate_hpid[covered]),
+        ),
+        shape=(num_visits, npix),
+    )
+
+    if cache_path is not None:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        scipy.sparse.save_npz(cache_path, coverage)
+
+    return coverage
+
+
+def compute_hpix_coverage_map(
+    coverage: scipy.sparse.csr_array,
+    visit_mask: np.ndarray | pd.Series | None = None,
+    values: np.ndarray | pd.Series | None = None,
+) -> np.ndarray:
+    """Sum values of visits covering each healpixel.
+
+    Parameters
+    ----------
+    coverage : `scipy.sparse.csr_array`
+        The coverage of healpixels by visits, as returned by
+        `compute_visit_coverage`.
+    visit_mask : `numpy.ndarray` or `pandas.Series` or `None`
+        A boolean mask selecting the visits to include (for example, visits
+        in one band, night, or simulation). By default, include all visits.
+    values : `numpy.ndarray` or `pandas.Series` or `None`
+        The value of each visit to sum (for example, exposure time).
+        By default, count visits.
+
+    Returns
+    -------
+    hpix_map : `numpy.ndarray`
+        The sum of ``values`` for the selected visits covering each
+        healpixel, indexed by healpix id (in RING order).
+    """
+    num_visits = coverage.shape[0]
+    weights = np.ones(num_visits) if values is None else np.asarray(values, dtype=float)
+    if visit_mask is not None:
+        weights = np.where(np.asarray(visit_mask, dtype=bool), weights, 0.0)
+
+    hpix_map = coverage.T @ weights
+    return hpix_map
@@ -0,0 +1,187 @@
+import hashlib
+import os
+from functools import cache
+from pathlib import Path
+
+import numpy as np
+from astropy.coordinates import get_body, solar_system_ephemeris
+from astropy.time import Time
+
+__all__ = ["EPHEMERIS_ACCURACY_ARCSEC", "EPHEMERIS_GRID_STEPS", "compute_body_coords", "write_ephemeris_grid"]
+
+EPHEMERIS_GRID_VERSION = 1
+EPHEMERIS_DIR_ENV_VAR = "SCHEDVIEW_EPHEMERIS_DIR"
+
+# Spacing (in days) of the grid of positions computed for each body,
+# chosen so that interpolated positions are good to better than
+# EPHEMERIS_ACCURACY_ARCSEC with the builtin astropy ephemeris.
+EPHEMERIS_GRID_STEPS = {
+    "sun": 0.25,
+    "moon": 0.125,
+    "mercury": 0.5,
+    "venus": 0.5,
+    "mars": 0.5,
+    "jupiter": 0.5,
+    "saturn": 0.5,
+    "uranus": 0.5,
+    "neptune": 0.5,
+}
+EPHEMERIS_ACCURACY_ARCSEC = 10.0
+
+# Grids are computed and cached in chunks of this many days, so that positions
+# at times in nearby date ranges share the same grid.
+EPHEMERIS_CHUNK_DAYS = 32
+
+
+def _ephemeris_grid_path(directory: str | Path, body: str, step: float, chunk: int, ephemeris: str) -> Path:
+    ephemeris_digest = hashlib.sha256(ephemeris.encode("utf-8")).hexdigest()[:8]
+    return Path(directory).joinpath(
+        f"ephemeris_v{EPHEMERIS_GRID_VERSION}_{body}_{step:g}_{ephemeris_digest}_{chunk}.npy"
+    )
+
+
+def _compute_ephemeris_grid(body: str, step: float, chunk: int) -> np.ndarray:
+    # Geocentric unit vectors of the body, at grid points from one step
+    # before the start of the chunk to two steps after its end, as needed
+    # for four-point interpolation anywhere in the chunk.
+    num_steps = round(EPHEMERIS_CHUNK_DAYS / step)
+    grid_mjds = step * np.arange(chunk * num_steps - 1, (chunk + 1) * num_steps + 3)
+    body_coords = get_body(body, Time(grid_mjds, format="mjd", scale="utc"))
+    xyz = body_coords.cartesian.xyz.value.T
+    return xyz / np.linalg.norm(xyz, axis=1, keepdims=True)
+
+
+def write_ephemeris_grid(directory: str | Path, body: str, first_mjd: float, last_mjd: float) -> list[Path]:
+    """Write grids of positions of a body to files.
+
+    Parameters
+    ----------
+    directory : `str` or `pathlib.Path`
+        The directory in which to write the grids.
+    body : `str`
+        The name of the body, one of the keys of `EPHEMERIS_GRID_STEPS`
+        (without regard to case).
+    first_mjd : `float`
+        The start of the date range to cover (MJD).
+    last_mjd : `float`
+        The end of the date range to cover (MJD).
+
+    Returns
+    -------
+    paths : `list` [`pathlib.Path`]
+        The paths of the grids covering the date range. Grids already
+        written are not computed again.
+    """
+    body = body.lower()
+    step = EPHEMERIS_GRID_STEPS[body]
+    ephemeris = solar_system_ephemeris.get()
+    paths = []
+    for chunk in range(int(first_mjd // EPHEMERIS_CHUNK_DAYS), int(last_mjd // EPHEMERIS_CHUNK_DAYS) + 1):
+        path = _ephemeris_grid_path(directory, body, step, chunk, ephemeris)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+            # Write to a temporary file and rename it, so that other processes
+            # never see a partially written grid.
+            temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(temp_path, "wb") as temp_file:
+                np.save(temp_file, _compute_ephemeris_grid(body, step, chunk))
+            os.replace(temp_path, path)
+        paths.append(path)
+    return paths
+
+
+@cache
+def _ephemeris_grid(body: str, step: float, chunk: int, ephemeris: str, directory: str | None) -> np.ndarray:
+    # The ephemeris is an argument only so that grids computed with different
+    # ephemerides are cached separately: it must be the one currently set.
+    if directory is None:
+        return _compute_ephemeris_grid(body, step, chunk)
+
+    path = _ephemeris_grid_path(directory, body, step, chunk, ephemeris)
+    if not path.exists():
+        write_ephemeris_grid(directory, body, chunk * EPHEMERIS_CHUNK_DAYS, chunk * EPHEMERIS_CHUNK_DAYS)
+    return np.load(path, mmap_mode="r")
+
+
+def compute_body_coords(
+    body: str, mjd: float | np.ndarray, cache_dir: str | Path | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Compute the geocentric coordinates of a solar system body.
+
+    Parameters
+    ----------
+    body : `str`
+        The name of the body, as accepted by `astropy.coordinates.get_body`.
+        Case is ignored in matching it to the keys of `EPHEMERIS_GRID_STEPS`.
+    mjd : `float` or `numpy.ndarray`
+        The times (MJD, UTC) at which to compute the coordinates.
+    cache_dir : `str` or `pathlib.Path` or `None`
+        The directory in which to save grids of positions, and from which to
+        load them again. By default, the directory set in the
+        ``SCHEDVIEW_EPHEMERIS_DIR`` environment variable, or, if that is not
+        set, keep grids in memory only.
+
+    Returns
+    -------
+    ra : `numpy.ndarray`
+        The R.A. of the body (degrees), as returned by
+        `astropy.coordinates.get_body`.
+    decl : `numpy.ndarray`
+        The declination of the body (degrees), as returned by
+        `astropy.coordinates.get_body`.
+
+    Notes
+    -----
+    Rather than calling `astropy.coordinates.get_body` at each time, this
+    interpolates (with a four-point Lagrange interpolation) the geocentric
+    unit vector of the body on a grid with the spacing set in
+    `EPHEMERIS_GRID_STEPS`. The grid is computed once per process (or once
+    per ``cache_dir``) for each chunk of ``EPHEMERIS_CHUNK_DAYS`` days,
+    with the ephemeris currently set in
+    `astropy.coordinates.solar_system_ephemeris`. The interpolated
+    coordinates are within ``EPHEMERIS_ACCURACY_ARCSEC`` (10) arcseconds of
+    those returned by `astropy.coordinates.get_body` with the builtin
+    ephemeris (better than 0.01 arcseconds for the moon), much smaller than
+    the markers used to show bodies on maps. Coordinates of bodies not in
+    `EPHEMERIS_GRID_STEPS` are computed with `astropy.coordinates.get_body`
+    directly.
+    """
+    mjds = np.atleast_1d(np.asarray(mjd, dtype=float))
+    body = body.lower()
+    if body not in EPHEMERIS_GRID_STEPS:
+        body_coords = get_body(body, Time(mjds, format="mjd", scale="utc"))
+        return body_coords.ra.deg, body_coords.dec.deg
+
+    if cache_dir is None:
+        cache_dir = os.environ.get(EPHEMERIS_DIR_ENV_VAR) or None
+    directory = None if cache_dir is None else str(cache_dir)
+    ephemeris = solar_system_ephemeris.get()
+
+    step = EPHEMERIS_GRID_STEPS[body]
+    num_steps = round(EPHEMERIS_CHUNK_DAYS / step)
+    grid_index = np.floor(mjds / step).astype(np.int64)
+    fraction = mjds / step - grid_index
+    chunks = grid_index // num_steps
+
+    # Weights of the grid points before, at, and the two after each time.
+    weights = np.stack(
+        [
+            -fraction * (fraction - 1) * (fraction - 2) / 6,
+            (fraction + 1) * (fraction - 1) * (fraction - 2) / 2,
+            -(fraction + 1) * fraction * (fraction - 2) / 2,
+            (fraction + 1) * fraction * (fraction - 1) / 6,
+        ]
+    )
+
+    xyz = np.zeros((len(mjds), 3))
+    for chunk in np.unique(chunks):
+        in_chunk = chunks == chunk
+        grid = _ephemeris_grid(body, step, int(chunk), ephemeris, directory)
+        chunk_index = grid_index[in_chunk] - (chunk * num_steps - 1)
+        for offset in range(4):
+            xyz[in_chunk] += weights[offset, in_chunk, np.newaxis] * grid[chunk_index - 1 + offset]
+
+    ra = np.degrees(np.arctan2(xyz[:, 1], xyz[:, 0])) % 360
+    decl = np.degrees(np.arctan2(xyz[:, 2], np.hypot(xyz[:, 0], xyz[:, 1])))
+    return ra, decl
@@ -1,6 +1,11 @@
 import datetime
+import inspect
+import re
 import sqlite3
+import warnings
 from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
 from pathlib import Path
 from tempfile import TemporaryDirectory
 from typing import Any, Callable, Sequence
@@ -10,12 +15,14 @@ import pandas as pd
 from rubin_scheduler.scheduler.utils import SchemaConverter
 from rubin_sim import maf
 
-from schedview.dayobs import DayObs
+from schedview.dayobs import DayObs, DayObsArray
 from schedview.util import band_column
 
 __all__ = [
+    "constraint_to_mask",
     "compute_metric_by_visit",
     "compute_scalar_metric_at_one_mjd",
+    "compute_scalar_metric_at_sorted_mjds",
     "compute_mixed_scalar_metric",
     "make_metric_progress_df",
 ]
@@ -52,6 +59,281 @@ def _visits_to_opsim(visits, opsim):
         merged_opsim.to_sql("observations", con)
 
 
+_CONSTRAINT_TOKEN_RE = re.compile(
+    r"""\s*(?:
+        (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+        |(?P<string>'(?:[^']|'')*')
+        |(?P<quoted>"(?:[^"]|"")*")
+        |(?P<name>[A-Za-z_][A-Za-z0-9_]*)
+        |(?P<op><=|>=|<>|!=|==|=|<|>|\(|\)|,|\+|-|\*|/)
+    )""",
+    re.VERBOSE,
+)
+
+_CONSTRAINT_KEYWORDS = {"and", "or", "not", "between", "in", "is", "null", "like"}
+_CONSTRAINT_VALUE_OPERATORS = ("<=", ">=", "<>", "!=", "==", "=", "<", ">", "+", "-", "*", "/")
+
+
+class _ConstraintParser:
+    """Translate a simple SQL ``WHERE`` clause into a numpy mask.
+
+    Only the subset of SQL commonly used in MAF constraints is supported:
+    comparisons, ``BETWEEN``, ``IN``, ``LIKE``, ``IS [NOT] NULL``,
+    arithmetic, ``AND``, ``OR``, ``NOT`` and parentheses.
+    """
+
+    def __init__(self, constraint, visits):
+        self.constraint = constraint
+        self.visits = visits
+        self.columns = {str(c).lower(): c for c in visits.columns}
+        self.tokens = self._tokenize(constraint)
+        self.position = 0
+
+    def _tokenize(self, constraint):
+        tokens = []
+        position = 0
+        stripped_length = len(constraint.rstrip())
+        while position < stripped_length:
+            match = _CONSTRAINT_TOKEN_RE.match(constraint, position)
+            if match is None or match.end() == position:
+                raise ValueError(f"Cannot translate constraint: {constraint}")
+            kind = match.lastgroup
+            text = match.group(kind)
+            if kind == "name" and text.lower() in _CONSTRAINT_KEYWORDS:
+                kind, text = "keyword", text.lower()
+            tokens.append((kind, text))
+            position = match.end()
+        return tokens
+
+    def _peek(self, kind=None, text=None):
+        if self.position >= len(self.tokens):
+            return False
+        this_kind, this_text = self.tokens[self.position]
+        return (kind is None or kind == this_kind) and (text is None or text == this_text)
+
+    def _accept(self, kind, text=None):
+        if self._peek(kind, text):
+            self.position += 1
+            return True
+        return False
+
+    def _expect(self, kind, text=None):
+        if not self._accept(kind, text):
+            raise ValueError(f"Cannot translate constraint: {self.constraint}")
+
+    def _column(self, name):
+        try:
+            return self.visits[self.columns[name.lower()]].to_numpy()
+        except KeyError:
+            raise ValueError(f"Constraint refers to unknown column {name}: {self.constraint}")
+
+    def parse(self):
+        if len(self.tokens) == 0:
+            return np.ones(len(self.visits), dtype=bool)
+        mask = self._or()
+        if self.position != len(self.tokens):
+            raise ValueError(f"Cannot translate constraint: {self.constraint}")
+        return np.broadcast_to(np.asarray(mask, dtype=bool), (len(self.visits),)).copy()
+
+    def _or(self):
+        mask = self._and()
+        while self._accept("keyword", "or"):
+            mask = np.logical_or(mask, self._and())
+        return mask
+
+    def _and(self):
+        mask = self._not()
+        while self._accept("keyword", "and"):
+            mask = np.logical_and(mask, self._not())
+        return mask
+
+    def _not(self):
+        if self._accept("keyword", "not"):
+            return np.logical_not(self._not())
+        return self._predicate()
+
+    def _predicate(self):
+        # A parenthesis here may open either a nested boolean expression
+        # or an arithmetic one, so try the boolean reading first.
+        if self._peek("op", "("):
+            start = self.position
+            self.position += 1
+            try:
+                mask = self._or()
+                self._expect("op", ")")
+                if not any(self._peek("op", op) for op in _CONSTRAINT_VALUE_OPERATORS):
+                    return mask
+            except ValueError:
+                pass
+            self.position = start
+
+        left = self._sum()
+
+        if self._accept("keyword", "is"):
+            negate = self._accept("keyword", "not")
+            self._expect("keyword", "null")
+            mask = pd.isna(left)
+            return np.logical_not(mask) if negate else mask
+
+        negate = self._accept("keyword", "not")
+        if self._accept("keyword", "between"):
+            low = self._sum()
+            self._expect("keyword", "and")
+            high = self._sum()
+            mask = np.logical_and(left >= low, left <= high)
+        elif self._accept("keyword", "in"):
+            self._expect("op", "(")
+            values = [self._sum()]
+            while self._accept("op", ","):
+                values.append(self._sum())
+            self._expect("op", ")")
+            mask = np.isin(left, values)
+        elif self._accept("keyword", "like"):
+            pattern = self._sum()
+            if not isinstance(pattern, str):
+                raise ValueError(f"Cannot translate constraint: {self.constraint}")
+            regex = "".join(".*" if c == "%" else "." if c == "_" else re.escape(c) for c in pattern)
+            mask = (
+                pd.Series(np.asarray(left, dtype=object))
+                .astype(str)
+                .str.fullmatch(regex, case=False)
+                .to_numpy()
+            )
+        elif negate:
+            raise ValueError(f"Cannot translate constraint: {self.constraint}")
+        else:
+            comparisons = {
+                "=": np.equal,
+                "==": np.equal,
+                "!=": np.not_equal,
+                "<>": np.not_equal,
+                "<": np.less,
+                "<=": np.less_equal,
+                ">": np.greater,
+                ">=": np.greater_equal,
+            }
+            if self.position >= len(self.tokens) or self.tokens[self.position][1] not in comparisons:
+                raise ValueError(f"Cannot translate constraint: {self.constraint}")
+            comparison = comparisons[self.tokens[self.position][1]]
+            self.position += 1
+            mask = comparison(left, self._sum())
+
+        return np.logical_not(mask) if negate else mask
+
+    def _sum(self):
+        value = self._product()
+        while self._peek("op", "+") or self._peek("op", "-"):
+            operator = self.tokens[self.position][1]
+            self.position += 1
+            value = value + self._product() if operator == "+" else value - self._product()
+        return value
+
+    def _product(self):
+        value = self._unary()
+        while self._peek("op", "*") or self._peek("op", "/"):
+            operator = self.tokens[self.position][1]
+            self.position += 1
+            value = value * self._unary() if operator == "*" else value / self._unary()
+        return value
+
+    def _unary(self):
+        if self._accept("op", "-"):
+            return -self._unary()
+        if self._accept("op", "+"):
+            return self._unary()
+        return self._atom()
+
+    def _atom(self):
+        if self.position >= len(self.tokens):
+            raise ValueError(f"Cannot translate constraint: {self.constraint}")
+        kind, text = self.tokens[self.position]
+        self.position += 1
+        match kind:
+            case "number":
+                return float(text) if any(c in text for c in ".eE") else int(text)
+            case "string":
+                return text[1:-1].replace("''", "'")
+            case "quoted":
+                # Like sqlite, treat double quoted text as a column name if
+                # there is such a column, and a string literal otherwise.
+                text = text[1:-1].replace('""', '"')
+                return self._column(text) if text.lower() in self.columns else text
+            case "name":
+                return self._column(text)
+            case "op" if text == "(":
+                value = self._sum()
+                self._expect("op", ")")
+                return value
+        raise ValueError(f"Cannot translate constraint: {self.constraint}")
+
+
+def constraint_to_mask(visits, constraint):
+    """Translate a simple sql-style MAF constraint into a numpy mask.
+
+    Parameters
+    ----------
+    visits : `pandas.DataFrame`
+        The DataFrame of visits (with column names matching those of opsim
+        database).
+    constraint : `str` or `None`
+        The sql-style constraint (the contents of a ``WHERE`` clause).
+        Column names are matched without regard to case, as in sqlite.
+
+    Returns
+    -------
+    mask : `numpy.ndarray`
+        A boolean array, `True` for visits that satisfy the constraint.
+
+    Raises
+    ------
+    ValueError
+        If the constraint uses sql not supported by the translation, or
+        refers to columns not in ``visits``.
+
+    Notes
+    -----
+    The translation does not follow sqlite in every detail: ``/``
+    always does floating point division, comparisons with missing
+    (``NaN``) values are `False` rather than ``NULL``, and ``LIKE``
+    matches against the string representation of each value, so ``NaN``
+    matches ``'nan'``. The visits are also used as given, without the
+    column migration `compute_metric` applies before writing them to
+    sqlite.
+    """
+    if constraint is None:
+        constraint = ""
+    return _ConstraintParser(constraint, visits).parse()
+
+
+def _constraints_need_sqlite(constraints):
+    # Translated constraints do not follow sqlite exactly (for example,
+    # in division and comparisons with NULL), so only skip the round trip
+    # through sqlite by default when there is nothing to translate.
+    return any(constraint for constraint in constraints)
+
+
+def _constraints_translatable(visits, constraints):
+    # Evaluate each constraint on the actual visits, because some failures
+    # (such as comparing a string column with a number) only show up
+    # when there is data to compare.
+    for constraint in constraints:
+        try:
+            constraint_to_mask(visits, constraint)
+        except (ValueError, TypeError):
+            return False
+    return True
+
+
+def _run_bundle_group_in_memory(visits, bundle_group):
+    sim_data = visits.to_records(index=False)
+    for constraint in bundle_group.constraints:
+        mask = constraint_to_mask(visits, constraint)
+        if not np.any(mask):
+            warnings.warn(f"No data matching constraint {constraint}")
+            continue
+        bundle_group.run_current(constraint, sim_data=sim_data[mask])
+
+
 def compute_metric(visits, metric_bundle, sqlite=True):
     """Compute metrics with MAF.
 
@@ -62,10 +344,12 @@ def compute_metric(visits, metric_bundle, sqlite=True):
         database).
     metric_bundle : `maf.MetricBundle`, `dict`, or `list` of `maf.MetricBundle`
         The metric bundle(s) to run.
-    sqlite : `bool`
+    sqlite : `bool` or `None`
         Write visits to an sqlite3 database and then read the visits back
-        from it when computing the metrics. Needed when metric bundles have
-        constraints.
+        from it when computing the metrics. If `False`, pass the visits
+        to MAF directly from memory, applying bundle constraints
+        with `constraint_to_mask`. If `None`, use sqlite if any bundle
+        has a constraint, and the in-memory path otherwise.
 
     Returns
     -------
@@ -76,6 +360,11 @@ def compute_metric(visits, metric_bundle, sqlite=True):
     metric_bundles = [metric_bundle] if passed_one_bundle else metric_bundle
 
     with TemporaryDirectory() as working_dir:
+        if sqlite is None or not sqlite:
+            bundle_group = maf.MetricBundleGroup(metric_bundles, None, out_dir=working_dir)
+            if sqlite is None:
+                sqlite = _constraints_need_sqlite(bundle_group.constraints)
+
         if sqlite:
             visits_db = Path(working_dir).joinpath("visits.db").as_posix()
             _visits_to_opsim(visits, visits_db)
@@ -83,13 +372,12 @@ def compute_metric(visits, metric_bundle, sqlite=True):
             bundle_group = maf.MetricBundleGroup(metric_bundles, visits_db, out_dir=working_dir)
             bundle_group.run_all()
         else:
-            bundle_group = maf.MetricBundleGroup(metric_bundles, None, out_dir=working_dir)
-            bundle_group.run_current(None, visits.to_records(index=False))
+            _run_bundle_group_in_memory(visits, bundle_group)
 
     return metric_bundle
 
 
-def compute_metric_by_visit(visits, metric, constraint=""):
+def compute_metric_by_visit(visits, metric, constraint="", sqlite=None):
     """Compute a MAF metric by visit.
 
     Parameters
@@ -101,6 +389,10 @@ def compute_metric_by_visit(visits, metric, constraint=""):
         The metric to compute.
     constraint : `str` or `None`
         The SQL query to filter visits to be used.
+    sqlite : `bool` or `None`
+        Round trip the visits through an sqlite3 database, as described in
+        `compute_metric`. If `None`, use sqlite only if ``constraint``
+        is set.
 
     Returns
     -------
@@ -113,17 +405,100 @@ def compute_metric_by_visit(visits, metric, constraint=""):
     slicer = maf.OneDSlicer("observationId", bin_size=1)
     metric_bundle = maf.MetricBundle(slicer=slicer, metric=metric, constraint=constraint)
 
-    # If the constraint is set, we need to use sqlite
-    use_sqlite = constraint is None or len(constraint) > 0
-
-    compute_metric(visits, metric_bundle, sqlite=use_sqlite)
+    compute_metric(visits, metric_bundle, sqlite=sqlite)
     result = pd.Series(metric_bundle.metric_values, index=slicer.slice_points["bins"][:-1].astype(int))
     result.index.name = "observationId"
     return result
 
 
-def compute_hpix_metric_in_bands(visits, metric, constraint="", nside=32):
-    """Compute a MAF metric by visit.
+def _setup_slicer_in_memory(sim_data, bundle):
+    # Run the stackers and maps the bundle needs, and set up its slicer
+    # (including any spatial tree) on the in-memory visits.
+    for stacker in bundle.stacker_list:
+        sim_data = stacker.run(sim_data, override=True)
+    bundle.slicer.setup_slicer(sim_data, maps=bundle.maps_list)
+    return sim_data
+
+
+def _slice_indexes(slice_i):
+    # Some slicers (e.g. UniSlicer) return boolean masks rather than indexes.
+    idxs = np.asarray(slice_i["idxs"])
+    return np.flatnonzero(idxs) if idxs.dtype == bool else idxs.astype(int)
+
+
+def _new_metric_values(metric, slicer):
+    # Follow MetricBundle._setup_metric_values, but start with every
+    # slice point masked, so callers can unmask the ones that get data.
+    dtype = "float" if metric.metric_dtype == "int" else metric.metric_dtype
+    shape = slicer.shape if metric.shape == 1 else (slicer.shape, metric.shape)
+    return np.ma.MaskedArray(
+        data=np.empty(shape, dtype), mask=np.ones(shape, "bool"), fill_value=slicer.badval
+    )
+
+
+def _mask_bad_metric_values(values, metric, slicer):
+    # Mask values the metric flags as bad, as MetricBundleGroup does.
+    if values.dtype.name == "object":
+        for i, value in enumerate(values.data):
+            if value is metric.badval:
+                values.mask[i] = True
+    else:
+        values.mask = np.where(values.data == metric.badval, True, values.mask)
+    if hasattr(slicer, "mask"):
+        values.mask = np.logical_or(values.mask, slicer.mask)
+    return values
+
+
+def _compute_hpix_metric_single_pass(visits, metric, constraint, nside, bands):
+    band_col = band_column(visits)
+    in_bands = visits[band_col].isin(bands).to_numpy()
+    visits = visits.loc[constraint_to_mask(visits, constraint) & in_bands, :]
+    if len(visits) == 0:
+        return {}
+
+    # Build the spatial tree (and camera footprint) once for all bands.
+    slicer = maf.HealpixSlicer(nside=nside, verbose=False)
+    sim_data = _setup_slicer_in_memory(
+        visits.to_records(index=False), maf.MetricBundle(metric, slicer, constraint)
+    )
+
+    used_bands = pd.unique(sim_data[band_col])
+    band_codes = pd.Categorical(sim_data[band_col], categories=used_bands).codes
+    band_values = [_new_metric_values(metric, slicer) for _ in used_bands]
+
+    for slice_i in slicer:
+        idxs = _slice_indexes(slice_i)
+        if len(idxs) == 0:
+            continue
+        sid = slice_i["slice_point"]["sid"]
+        slice_band_codes = band_codes[idxs]
+        for band_code in np.unique(slice_band_codes):
+            slice_data = sim_data[idxs[slice_band_codes == band_code]]
+            band_values[band_code].data[sid] = metric.run(slice_data, slice_point=slice_i["slice_point"])
+            band_values[band_code].mask[sid] = False
+
+    band_values = [_mask_bad_metric_values(values, metric, slicer) for values in band_values]
+    return dict(zip(used_bands, band_values))
+
+
+def _compute_hpix_metric_by_band(visits, metric, constraint, nside, bands, sqlite):
+    band_col = band_column(visits)
+    metric_values = {}
+    for this_band in bands:
+        band_visits = visits.loc[visits[band_col] == this_band, :]
+        slicer = maf.HealpixSlicer(nside=nside, verbose=False)
+        bundle = maf.MetricBundle(metric, slicer, constraint)
+        compute_metric(band_visits, bundle, sqlite=sqlite)
+        if bundle.metric_values is not None:
+            metric_values[this_band] = bundle.metric_values
+
+    return metric_values
+
+
+def compute_hpix_metric_in_bands(
+    visits, metric, constraint="", nside=32, sqlite=None, single_pass=True, max_workers=None
+):
+    """Compute a MAF metric on healpixels, separately for each band.
 
     Parameters
     ----------
@@ -136,6 +511,19 @@ def compute_hpix_metric_in_bands(visits, metric, constraint="", nside=32):
         The SQL query to filter visits to be used.
     nside : `int`
         The healpix nside of the healpix arrays to return.
+    sqlite : `bool` or `None`
+        Round trip the visits through an sqlite3 database, as described in
+        `compute_metric`. If `None`, use sqlite only if ``constraint``
+        is set. Using sqlite disables ``single_pass``.
+    single_pass : `bool`
+        Build the slicer's spatial tree once and evaluate the metric for
+        all bands in one pass over the healpixels, rather than running
+        a separate `maf.MetricBundle` for each band. Ignored if the
+        constraint cannot be translated into a mask in memory.
+    max_workers : `int` or `None`
+        If greater than one, divide the bands among up to this many
+        worker processes. In ``single_pass`` mode, each worker
+        builds one spatial tree for its share of the bands.
 
     Returns
     -------
@@ -146,17 +534,31 @@ def compute_hpix_metric_in_bands(visits, metric, constraint="", nside=32):
     # Do only the filters we actually used
     used_bands = visits[band_column(visits)].unique()
 
-    # If the constraint is set, we need to use sqlite
-    use_sqlite = len(constraint) > 0
+    if sqlite is None:
+        sqlite = _constraints_need_sqlite([constraint])
 
-    bundles = {}
-    for this_band in used_bands:
-        band_visits = visits.query(f"{band_column(visits)} == '{this_band}'")
-        slicer = maf.HealpixSlicer(nside=nside, verbose=False)
-        bundles[this_band] = maf.MetricBundle(metric, slicer, constraint)
-        compute_metric(band_visits, bundles[this_band], sqlite=use_sqlite)
+    single_pass = single_pass and not sqlite and _constraints_translatable(visits, [constraint])
+    num_groups = 1 if max_workers is None else max(1, min(max_workers, len(used_bands)))
+    if single_pass:
+        compute_band_group = partial(_compute_hpix_metric_single_pass, visits, metric, constraint, nside)
+        band_groups = [list(bands) for bands in np.array_split(used_bands, num_groups)]
+    else:
+        compute_band_group = partial(
+            _compute_hpix_metric_by_band, visits, metric, constraint, nside, sqlite=sqlite
+        )
+        band_groups = [[band] for band in used_bands]
+
+    if num_groups > 1:
+        with ProcessPoolExecutor(max_workers=num_groups) as executor:
+            group_values = list(executor.map(compute_band_group, band_groups))
+    else:
+        group_values = [compute_band_group(bands) for bands in band_groups]
 
-    metric_values = {b: bundles[b].metric_values for b in bundles if bundles[b].metric_values is not None}
+    # Return the bands in the order in which they first appear in the visits.
+    all_values = {}
+    for these_values in group_values:
+        all_values.update(these_values)
+    metric_values = {b: all_values[b] for b in used_bands if b in all_values}
 
     return metric_values
 
@@ -206,6 +608,12 @@ def compute_scalar_metric_at_one_mjd(
     if len(visits) == 0:
         raise ValueError("No visits")
 
+    return _compute_scalar_metric_of_sim_data(
+        visits.to_records(index=False), slicer, metric, summary_metric, run_name
+    )
+
+
+def _compute_scalar_metric_of_sim_data(sim_data, slicer, metric, summary_metric=None, run_name=None):
     if run_name is None:
         run_name = "Run" + datetime.datetime.now().isoformat()
 
@@ -223,7 +631,9 @@ def compute_scalar_metric_at_one_mjd(
             run_name=run_name,
         )
 
-    compute_metric(visits, bundle, sqlite=False)
+    with TemporaryDirectory() as working_dir:
+        bundle_group = maf.MetricBundleGroup([bundle], None, out_dir=working_dir)
+        bundle_group.run_current(None, sim_data=sim_data)
 
     if summary_metric is None:
         metric_name = metric.name
@@ -241,9 +651,17 @@ def compute_scalar_metric_at_one_mjd(
     return {metric_name: metric_values[0]}
 
 
+def _slice_points_independent_of_data(slicer):
+    # Slicers whose slice points are set up the same way regardless of the
+    # visits, such that setting them up once with all visits is equivalent
+    # to setting them up separately with each subset.
+    return isinstance(slicer, (maf.HealpixSlicer, maf.UniSlicer))
+
+
 def compute_scalar_metric_at_mjds(
     mjds: Sequence[float],
     *args: Any,
+    incremental: bool | None = None,
     **kwargs: Any,
 ) -> pd.Series:
     """Compute a scalar MAF metric at multiple modified Julian dates.
@@ -254,6 +672,15 @@ def compute_scalar_metric_at_mjds(
         The MJDs to use as cutoffs for visits.
     *args : `Any`
         Positional arguments to pass to `compute_scalar_metric_at_one_mjd`.
+    incremental : `bool` or `None`, optional
+        Use `compute_scalar_metric_at_sorted_mjds`, which reuses the
+        slicer and adds visits incrementally between cutoffs, rather
+        than computing the metric independently at each MJD.
+        If `None` (the default), do so only if ``mjds`` is sorted and the
+        slicer's slice points do not depend on the visits (a
+        `maf.HealpixSlicer` or `maf.UniSlicer`), because otherwise the
+        slice points set up from all visits differ from those set up from
+        the visits before each cutoff.
     **kwargs : `Any`
         Keyword arguments to pass to `compute_scalar_metric_at_one_mjd`.
 
@@ -267,6 +694,16 @@ def compute_scalar_metric_at_mjds(
     compute_scalar_metric_at_one_mjd
         The function used to compute the metric at each individual MJD.
     """
+    if incremental is None:
+        bound_arguments = inspect.signature(compute_scalar_metric_at_one_mjd).bind(None, *args, **kwargs)
+        slicer = bound_arguments.arguments["slicer"]
+        incremental = _slice_points_independent_of_data(slicer) and bool(
+            np.all(np.diff(np.asarray(mjds, dtype=float)) >= 0)
+        )
+
+    if incremental:
+        return compute_scalar_metric_at_sorted_mjds(mjds, *args, **kwargs)
+
     metric_values = []
     name = None
     mjds_with_data = []
@@ -288,40 +725,268 @@ def compute_scalar_metric_at_mjds(
     return metric_values
 
 
-def compute_mixed_scalar_metric(
-    start_visits: pd.DataFrame,
-    end_visits: pd.DataFrame,
-    transition_mjds: Sequence[float],
-    *args,
+def _metric_accumulator(metric, sim_data):
+    # For metrics whose value over a set of visits is a function of a sum
+    # over those visits, return the per-visit terms of that sum and
+    # the function that turns the sum into the metric value.
+    # Subclasses might override ``run``, so require exact types.
+    metric_type = type(metric)
+    if metric_type is maf.CountMetric:
+        return np.ones(len(sim_data)), lambda total: total
+    if metric_type is maf.SumMetric:
+        return np.asarray(sim_data[metric.colname], dtype=float), lambda total: total
+    if metric_type is maf.CountExplimMetric:
+        exposures = np.round(sim_data[metric.exp_col] / metric.expected_exp)
+        exposures[sim_data[metric.exp_col] < metric.min_exp] = 0
+        return exposures, lambda total: total
+    if metric_type is maf.Coaddm5Metric and metric.filter_name is None:
+        return 10.0 ** (0.8 * sim_data[metric.m5_col]), lambda total: 1.25 * np.log10(total)
+    return None
+
+
+def _metric_values_over_visit_ranges(visit_ranges, sim_data, slicer, metric):
+    """Yield metric values for each of a sequence of selections of visits.
+
+    Each selection is a sequence of ``(start, stop)`` ranges of indexes
+    into ``sim_data``, with the same number of ranges in each selection.
+    Stepping from one selection to the next only considers visits that
+    enter or leave the ranges, so a sequence of selections whose ranges
+    move monotonically costs close to one pass over the visits.
+    """
+    slice_points = []
+    slice_idxs = []
+    for slice_i in slicer:
+        slice_points.append(slice_i["slice_point"])
+        slice_idxs.append(np.sort(_slice_indexes(slice_i)))
+    num_slices = len(slice_idxs)
+    slice_sids = np.array([slice_point["sid"] for slice_point in slice_points], dtype=int)
+
+    values = _new_metric_values(metric, slicer)
+    accumulator = _metric_accumulator(metric, sim_data)
+    if accumulator is not None:
+        visit_terms, finalize = accumulator
+        # Each (slice point, visit) pair, sorted by visit, so that the pairs
+        # with visits in any range of indexes are contiguous.
+        pair_slice = np.repeat(np.arange(num_slices), [len(idxs) for idxs in slice_idxs])
+        pair_visit = np.concatenate(slice_idxs) if num_slices > 0 else np.array([], dtype=int)
+        pair_order = np.argsort(pair_visit, kind="stable")
+        pair_slice, pair_visit = pair_slice[pair_order], pair_visit[pair_order]
+        slice_totals = np.zeros(num_slices)
+        slice_counts = np.zeros(num_slices, dtype=int)
+
+        def add_visits(start, stop, sign):
+            if stop <= start:
+                return
+            pairs = slice(*np.searchsorted(pair_visit, [start, stop], side="left"))
+            these_slices = pair_slice[pairs]
+            weights = visit_terms[pair_visit[pairs]]
+            slice_totals[:] += sign * np.bincount(these_slices, weights=weights, minlength=num_slices)
+            slice_counts[:] += sign * np.bincount(these_slices, minlength=num_slices)
+
+    else:
+        slice_bounds = np.zeros((num_slices, 0), dtype=int)
+
+    previous_ranges = None
+    for ranges in visit_ranges:
+        ranges = [(int(start), max(int(start), int(stop))) for start, stop in ranges]
+        if previous_ranges is None:
+            previous_ranges = [(start, start) for start, _ in ranges]
+
+        if accumulator is not None:
+            for (old_start, old_stop), (start, stop) in zip(previous_ranges, ranges):
+                if max(old_start, start) < min(old_stop, stop):
+                    # The ranges overlap, so only move the ends.
+                    if stop > old_stop:
+                        add_visits(old_stop, stop, 1)
+                    else:
+                        add_visits(stop, old_stop, -1)
+                    if start > old_start:
+                        add_visits(old_start, start, -1)
+                    else:
+                        add_visits(start, old_start, 1)
+                else:
+                    add_visits(old_start, old_stop, -1)
+                    add_visits(start, stop, 1)
+            has_visits = slice_counts > 0
+            slice_totals[~has_visits] = 0.0
+            values.data[slice_sids[has_visits]] = finalize(slice_totals[has_visits])
+            values.mask[slice_sids] = ~has_visits
+        else:
+            range_limits = np.array(ranges, dtype=int).ravel()
+            new_slice_bounds = np.array(
+                [np.searchsorted(idxs, range_limits, side="left") for idxs in slice_idxs], dtype=int
+            ).reshape(num_slices, len(range_limits))
+            for slice_index in range(num_slices):
+                these_bounds = new_slice_bounds[slice_index]
+                if np.array_equal(these_bounds, slice_bounds[slice_index]):
+                    continue
+                idxs = np.concatenate(
+                    [slice_idxs[slice_index][start:stop] for start, stop in these_bounds.reshape(-1, 2)]
+                )
+                sid = slice_sids[slice_index]
+                if len(idxs) == 0:
+                    values.mask[sid] = True
+                    continue
+                values.data[sid] = metric.run(sim_data[idxs], slice_point=slice_points[slice_index])
+                values.mask[sid] = False
+            slice_bounds = new_slice_bounds
+
+        previous_ranges = ranges
+        yield _mask_bad_metric_values(values.copy(), metric, slicer)
+
+
+def _scalar_metric_value(bundle, values, summary_metric):
+    if summary_metric is None:
+        these_values = values
+    else:
+        bundle.metric_values = values
+        bundle.summary_values = None
+        bundle.compute_summary_stats()
+        these_values = (
+            tuple(bundle.summary_values.values())
+            if isinstance(bundle.summary_values, Mapping)
+            else bundle.summary_values
+        )
+
+    assert len(these_values) == 1
+    return these_values[0]
+
+
+def _sorted_sim_data(visit_sets, mjd_column, memmappable=False):
+    # Convert DataFrames of visits into numpy structured arrays sorted by
+    # time, all with the same dtype so they can be concatenated.
+    # Columns not present in every set are dropped.
+    columns = [c for c in visit_sets[0].columns if all(c in v.columns for v in visit_sets[1:])]
+
+    column_arrays = []
+    for visits in visit_sets:
+        visits = visits.sort_values(mjd_column, kind="stable")
+        these_arrays = {}
+        for column in columns:
+            values = visits[column]
+            if isinstance(values.dtype, pd.DatetimeTZDtype):
+                values = values.dt.tz_convert("UTC").dt.tz_localize(None)
+            array = values.to_numpy()
+            # Arrays of python objects cannot be memory mapped.
+            these_arrays[column] = array.astype(str) if memmappable and array.dtype.kind == "O" else array
+        column_arrays.append(these_arrays)
+
+    dtype = []
+    for column in columns:
+        try:
+            column_dtype = np.result_type(*[arrays[column].dtype for arrays in column_arrays])
+        except TypeError:
+            column_dtype = np.result_type(*[arrays[column].astype(str).dtype for arrays in column_arrays])
+        dtype.append((str(column), column_dtype))
+
+    sim_data_sets = []
+    for visits, arrays in zip(visit_sets, column_arrays):
+        sim_data = np.empty(len(visits), dtype=dtype)
+        for column in columns:
+            sim_data[str(column)] = arrays[column]
+        sim_data_sets.append(sim_data)
+
+    return sim_data_sets
+
+
+def compute_scalar_metric_at_sorted_mjds(
+    mjds: Sequence[float],
+    visits: pd.DataFrame,
+    slicer: maf.BaseSlicer,
+    metric: maf.BaseMetric,
+    summary_metric: maf.BaseMetric | None = None,
+    run_name: str | None = None,
     mjd_column: str = "observationStartMJD",
-    **kwargs,
 ) -> pd.Series:
-    """Compute a scalar MAF metric at multiple transition MJDs using a
-    visits from `start_visits` up to each transition MJD, and visits
-    from `end_visits` after
+    """Compute a scalar MAF metric at a sorted sequence of modified Julian
+    dates, incrementally.
+
+    The slicer is set up once, and the visits in each slice point are
+    found once, such that stepping from one cutoff to the next only
+    needs to consider the visits between them.
+    For metrics that are functions of sums over visits (`maf.CountMetric`,
+    `maf.SumMetric`, `maf.CountExplimMetric`, and `maf.Coaddm5Metric`),
+    the cost is close to linear in the total number of visits;
+    other metrics are rerun only on slice points that gain visits.
+
+    Because the slicer is set up with all visits before the last cutoff,
+    slicers whose slice points depend on the data (such as a
+    `maf.OneDSlicer` without explicit bins) give different results than
+    independent evaluation at each MJD with `compute_scalar_metric_at_mjds`.
 
     Parameters
     ----------
-    start_visits : `pandas.DataFrame`
-        DataFrame of visits to use before each transition MJD.
-    end_visits : `pandas.DataFrame`
-        DataFrame of visits to use after each transition MJD.
-    transition_mjds : `sequence` of `float`
-        MJDs that define the transition points for combining visits.
+    mjds : `sequence` of `float`
+        The MJDs to use as cutoffs for visits, in increasing order.
+    visits : `pandas.DataFrame`
+        The DataFrame of visits.
+    slicer : `rubin_sim.maf.slicers.BaseSlicer`
+        The slicer to use for computing the metric.
+    metric : `rubin_sim.maf.metrics.BaseMetric`
+        The metric to compute.
+    summary_metric : `rubin_sim.maf.metrics.BaseMetric` or `None`, optional
+        The summary metric to compute.
+    run_name : `str` or `None`, optional
+        The name to use for the run.
     mjd_column : `str`, optional
-        The name of the column containing MJD values.
+        The name of the column containing the MJD values.
         Default is "observationStartMJD".
-    *args : `Any`
-        Positional arguments to pass to `compute_scalar_metric_at_one_mjd`.
-    **kwargs : `Any`
-        Keyword arguments to pass to `compute_scalar_metric_at_one_mjd`.
 
     Returns
     -------
     metric_values : `pandas.Series`
-        A Series with the computed metric values, indexed by the transition
-        MJDs used.
+        A Series with the computed metric values, indexed by the MJDs used.
+        MJDs with no earlier visits are omitted.
+
+    Raises
+    ------
+    ValueError
+        If the MJDs are not in increasing order.
+
+    See Also
+    --------
+    compute_scalar_metric_at_mjds
+        Compute the metric at each MJD independently.
     """
+    mjds = np.asarray(mjds, dtype=float)
+    if np.any(np.diff(mjds) < 0):
+        raise ValueError("MJDs must be in increasing order.")
+
+    if run_name is None:
+        run_name = "Run" + datetime.datetime.now().isoformat()
+
+    summary_metrics = None if summary_metric is None else [summary_metric]
+    bundle = maf.MetricBundle(metric, slicer, summary_metrics=summary_metrics, run_name=run_name)
+    name = metric.name if summary_metric is None else summary_metric.name
+
+    visits = visits.loc[visits[mjd_column] < (mjds[-1] if len(mjds) > 0 else -np.inf), :]
+    if len(visits) == 0:
+        return pd.Series([], index=[], name=name, dtype=float)
+
+    visits = visits.sort_values(mjd_column, kind="stable")
+    sim_data = _setup_slicer_in_memory(visits.to_records(index=False), bundle)
+    num_visits = np.searchsorted(sim_data[mjd_column], mjds, side="left")
+
+    visit_ranges = [[(0, stop)] for stop in num_visits]
+    mjds_with_data = []
+    metric_values = []
+    for mjd, these_num_visits, values in zip(
+        mjds, num_visits, _metric_values_over_visit_ranges(visit_ranges, sim_data, slicer, metric)
+    ):
+        if these_num_visits == 0:
+            continue
+        mjds_with_data.append(mjd)
+        metric_values.append(_scalar_metric_value(bundle, values, summary_metric))
+
+    metric_values = pd.Series(metric_values, index=mjds_with_data, name=name)
+    return metric_values
+
+
+def _compute_mixed_scalar_metric_by_transition(
+    start_visits, end_visits, transition_mjds, *args, mjd_column="observationStartMJD", **kwargs
+):
+    # Set up the slicer separately for each transition, for slicers whose
+    # slice points depend on the visits.
     mjds_with_data = []
     metric_values = []
     name = None
@@ -335,7 +1000,9 @@ def compute_mixed_scalar_metric(
             )
         )
         try:
-            metric_value_dict = compute_scalar_metric_at_one_mjd(*args, visits=visits, **kwargs)
+            metric_value_dict = compute_scalar_metric_at_one_mjd(
+                *args, visits=visits, mjd_column=mjd_column, **kwargs
+            )
         except ValueError:
             continue
 
@@ -352,6 +1019,202 @@ def compute_mixed_scalar_metric(
     return metric_values
 
 
+def compute_mixed_scalar_metric(
+    start_visits: pd.DataFrame,
+    end_visits: pd.DataFrame,
+    transition_mjds: Sequence[float],
+    *args,
+    mjd_column: str = "observationStartMJD",
+    **kwargs,
+) -> pd.Series:
+    """Compute a scalar MAF metric at multiple transition MJDs using a
+    visits from `start_visits` up to each transition MJD, and visits
+    from `end_visits` after
+
+    Parameters
+    ----------
+    start_visits : `pandas.DataFrame`
+        DataFrame of visits to use before each transition MJD.
+    end_visits : `pandas.DataFrame`
+        DataFrame of visits to use after each transition MJD.
+    transition_mjds : `sequence` of `float`
+        MJDs that define the transition points for combining visits.
+    mjd_column : `str`, optional
+        The name of the column containing MJD values.
+        Default is "observationStartMJD".
+    *args : `Any`
+        Positional arguments to pass to `compute_scalar_metric_at_one_mjd`.
+    **kwargs : `Any`
+        Keyword arguments to pass to `compute_scalar_metric_at_one_mjd`.
+
+    Returns
+    -------
+    metric_values : `pandas.Series`
+        A Series with the computed metric values, indexed by the transition
+        MJDs used.
+
+    Notes
+    -----
+    If the slice points of the slicer do not depend on the visits (a
+    `maf.HealpixSlicer` or `maf.UniSlicer`), both sets of visits are
+    converted once to numpy arrays sorted by time, so that the visits in
+    each combination are ranges of indexes found with `numpy.searchsorted`,
+    and no combined tables are built. The metric is evaluated over these
+    ranges as in `compute_scalar_metric_at_sorted_mjds`, so the cost of a
+    long series of sorted transitions grows with the number of transitions
+    plus the number of visits, rather than with their product.
+    In this case, columns not present in both sets of visits are not used.
+
+    With other slicers, a combined table of visits is built, and the metric
+    computed with `compute_scalar_metric_at_one_mjd`, separately for each
+    transition. The combined tables include all columns from either set of
+    visits that are not entirely empty in that combination.
+    """
+    # Interpret the arguments as compute_scalar_metric_at_one_mjd would.
+    bound_arguments = inspect.signature(compute_scalar_metric_at_one_mjd).bind(*args, visits=None, **kwargs)
+    bound_arguments.apply_defaults()
+    arguments = bound_arguments.arguments
+    mjd = arguments["mjd"]
+    slicer = arguments["slicer"]
+    if not _slice_points_independent_of_data(slicer):
+        return _compute_mixed_scalar_metric_by_transition(
+            start_visits, end_visits, transition_mjds, *args, mjd_column=mjd_column, **kwargs
+        )
+
+    metric = arguments["metric"]
+    summary_metric = arguments["summary_metric"]
+    run_name = arguments["run_name"]
+    if run_name is None:
+        run_name = "Run" + datetime.datetime.now().isoformat()
+
+    summary_metrics = None if summary_metric is None else [summary_metric]
+    bundle = maf.MetricBundle(metric, slicer, summary_metrics=summary_metrics, run_name=run_name)
+    name = metric.name if summary_metric is None else summary_metric.name
+
+    start_sim_data, end_sim_data = _sorted_sim_data([start_visits, end_visits], mjd_column)
+    num_start = len(start_sim_data)
+    start_mjds = start_sim_data[mjd_column]
+    end_mjds = end_sim_data[mjd_column]
+    sim_data = _setup_slicer_in_memory(np.concatenate([start_sim_data, end_sim_data]), bundle)
+
+    # Visit the transitions in time order, so that the ranges of visits
+    # used move monotonically, but report them in the order given.
+    transition_mjds = np.asarray(transition_mjds, dtype=float)
+    transition_order = np.argsort(transition_mjds, kind="stable")
+    start_cutoff = np.searchsorted(start_mjds, mjd, side="left")
+    end_cutoff = num_start + np.searchsorted(end_mjds, mjd, side="left")
+    visit_ranges = []
+    for transition_mjd in transition_mjds[transition_order]:
+        start_stop = min(np.searchsorted(start_mjds, transition_mjd, side="right"), start_cutoff)
+        end_start = min(num_start + np.searchsorted(end_mjds, transition_mjd, side="right"), end_cutoff)
+        visit_ranges.append([(0, start_stop), (end_start, end_cutoff)])
+
+    values_by_transition = {}
+    for transition_index, ranges, values in zip(
+        transition_order,
+        visit_ranges,
+        _metric_values_over_visit_ranges(visit_ranges, sim_data, slicer, metric),
+    ):
+        if sum(stop - start for start, stop in ranges) > 0:
+            values_by_transition[transition_index] = _scalar_metric_value(bundle, values, summary_metric)
+
+    mjds_with_data = [transition_mjds[i] for i in range(len(transition_mjds)) if i in values_by_transition]
+    metric_values = [
+        values_by_transition[i] for i in range(len(transition_mjds)) if i in values_by_transition
+    ]
+    metric_values = pd.Series(metric_values, index=mjds_with_data, name=name)
+    return metric_values
+
+
+_SHARED_VISIT_ARRAYS = {}
+
+
+def _make_maf_args(slicer_factory, metric_factory, summary_metric_factory=None):
+    args = {"slicer": slicer_factory(), "metric": metric_factory()}
+    if summary_metric_factory is not None:
+        assert isinstance(summary_metric_factory, Callable)
+        args["summary_metric"] = summary_metric_factory()
+    return args
+
+
+def _write_shared_visit_arrays(visit_sets, mjd_column, working_dir):
+    # Write each set of visits as a time sorted numpy structured array
+    # that worker processes can memory map, rather than receiving a
+    # pickled copy of each DataFrame with each task.
+    paths = []
+    for set_index, sim_data in enumerate(_sorted_sim_data(visit_sets, mjd_column, memmappable=True)):
+        path = Path(working_dir).joinpath(f"visits{set_index}.npy").as_posix()
+        np.save(path, sim_data)
+        paths.append(path)
+
+    return paths
+
+
+def _shared_visit_array(path):
+    # Map each array only once in each worker process.
+    if path not in _SHARED_VISIT_ARRAYS:
+        _SHARED_VISIT_ARRAYS[path] = np.load(path, mmap_mode="r")
+    return _SHARED_VISIT_ARRAYS[path]
+
+
+def _compute_progress_series(series, mjds, visit_paths, end_mjd, maf_args):
+    # Evaluate a whole series in one worker, so that it can use the same
+    # incremental evaluation over sorted MJDs as the serial computation.
+    visits = {key: pd.DataFrame(_shared_visit_array(path)) for key, path in visit_paths.items()}
+    match series:
+        case "snapshot":
+            return compute_scalar_metric_at_mjds(mjds, visits=visits["completed"], **maf_args())
+        case "baseline":
+            return compute_scalar_metric_at_mjds(mjds, visits=visits["baseline"], **maf_args())
+        case "chimera":
+            return compute_mixed_scalar_metric(
+                visits["completed"], visits["baseline"], transition_mjds=mjds, mjd=end_mjd, **maf_args()
+            )
+        case _:
+            raise ValueError(f"Unknown series {series}")
+
+
+def _compute_progress_in_parallel(
+    completed_visits, baseline_visits, series_mjds, end_mjd, maf_args, max_workers, mjd_column
+):
+    series_visit_keys = {
+        "snapshot": ["completed"],
+        "baseline": ["baseline"],
+        "chimera": ["completed", "baseline"],
+    }
+
+    with TemporaryDirectory() as working_dir:
+        completed_path, baseline_path = _write_shared_visit_arrays(
+            [completed_visits, baseline_visits], mjd_column, working_dir
+        )
+        paths = {"completed": completed_path, "baseline": baseline_path}
+
+        executor = ProcessPoolExecutor(max_workers=min(max_workers, len(series_mjds)))
+        try:
+            futures = {
+                executor.submit(
+                    _compute_progress_series,
+                    series,
+                    mjds,
+                    {key: paths[key] for key in series_visit_keys[series]},
+                    end_mjd,
+                    maf_args,
+                ): series
+                for series, mjds in series_mjds.items()
+            }
+            results = {}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        except BaseException:
+            # On any failure or interruption, abandon work not yet started.
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+        executor.shutdown(wait=True)
+
+    # Return the series in the order given, independent of completion order.
+    return {series: results[series] for series in series_mjds}
+
+
 def make_metric_progress_df(
     completed_visits: pd.DataFrame,
     baseline_visits: pd.DataFrame,
@@ -362,6 +1225,7 @@ def make_metric_progress_df(
     metric_factory: Callable[[], maf.BaseMetric],
     summary_metric_factory: Callable[[], maf.BaseMetric] | None = None,
     freq: dict | str = "MS",
+    max_workers: int | None = None,
 ) -> pd.DataFrame:
     """Compute metric values over time for completed, baseline, and mixed
     (chimera) sets of visits.
@@ -393,6 +1257,16 @@ def make_metric_progress_df(
         to `pandas.date_range`. If a string, it's used for both
         completed and future dates. If a dict, it should have 'completed'
         and 'future' keys. Default is "MS" (month start).
+    max_workers : `int` or `None`, optional
+        If greater than one, compute the snapshot, baseline, and chimera
+        series in up to this many (at most three) worker processes, each
+        evaluating all dates of its series as the serial computation does.
+        Workers read the visits from memory mapped arrays rather than
+        receiving pickled DataFrames, so the factories must be picklable
+        (e.g. classes or `functools.partial`, but not lambdas). Results
+        are ordered as in the serial computation, and pending series are
+        cancelled if one fails or the computation is interrupted.
+        Default is `None` (compute serially in this process).
 
     Returns
     -------
@@ -429,12 +1303,9 @@ def make_metric_progress_df(
         timestamps[timeframe] = pd.date_range(
             start=start_dayobs.date, end=end_dayobs.date, freq=freq[timeframe]
         )
-        dayobs_end_mjds[timeframe] = np.array(
-            [DayObs.from_date(d).end.mjd for d in timestamps[timeframe].date]
-        )
-        dayobs_start_mjds[timeframe] = np.array(
-            [DayObs.from_date(d).start.mjd for d in timestamps[timeframe].date]
-        )
+        timeframe_dayobs = DayObsArray.from_dates(timestamps[timeframe])
+        dayobs_end_mjds[timeframe] = timeframe_dayobs.end_mjd
+        dayobs_start_mjds[timeframe] = timeframe_dayobs.start_mjd
 
     max_completed_mjd = last_completed_dayobs.end.mjd
     dayobs_end_mjds["completed"] = dayobs_end_mjds["completed"][
@@ -443,20 +1314,36 @@ def make_metric_progress_df(
     dayobs_end_mjds["future"] = dayobs_end_mjds["future"][dayobs_start_mjds["future"] > max_completed_mjd]
     dayobs_end_mjds["all"] = np.concatenate([dayobs_end_mjds["completed"], dayobs_end_mjds["future"]])
 
-    dates = pd.to_datetime([DayObs.from_time(end_mjd - 0.1).date for end_mjd in dayobs_end_mjds["all"]])
-    jds = np.array([DayObs(d).jd for d in dates])
+    all_dayobs = DayObsArray.from_times(dayobs_end_mjds["all"] - 0.1)
+    dates = pd.to_datetime(all_dayobs.date.tolist())
+    jds = all_dayobs.jd
     metric_values = pd.DataFrame(
         {"date": dates, "jd": jds}, index=pd.Index(dayobs_end_mjds["all"], name="mjd")
     )
 
     # create a helper function to make it easier to avoid trying to call
-    # summary_metric_factory when there isn't one.
-    def maf_args():
-        args = {"slicer": slicer_factory(), "metric": metric_factory()}
-        if summary_metric_factory is not None:
-            assert isinstance(summary_metric_factory, Callable)
-            args["summary_metric"] = summary_metric_factory()
-        return args
+    # summary_metric_factory when there isn't one. Use a partial of a
+    # module level function so that it can be sent to worker processes.
+    maf_args = partial(_make_maf_args, slicer_factory, metric_factory, summary_metric_factory)
+
+    if max_workers is not None and max_workers > 1:
+        series_values = _compute_progress_in_parallel(
+            completed_visits,
+            baseline_visits,
+            {
+                "snapshot": dayobs_end_mjds["completed"],
+                "baseline": dayobs_end_mjds["all"],
+                "chimera": dayobs_end_mjds["completed"],
+            },
+            end_dayobs.mjd,
+            maf_args,
+            max_workers,
+            "observationStartMJD",
+        )
+        for series, values in series_values.items():
+            metric_values[series] = values
+        metric_values.set_index("jd", inplace=True)
+        return metric_values
 
     metric_values["snapshot"] = compute_scalar_metric_at_mjds(
         dayobs_end_mjds["completed"], visits=completed_visits, **maf_args()
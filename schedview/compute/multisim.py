@@ -1,14 +1,372 @@
-import itertools
-import math
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
 import healpy as hp
 import numpy as np
 import pandas as pd
+import scipy.sparse
 
 from schedview import band_column
 
+FIELD_KEY_BANDS = ("u", "g", "r", "i", "z", "y")
+FIELD_KEY_COLUMN = "fieldKey"
+FIELD_KEY_MAX_NSIDE = 2**18
+_FIELD_KEY_BAND_BITS = 3
+_FIELD_KEY_EXPTIME_BITS = 20
+_FIELD_KEY_EXPTIME_STEPS_PER_SECOND = 100
 
-def often_repeated_fields(visits: pd.DataFrame, min_counts: int = 4):
+
+def encode_field_key(visits: pd.DataFrame, nside: int = 2**18) -> pd.Series:
+    """Pack the healpixel, band, and exposure time of visits into integers.
+
+    Parameters
+    ----------
+    visits : `pd.DataFrame`
+        Visits with ``visitExposureTime``, a band column (``band`` or
+        ``filter``), and either ``fieldHpid`` or both ``fieldRA`` and
+        ``fieldDec`` (in degrees).
+    nside : `int`
+        The healpix nside of the pixel ids, at most ``2**18``.
+        By default ``2**18``.
+
+    Returns
+    -------
+    field_key : `pd.Series`
+        An ``int64`` key for each visit, named `FIELD_KEY_COLUMN`, equal
+        for visits whose pointings fall in the same healpixel and which
+        have the same band and exposure time (to 0.01 seconds).
+
+    Notes
+    -----
+    The healpix id occupies the high bits of the key, followed by three
+    bits for the band and twenty for the exposure time, so keys sort by
+    healpix id first. Use `decode_field_key` to recover the components.
+    """
+    if nside > FIELD_KEY_MAX_NSIDE:
+        raise ValueError(f"nside must be at most {FIELD_KEY_MAX_NSIDE} to fit in a field key.")
+
+    if "fieldHpid" in visits.columns:
+        hpid = visits["fieldHpid"].to_numpy().astype(np.int64)
+    else:
+        hpid = hp.ang2pix(nside, visits["fieldRA"].to_numpy(), visits["fieldDec"].to_numpy(), lonlat=True)
+
+    band_code = pd.Categorical(visits[band_column(visits)], categories=FIELD_KEY_BANDS).codes.astype(np.int64)
+    if np.any(band_code < 0):
+        raise ValueError(f"Field keys can only encode bands in {FIELD_KEY_BANDS}.")
+
+    exptime_steps = np.round(visits["visitExposureTime"].to_numpy() * _FIELD_KEY_EXPTIME_STEPS_PER_SECOND)
+    if not np.all((exptime_steps >= 0) & (exptime_steps < 2**_FIELD_KEY_EXPTIME_BITS)):
+        raise ValueError("Exposure times out of the range that can be encoded in a field key.")
+
+    field_key = (
+        (hpid << (_FIELD_KEY_BAND_BITS + _FIELD_KEY_EXPTIME_BITS))
+        | (band_code << _FIELD_KEY_EXPTIME_BITS)
+        | exptime_steps.astype(np.int64)
+    )
+    return pd.Series(field_key, index=visits.index, name=FIELD_KEY_COLUMN)
+
+
+def decode_field_key(field_key: np.ndarray | pd.Series, nside: int = 2**18) -> pd.DataFrame:
+    """Unpack integer field keys made by `encode_field_key`.
+
+    Parameters
+    ----------
+    field_key : `np.ndarray` or `pd.Series`
+        The keys to decode.
+    nside : `int`
+        The healpix nside with which the keys were encoded.
+        By default ``2**18``.
+
+    Returns
+    -------
+    fields : `pd.DataFrame`
+        A table with one row for each key, and columns ``fieldHpid``,
+        ``hp_ra`` and ``hp_decl`` (the coordinates of the healpixel center,
+        in degrees), ``band``, and ``visitExposureTime``.
+    """
+    field_key = np.asarray(field_key, dtype=np.int64)
+    hpid = field_key >> (_FIELD_KEY_BAND_BITS + _FIELD_KEY_EXPTIME_BITS)
+    band_code = (field_key >> _FIELD_KEY_EXPTIME_BITS) & (2**_FIELD_KEY_BAND_BITS - 1)
+    exptime_steps = field_key & (2**_FIELD_KEY_EXPTIME_BITS - 1)
+    ra, decl = hp.pix2ang(nside, hpid, lonlat=True)
+    fields = pd.DataFrame(
+        {
+            "fieldHpid": hpid,
+            "hp_ra": ra,
+            "hp_decl": decl,
+            "band": np.array(FIELD_KEY_BANDS)[band_code],
+            "visitExposureTime": exptime_steps / _FIELD_KEY_EXPTIME_STEPS_PER_SECOND,
+        }
+    )
+    return fields
+
+
+def _field_codes(
+    visits: pd.DataFrame, visit_spec_columns: tuple[str, ...], nside: int = 2**18
+) -> tuple[np.ndarray, pd.Index]:
+    """Number the distinct fields visited.
+
+    Parameters
+    ----------
+    visits : `pd.DataFrame`
+        The visits.
+    visit_spec_columns : `tuple`[`str`]
+        Columns that, together, uniquely identify a field. If fieldHpid is
+        included but not a column, it is computed from fieldRA and fieldDec,
+        and replaced by ``hp_ra`` and ``hp_decl`` in the returned index.
+    nside : `int`, optional
+        nside to use if fieldHpid is to be computed on the fly,
+        by default ``2**18``.
+
+    Returns
+    -------
+    field_code : `np.ndarray`
+        The field of each visit, numbered from 0, or -1 if it is undefined.
+    field_index : `pd.Index`
+        The values of the field spec columns for each field number.
+
+    Notes
+    -----
+    If the field spec is a healpixel, band, and exposure time, visits are
+    numbered by a single integer field key rather than by grouping on the
+    separate columns.
+    A ``fieldKey`` column (such as that added by
+    `schedview.collect.multisim.read_multiple_prenights`) is used in place
+    of computing the keys only when the healpixels are to be computed from
+    ``fieldRA`` and ``fieldDec`` with an ``nside`` of `FIELD_KEY_MAX_NSIDE`:
+    by contract, a ``fieldKey`` column always holds keys made by
+    `encode_field_key` from ``fieldRA`` and ``fieldDec`` with that
+    ``nside``.
+    """
+    hpid_present = "fieldHpid" in visits.columns
+    if hpid_present or "fieldHpid" not in visit_spec_columns:
+        index_names = list(visit_spec_columns)
+    else:
+        index_names = [c for c in visit_spec_columns if c != "fieldHpid"] + ["hp_ra", "hp_decl"]
+
+    if set(visit_spec_columns) == {"fieldHpid", band_column(visits), "visitExposureTime"}:
+        try:
+            if (
+                FIELD_KEY_COLUMN in visits.columns
+                and not hpid_present
+                and nside == FIELD_KEY_MAX_NSIDE
+                and visits[FIELD_KEY_COLUMN].dtype == np.int64
+            ):
+                field_key = visits[FIELD_KEY_COLUMN].to_numpy()
+            else:
+                field_key = encode_field_key(visits, nside).to_numpy()
+        except ValueError:
+            pass
+        else:
+            unique_field_keys, field_code = np.unique(field_key, return_inverse=True)
+            fields = decode_field_key(unique_field_keys, nside).rename(columns={"band": band_column(visits)})
+            fields["visitExposureTime"] = fields["visitExposureTime"].astype(
+                visits["visitExposureTime"].dtype
+            )
+            return field_code, pd.MultiIndex.from_frame(fields.loc[:, index_names])
+
+    if not hpid_present and "fieldHpid" in visit_spec_columns:
+        visits = visits.copy()
+        hpid = hp.ang2pix(nside, visits.fieldRA, visits.fieldDec, lonlat=True)
+        ra, decl = hp.pix2ang(nside, hpid, lonlat=True)
+        visits["hp_ra"] = ra
+        visits["hp_decl"] = decl
+
+    grouped_visits = visits.groupby(index_names)
+    return grouped_visits.ngroup().to_numpy(), grouped_visits.size().index
+
+
+def cluster_pointings(
+    ra: np.ndarray, decl: np.ndarray, tolerance: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Group pointings that are close together on the sky into fields.
+
+    Parameters
+    ----------
+    ra : `np.ndarray`
+        R.A. of the pointings, in degrees.
+    decl : `np.ndarray`
+        Declinations of the pointings, in degrees.
+    tolerance : `float`
+        The maximum angle, in degrees, between a pointing and the seed
+        pointing of its field.
+
+    Returns
+    -------
+    field_id : `np.ndarray`
+        A compact integer id (from 0 to the number of fields - 1) of the
+        field of each pointing.
+    field_ra : `np.ndarray`
+        The R.A. of the center of each field, in degrees, indexed by id.
+    field_decl : `np.ndarray`
+        The declination of the center of each field, in degrees, indexed
+        by id.
+
+    Notes
+    -----
+    Pointings are hashed into healpixels at least twice the tolerance
+    across, so only pointings in the same or neighboring healpixels need
+    to be compared.
+
+    Seed pointings are chosen greedily, most often used first, from the
+    pointings not within the tolerance of an earlier seed, and every
+    pointing is assigned to the field of its nearest seed. Pointings in
+    a field are therefore no more than twice the tolerance apart, even
+    where a chain of pointings each within the tolerance of the next
+    extends much further.
+    """
+    ra = np.asarray(ra, dtype=float)
+    decl = np.asarray(decl, dtype=float)
+    unique_coords, pointing_index = np.unique(np.stack([ra, decl], axis=1), axis=0, return_inverse=True)
+    pointing_index = pointing_index.ravel()
+    num_points = len(unique_coords)
+    vectors = hp.ang2vec(unique_coords[:, 0], unique_coords[:, 1], lonlat=True).reshape(-1, 3)
+
+    nside = 1
+    while nside < 2**29 and hp.nside2resol(2 * nside) >= 2 * np.radians(tolerance):
+        nside *= 2
+    hpid = hp.vec2pix(nside, vectors[:, 0], vectors[:, 1], vectors[:, 2])
+    point_order = np.argsort(hpid)
+    sorted_hpid = hpid[point_order]
+
+    # Candidate pairs of each point with every point in its own or a
+    # neighboring healpixel.
+    neighbors = np.vstack([hpid, hp.get_all_neighbours(nside, hpid)])
+    points = np.broadcast_to(np.arange(num_points), neighbors.shape).ravel()
+    neighbors = neighbors.ravel()
+    cell_starts = np.searchsorted(sorted_hpid, neighbors, side="left")
+    cell_counts = np.where(
+        neighbors >= 0, np.searchsorted(sorted_hpid, neighbors, side="right") - cell_starts, 0
+    )
+    first_point = np.repeat(points, cell_counts)
+    second_point = point_order[
+        np.arange(np.sum(cell_counts))
+        - np.repeat(np.cumsum(cell_counts) - cell_counts, cell_counts)
+        + np.repeat(cell_starts, cell_counts)
+    ]
+
+    cos_separation = np.einsum("ij,ij->i", vectors[first_point], vectors[second_point])
+    # Always pair each pointing with itself, even if rounding puts it
+    # beyond a tolerance of zero.
+    close = (cos_separation >= np.cos(np.radians(tolerance))) | (first_point == second_point)
+    first_point, second_point, cos_separation = first_point[close], second_point[close], cos_separation[close]
+    # Each row lists the pointings paired with that row's pointing.
+    paired_points = scipy.sparse.csr_array(
+        (np.ones(len(first_point), dtype=bool), (second_point, first_point)),
+        shape=(num_points, num_points),
+    )
+
+    # Take the most often used pointing not yet within the tolerance of a
+    # seed as the next seed, so that chains of nearby pointings are split
+    # rather than merged into one field.
+    pointing_counts = np.bincount(pointing_index, minlength=num_points)
+    is_seed = np.zeros(num_points, dtype=bool)
+    covered = np.zeros(num_points, dtype=bool)
+    for point in np.argsort(-pointing_counts, kind="stable"):
+        if not covered[point]:
+            is_seed[point] = True
+            row_start, row_stop = paired_points.indptr[point : point + 2]
+            covered[paired_points.indices[row_start:row_stop]] = True
+
+    # Assign each pointing to its nearest seed.
+    to_seed = is_seed[second_point]
+    first_point, second_point = first_point[to_seed], second_point[to_seed]
+    cos_separation = cos_separation[to_seed]
+    pair_order = np.lexsort((-cos_separation, first_point))
+    nearest = pair_order[np.searchsorted(first_point[pair_order], np.arange(num_points), side="left")]
+    seed_field = np.cumsum(is_seed) - 1
+    point_field = seed_field[second_point[nearest]]
+
+    field_vectors = np.zeros((np.max(point_field, initial=-1) + 1, 3))
+    np.add.at(field_vectors, point_field, vectors)
+    field_ra, field_decl = hp.vec2ang(field_vectors, lonlat=True)
+
+    return point_field[pointing_index], field_ra, field_decl
+
+
+SIM_METADATA_COLUMNS = (
+    "label",
+    "config_url",
+    "scheduler_version",
+    "sim_runner_kwargs",
+    "sim_creation_day_obs",
+    "tags",
+    "visitseq_uuid",
+)
+
+
+def normalize_sim_metadata(
+    visits: pd.DataFrame,
+    sim_identifier_column: str = "sim_index",
+    metadata_columns: tuple[str, ...] = SIM_METADATA_COLUMNS,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Split per-simulation metadata out of a table of visits.
+
+    Parameters
+    ----------
+    visits : `pd.DataFrame`
+        Visits from one or more simulations, with the metadata for each
+        simulation repeated on each of its visits.
+    sim_identifier_column : `str`, optional
+        Column that identifies the simulation of each visit,
+        by default "sim_index".
+    metadata_columns : `tuple`[`str`], optional
+        Columns with values that are the same for all visits in a
+        simulation. Those not in ``visits`` are ignored.
+        By default, `SIM_METADATA_COLUMNS`.
+
+    Returns
+    -------
+    visits : `pd.DataFrame`
+        The visits, without the metadata columns.
+    simulations : `pd.DataFrame`
+        The metadata columns, with one row per simulation, indexed by
+        ``sim_identifier_column``.
+    """
+    metadata_columns = tuple(c for c in metadata_columns if c in visits.columns)
+    first_visit_of_sim = ~visits[sim_identifier_column].duplicated().to_numpy()
+    simulations = (
+        visits.loc[first_visit_of_sim, [sim_identifier_column, *metadata_columns]]
+        .set_index(sim_identifier_column)
+        .sort_index()
+    )
+    return visits.drop(columns=list(metadata_columns)), simulations
+
+
+def join_sim_metadata(
+    visits: pd.DataFrame,
+    simulations: pd.DataFrame,
+    columns: list[str] | tuple[str, ...] | None = None,
+    sim_identifier_column: str = "sim_index",
+) -> pd.DataFrame:
+    """Add per-simulation metadata columns to a table of visits.
+
+    Parameters
+    ----------
+    visits : `pd.DataFrame`
+        Visits with a column identifying the simulation of each.
+    simulations : `pd.DataFrame`
+        Per-simulation metadata, indexed by simulation identifier,
+        as returned by `normalize_sim_metadata`.
+    columns : `list` [`str`] or `tuple` [`str`] or `None`, optional
+        The metadata columns to add. If ``None``, add all of them.
+    sim_identifier_column : `str`, optional
+        Column that identifies the simulation of each visit,
+        by default "sim_index".
+
+    Returns
+    -------
+    visits : `pd.DataFrame`
+        A copy of ``visits`` with the requested metadata columns added.
+    """
+    if columns is None:
+        columns = list(simulations.columns)
+
+    sim_ids = visits[sim_identifier_column]
+    return visits.assign(**{column: sim_ids.map(simulations[column]) for column in columns})
+
+
+def often_repeated_fields(visits: pd.DataFrame, min_counts: int = 4, tolerance: float | None = None):
     """Find often repeated fields in a table of visits.
 
     Parameters
@@ -31,6 +389,11 @@ def often_repeated_fields(visits: pd.DataFrame, min_counts: int = 4):
     min_counts : `int`
         The minimum visits in a single simulation a field must have to be
         considererd "often visited".
+    tolerance : `float` or `None`, optional
+        If ``None`` (the default), a field is an exact ``fieldRA`` and
+        ``fieldDec`` pair. Otherwise, pointings within this angle (in degrees)
+        of each other are grouped into fields with `cluster_pointings`, and
+        the reported ``fieldRA`` and ``fieldDec`` are the field centers.
 
     Returns
     -------
@@ -75,6 +438,10 @@ def often_repeated_fields(visits: pd.DataFrame, min_counts: int = 4):
     to specific fields for which the specific pointing and filter combinations
     are of particular interest (e.g. DDF fields).
     """
+    if tolerance is not None:
+        field_id, field_ra, field_decl = cluster_pointings(visits.fieldRA, visits.fieldDec, tolerance)
+        visits = visits.assign(fieldRA=field_ra[field_id], fieldDec=field_decl[field_id])
+
     field_repeats: pd.DataFrame = visits.groupby(
         ["fieldRA", "fieldDec", band_column(visits), "sim_index"]
     ).agg({"start_timestamp": ["count", "min", "max"], "label": "first"})
@@ -146,26 +513,17 @@ def count_visits_by_sim(
     if "filter" in visit_spec_columns and "filter" not in visits.columns:
         visit_spec_columns = tuple("band" if c == "filter" else c for c in visit_spec_columns)
 
-    if "fieldHpid" in visit_spec_columns and "fieldHpid" not in visits.columns:
-        visits = visits.copy()
-        hpid = hp.ang2pix(nside, visits.fieldRA, visits.fieldDec, lonlat=True)
-        ra, decl = hp.pix2ang(nside, hpid, lonlat=True)
-        visits["hp_ra"] = ra
-        visits["hp_decl"] = decl
-        visit_spec_columns = tuple(c for c in visit_spec_columns if c != "fieldHpid") + ("hp_ra", "hp_decl")
-
-    grouping_columns = [sim_identifier_column] + list(visit_spec_columns)
-
-    visit_counts = (
-        visits.groupby(grouping_columns)
-        .count()
-        .loc[:, "start_timestamp"]
-        .rename("count")
-        .reset_index()
-        .pivot(index=list(visit_spec_columns), columns=[sim_identifier_column], values="count")
-        .fillna(0)
-        .astype(int)
-    )
+    field_code, field_index = _field_codes(visits, visit_spec_columns, nside)
+    sim_code, sim_values = pd.factorize(visits[sim_identifier_column], sort=True)
+    counted = (field_code >= 0) & (sim_code >= 0) & visits["start_timestamp"].notna().to_numpy()
+    counts = np.bincount(
+        field_code[counted] * len(sim_values) + sim_code[counted],
+        minlength=len(field_index) * len(sim_values),
+    ).reshape(len(field_index), len(sim_values))
+
+    visit_counts = pd.DataFrame(
+        counts, index=field_index, columns=pd.Index(sim_values, name=sim_identifier_column)
+    ).sort_index()
     return visit_counts
 
 
@@ -243,15 +601,141 @@ def make_fraction_common_matrix(
     if sim_indexes is None:
         sim_indexes = list(visit_counts.columns.values)
 
-    common_matrix = pd.DataFrame(np.nan, index=sim_indexes, columns=sim_indexes)
-    for row in sim_indexes:
-        for column in sim_indexes:
-            common_matrix.loc[row, column] = fraction_common(
-                visit_counts, row, column, match_count=match_count
-            )
+    counts = visit_counts.loc[:, sim_indexes].to_numpy().astype(np.int64)
+    num_fields, num_sims = counts.shape
+
+    if match_count:
+        # The sum over fields of min(counts[:, r], counts[:, c]) is the sum
+        # over k of the number of fields with at least k visits in both, so
+        # stack indicators of at least k visits for every k. There is one
+        # nonzero element for each visit.
+        field, sim = np.nonzero(counts)
+        field_counts = counts[field, sim]
+        at_least = np.arange(np.sum(field_counts)) - np.repeat(
+            np.cumsum(field_counts) - field_counts, field_counts
+        )
+        level_indicators = scipy.sparse.csr_array(
+            (
+                np.ones(len(at_least), dtype=np.int64),
+                (at_least * num_fields + np.repeat(field, field_counts), np.repeat(sim, field_counts)),
+            ),
+            shape=(max(np.max(counts, initial=0), 1) * num_fields, num_sims),
+        )
+        num_common_visits = (level_indicators.T @ level_indicators).toarray()
+    else:
+        # Visits in the row simulation can match any number of visits in
+        # the column simulation.
+        present = scipy.sparse.csr_array((counts > 0).astype(np.int64))
+        num_common_visits = np.asarray(present.T @ counts)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fractions = num_common_visits / np.sum(counts, axis=0)
+
+    common_matrix = pd.DataFrame(fractions, index=sim_indexes, columns=sim_indexes)
     return common_matrix
 
 
+def _best_ordered_assignment(score: np.ndarray, allowed: np.ndarray) -> tuple[float, np.ndarray | None]:
+    """Find the best order preserving assignment of one sequence to another.
+
+    Parameters
+    ----------
+    score : `np.ndarray`
+        A (shorter, longer) array with the score for assigning each element
+        of the shorter sequence to each element of the longer one.
+    allowed : `np.ndarray`
+        A boolean array of the same shape, `True` where the assignment is
+        permitted.
+
+    Returns
+    -------
+    total_score : `float`
+        The highest total score of any assignment of every element of the
+        shorter sequence to a distinct element of the longer one, in order.
+        ``-np.inf`` if no allowed assignment exists.
+    assignment : `np.ndarray` or `None`
+        The index in the longer sequence assigned to each element of the
+        shorter one, or `None` if there is no allowed assignment.
+    """
+    num_shorter, num_longer = score.shape
+    allowed_score = np.where(allowed, score, -np.inf)
+
+    # best_score[j] is the highest total for assigning the elements of the
+    # shorter sequence considered so far to the first j of the longer.
+    best_score = np.zeros(num_longer + 1)
+    candidate_score = np.full((num_shorter, num_longer), -np.inf)
+    for shorter_index in range(num_shorter):
+        candidate_score[shorter_index] = best_score[:-1] + allowed_score[shorter_index]
+        best_score = np.concatenate([[-np.inf], np.maximum.accumulate(candidate_score[shorter_index])])
+
+    total_score = best_score[-1]
+    if not np.isfinite(total_score):
+        return total_score, None
+
+    assignment = np.empty(num_shorter, dtype=int)
+    longer_bound = num_longer
+    for shorter_index in range(num_shorter - 1, -1, -1):
+        assignment[shorter_index] = np.argmax(candidate_score[shorter_index, :longer_bound])
+        longer_bound = assignment[shorter_index]
+
+    return total_score, assignment
+
+
+def _match_sorted_times(
+    longer_ns: np.ndarray, shorter_ns: np.ndarray, max_match_dist: float = np.inf
+) -> tuple[np.ndarray, np.ndarray]:
+    """Find the best ordered pairing of two sorted sequences of times.
+
+    Parameters
+    ----------
+    longer_ns : `np.ndarray`
+        Sorted times, as integer nanoseconds, of the longer sequence.
+    shorter_ns : `np.ndarray`
+        Sorted times, as integer nanoseconds, of the shorter sequence.
+    max_match_dist : `float`, optional
+        The maximum time difference for a match, in seconds,
+        by default np.inf
+
+    Returns
+    -------
+    assignment : `np.ndarray`
+        The index into ``longer_ns`` paired with each element of
+        ``shorter_ns``.
+    delta : `np.ndarray`
+        The time differences (shorter - longer) of the pairs, in seconds.
+    """
+    # Time differences in seconds between every pair of visits, computed
+    # from integer nanoseconds to avoid rounding large timestamps.
+    delta = (shorter_ns[:, np.newaxis] - longer_ns[np.newaxis, :]) / 1e9
+    abs_delta = np.abs(delta)
+    good = (abs_delta < max_match_dist).astype(float)
+    everything = np.ones_like(good, dtype=bool)
+
+    # Most matches possible
+    most_matches, _ = _best_ordered_assignment(good, everything)
+
+    # Smallest maximum time difference that still allows the most matches
+    thresholds = np.unique(abs_delta)
+    low, high = 0, len(thresholds) - 1
+    while low < high:
+        middle = (low + high) // 2
+        these_matches, _ = _best_ordered_assignment(good, abs_delta <= thresholds[middle])
+        if these_matches >= most_matches:
+            high = middle
+        else:
+            low = middle + 1
+    max_delta = thresholds[low]
+
+    # Smallest mean squared difference given the above, scaling the count
+    # of matches so that it always dominates the sum of squares.
+    squared_delta = np.where(abs_delta <= max_delta, delta**2, 0.0)
+    match_weight = 2.0 * (len(shorter_ns) * max_delta**2 + 1.0)
+    _, assignment = _best_ordered_assignment(good * match_weight - squared_delta, abs_delta <= max_delta)
+    assert assignment is not None
+
+    return assignment, delta[np.arange(len(shorter_ns)), assignment]
+
+
 def match_visits_across_sims(
     start_times: pd.Series, sim_indexes: tuple[int, int] = (1, 2), max_match_dist: float = np.inf
 ) -> pd.DataFrame:
@@ -275,6 +759,19 @@ def match_visits_across_sims(
         A data frame with one row for each matched visits, columns named for
         each simulation index with the start times for the matched visits,
         and a column named ``delta`` with the time difference in seconds.
+
+    Notes
+    -----
+    Each visit in the simulation with fewer visits is paired with a distinct
+    visit in the other, preserving time order. Among such pairings, the one
+    chosen has the most pairs closer than ``max_match_dist``; of those, the
+    smallest maximum time difference; and of those, the smallest mean
+    squared time difference. Pairs closer than ``max_match_dist`` are
+    returned.
+
+    The optimal pairing is found exactly by dynamic programming over the
+    sorted start times, in O(n m log(n m)) time for sequences of lengths
+    n and m.
     """
 
     for sim_index in sim_indexes:
@@ -286,58 +783,224 @@ def match_visits_across_sims(
     else:
         sim_map = {"longer": sim_indexes[1], "shorter": sim_indexes[0]}
 
-    longer = start_times.loc[[sim_map["longer"]]].reset_index(drop=True)
-    shorter = start_times.loc[[sim_map["shorter"]]].reset_index(drop=True)
+    longer = start_times.loc[[sim_map["longer"]]].sort_values().reset_index(drop=True)
+    shorter = start_times.loc[[sim_map["shorter"]]].sort_values().reset_index(drop=True)
 
-    num_combinations = math.comb(len(longer), len(shorter))
-    if num_combinations > 1000:
-        # There are too many combinations to do a complete search in reasonable
-        # time so assume the matches are sequential.
-        def make_seq_iter(num_offsets, sequence_length):
-            for i in range(num_offsets):
-                yield np.arange(sequence_length) + i
+    longer_ns = longer.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    shorter_ns = shorter.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    assignment, delta = _match_sorted_times(longer_ns, shorter_ns, max_match_dist)
 
-        combo_iterator = make_seq_iter(len(longer) - len(shorter), len(shorter))
-    else:
-        combo_iterator = itertools.combinations(np.arange(len(longer)), len(shorter))
-
-    # Use copy here so that the column in the dataframe can be update without
-    # corrupting the origin longer Series.
-    matches = pd.DataFrame({"longer": longer[: len(shorter)].copy(), "shorter": shorter.copy()})
-    best_max_diff = np.inf
-    # msdiff => mean squared difference
-    best_msdiff = np.inf
-    most_matches = 0
-    best_match = None
-    for matched_ids in combo_iterator:
-        these_longer = longer[np.array(matched_ids)].copy()
-        these_longer.index = matches.index
-        matches.loc[:, "longer"] = these_longer
-        matches["delta"] = (matches.shorter - matches.longer).dt.total_seconds()
-        good_matches = matches.query(f"abs(delta) < {max_match_dist}")
-        num_matches = len(good_matches)
-        max_diff = np.abs(matches["delta"]).max()
-
-        # msdiff => mean squared difference
-        msdiff = (matches["delta"] ** 2).mean()
-        if num_matches >= most_matches:
-            if (max_diff < best_max_diff) or (max_diff == best_max_diff and msdiff < best_msdiff):
-                best_match = good_matches.copy().rename(columns=sim_map)
-                best_max_diff = max_diff
-                best_msdiff = msdiff
-                most_matches = num_matches
-
-    assert best_match is not None
+    matches = pd.DataFrame(
+        {
+            "longer": longer.iloc[assignment].reset_index(drop=True),
+            "shorter": shorter,
+            "delta": delta,
+        }
+    )
+    best_match = matches.loc[np.abs(matches["delta"]) < max_match_dist, :].rename(columns=sim_map)
 
     return best_match
 
 
+def _describe_by_group(group: np.ndarray, values: np.ndarray, num_groups: int) -> pd.DataFrame:
+    """Compute the statistics of `pandas.Series.describe` for each group.
+
+    Parameters
+    ----------
+    group : `np.ndarray`
+        The group (an integer from 0 to ``num_groups - 1``) of each value.
+    values : `np.ndarray`
+        The values to describe.
+    num_groups : `int`
+        The number of groups.
+
+    Returns
+    -------
+    stats : `pd.DataFrame`
+        A data frame indexed by group, with a row for each group that has
+        values, and ``count``, ``mean``, ``std``, ``min``, ``25%``, ``50%``,
+        ``75%``, and ``max`` columns.
+    """
+    all_counts = np.bincount(group, minlength=num_groups)
+    all_sums = np.bincount(group, weights=values, minlength=num_groups)
+    groups = np.flatnonzero(all_counts)
+    counts = all_counts[groups]
+    means = all_sums[groups] / counts
+
+    residuals = values - (all_sums / np.maximum(all_counts, 1))[group]
+    sum_squares = np.bincount(group, weights=residuals**2, minlength=num_groups)[groups]
+    stds = np.sqrt(sum_squares / np.maximum(counts - 1, 1))
+    stds[counts < 2] = np.nan
+
+    # Sorting by group, then value, puts each group's values in order in a
+    # contiguous slice, so order statistics are just indexed lookups.
+    sorted_values = values[np.lexsort((values, group))]
+    starts = (np.cumsum(all_counts) - all_counts)[groups]
+
+    stats = pd.DataFrame(
+        {"count": counts.astype(float), "mean": means, "std": stds, "min": sorted_values[starts]},
+        index=groups,
+    )
+    for quantile in (0.25, 0.5, 0.75):
+        position = quantile * (counts - 1)
+        below = np.floor(position).astype(int)
+        above = np.minimum(below + 1, counts - 1)
+        low_value = sorted_values[starts + below]
+        high_value = sorted_values[starts + above]
+        stats[f"{quantile:.0%}"] = low_value + (high_value - low_value) * (position - below)
+    stats["max"] = sorted_values[starts + counts - 1]
+
+    return stats
+
+
+def _match_visit_runs(
+    field_code: np.ndarray,
+    sim_code: np.ndarray,
+    start_ns: np.ndarray,
+    reference_code: int,
+    max_match_dist: float = np.inf,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Match the visits in every simulation with those in a reference.
+
+    Parameters
+    ----------
+    field_code : `np.ndarray`
+        The field of each visit, as a non-negative integer.
+    sim_code : `np.ndarray`
+        The simulation of each visit, as an integer.
+    start_ns : `np.ndarray`
+        The start time of each visit, in integer nanoseconds.
+    reference_code : `int`
+        The value in ``sim_code`` of the reference simulation.
+    max_match_dist : `float`, optional
+        The maximum time difference for a match, in seconds,
+        by default np.inf
+
+    Returns
+    -------
+    reference_position : `np.ndarray`
+        The position in the arrays of the reference visit of each match.
+    comparison_position : `np.ndarray`
+        The position in the arrays of the other visit of each match.
+    delta : `np.ndarray`
+        The time difference of each match in seconds, following the sign
+        convention of `match_visits_across_sims`.
+
+    Notes
+    -----
+    The visits must be sorted by field, then simulation, then time, so that
+    the visits to each field in each simulation form a contiguous run.
+    """
+    is_run_start = np.ones(len(field_code), dtype=bool)
+    is_run_start[1:] = (np.diff(field_code) != 0) | (np.diff(sim_code) != 0)
+    run_starts = np.flatnonzero(is_run_start)
+    run_counts = np.diff(np.append(run_starts, len(field_code)))
+    run_fields = field_code[run_starts]
+    is_reference_run = sim_code[run_starts] == reference_code
+
+    num_fields = np.max(field_code, initial=-1) + 1
+    reference_starts = np.zeros(num_fields, dtype=int)
+    reference_starts[run_fields[is_reference_run]] = run_starts[is_reference_run]
+    reference_counts = np.zeros(num_fields, dtype=int)
+    reference_counts[run_fields[is_reference_run]] = run_counts[is_reference_run]
+
+    comparison_runs = np.flatnonzero(~is_reference_run & (reference_counts[run_fields] > 0))
+    is_single = (run_counts[comparison_runs] == 1) & (reference_counts[run_fields[comparison_runs]] == 1)
+
+    # Runs of one visit matched with one reference visit can only match one
+    # way, so match all of them at once.
+    single_runs = comparison_runs[is_single]
+    reference_position_list = [reference_starts[run_fields[single_runs]]]
+    comparison_position_list = [run_starts[single_runs]]
+    delta_list = [(start_ns[comparison_position_list[0]] - start_ns[reference_position_list[0]]) / 1e9]
+
+    for run in comparison_runs[~is_single]:
+        reference_start = reference_starts[run_fields[run]]
+        reference_positions = np.arange(reference_start, reference_start + reference_counts[run_fields[run]])
+        comparison_positions = np.arange(run_starts[run], run_starts[run] + run_counts[run])
+        if len(reference_positions) >= len(comparison_positions):
+            assignment, these_deltas = _match_sorted_times(
+                start_ns[reference_positions], start_ns[comparison_positions], max_match_dist
+            )
+            reference_positions = reference_positions[assignment]
+        else:
+            assignment, these_deltas = _match_sorted_times(
+                start_ns[comparison_positions], start_ns[reference_positions], max_match_dist
+            )
+            comparison_positions = comparison_positions[assignment]
+        reference_position_list.append(reference_positions)
+        comparison_position_list.append(comparison_positions)
+        delta_list.append(these_deltas)
+
+    reference_position = np.concatenate(reference_position_list)
+    comparison_position = np.concatenate(comparison_position_list)
+    delta = np.concatenate(delta_list)
+    matched = np.abs(delta) < max_match_dist
+    return reference_position[matched], comparison_position[matched], delta[matched]
+
+
+def _compute_matched_delta_stats_for_sim(
+    field_code: np.ndarray,
+    sim_code: np.ndarray,
+    start_ns: np.ndarray,
+    num_fields: int,
+    reference_code: int,
+    comparison_code: int,
+) -> pd.DataFrame:
+    """Compute statistics on matched visit time differences for one sim.
+
+    Parameters
+    ----------
+    field_code : `np.ndarray`
+        The field of each visit, as an integer from 0 to ``num_fields - 1``.
+    sim_code : `np.ndarray`
+        The simulation of each visit, as an integer.
+    start_ns : `np.ndarray`
+        The start time of each visit, in integer nanoseconds.
+    num_fields : `int`
+        The number of fields.
+    reference_code : `int`
+        The value in ``sim_code`` of the reference simulation.
+    comparison_code : `int`
+        The value in ``sim_code`` of the simulation to compare.
+
+    Returns
+    -------
+    delta_stats : `pd.DataFrame`
+        Statistics of the time differences, indexed by field code.
+
+    Notes
+    -----
+    The visits must be sorted by field, then simulation, then time.
+    """
+    in_pair = (sim_code == reference_code) | (sim_code == comparison_code)
+    _, comparison_position, delta = _match_visit_runs(
+        field_code[in_pair], sim_code[in_pair], start_ns[in_pair], reference_code
+    )
+    return _describe_by_group(field_code[in_pair][comparison_position], delta, num_fields)
+
+
+_MATCHED_DELTA_ARGS = {}
+
+
+def _set_matched_delta_args(**kwargs):
+    # Run once in each worker process, so that the visit arrays are sent
+    # to each worker once, rather than with every comparison simulation.
+    _MATCHED_DELTA_ARGS.clear()
+    _MATCHED_DELTA_ARGS.update(kwargs)
+
+
+def _compute_matched_delta_stats_in_worker(comparison_code: int) -> pd.DataFrame:
+    return _compute_matched_delta_stats_for_sim(comparison_code=comparison_code, **_MATCHED_DELTA_ARGS)
+
+
 def compute_matched_visit_delta_statistics(
     visits: pd.DataFrame,
     sim_identifier_reference_value: int | str = 1,
     sim_identifier_column: str = "sim_index",
     visit_spec_columns: tuple[str, ...] = ("fieldHpid", "band", "visitExposureTime"),
     nside: int = 2**18,
+    max_workers: int | None = None,
 ) -> pd.DataFrame:
     """Compute statistics on time differencse in visits matched across sims.
 
@@ -358,6 +1021,9 @@ def compute_matched_visit_delta_statistics(
         by default ("fieldHpid", "band", "visitExposureTime").
     nside : `int`
         nside to use if fieldHpid is to be computed on the fly.
+    max_workers : `int` or `None`, optional
+        If greater than one, divide the comparison simulations among up to
+        this many worker processes. By default, compute in this process.
 
     Returns
     -------
@@ -369,41 +1035,44 @@ def compute_matched_visit_delta_statistics(
         ``max``.
     """
 
-    if "fieldHpid" in visit_spec_columns and "fieldHpid" not in visits.columns:
-        visits = visits.copy()
-        hpid = hp.ang2pix(nside, visits.fieldRA, visits.fieldDec, lonlat=True)
-        ra, decl = hp.pix2ang(nside, hpid, lonlat=True)
-        visits["hp_ra"] = ra
-        visits["hp_decl"] = decl
-        visit_spec_columns = tuple(c for c in visit_spec_columns if c != "fieldHpid") + ("hp_ra", "hp_decl")
+    field_code, field_index = _field_codes(visits, visit_spec_columns, nside)
+    sim_code, sim_values = pd.factorize(visits[sim_identifier_column])
+    start_ns = visits["start_timestamp"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
 
-    delta_stats_list = []
+    # Sort once, so that every group is a contiguous slice of the arrays.
+    keep = field_code >= 0
+    field_code, sim_code, start_ns = field_code[keep], sim_code[keep], start_ns[keep]
+    visit_order = np.lexsort((start_ns, sim_code, field_code))
+    field_code, sim_code, start_ns = field_code[visit_order], sim_code[visit_order], start_ns[visit_order]
 
-    def _compute_best_match_delta_stats(
-        these_visits: pd.DataFrame,
-        sim_identifier_values: tuple[int, int],
-        sim_identifier_column: str | int = "sim_index",
-    ) -> pd.Series:
-        these_matches = match_visits_across_sims(
-            these_visits.set_index(sim_identifier_column).start_timestamp, sim_identifier_values
-        )
-        return these_matches.loc[:, "delta"].describe()
-
-    for sim_identifier_comparison_value in visits[sim_identifier_column].unique():
-        if sim_identifier_comparison_value == sim_identifier_reference_value:
-            continue
-        sim_identifier_values = [sim_identifier_reference_value, sim_identifier_comparison_value]
-        these_delta_stats = (
-            visits.groupby(list(visit_spec_columns))
-            .apply(
-                _compute_best_match_delta_stats,
-                sim_identifier_values=sim_identifier_values,
-                sim_identifier_column=sim_identifier_column,
-                include_groups=False,
-            )
-            .query("count > 0")
-        )
-        these_delta_stats[sim_identifier_column] = sim_identifier_comparison_value
+    reference_code = (
+        sim_values.get_loc(sim_identifier_reference_value)
+        if sim_identifier_reference_value in sim_values
+        else -1
+    )
+    comparison_codes = [code for code in range(len(sim_values)) if code != reference_code]
+    matched_delta_args = {
+        "field_code": field_code,
+        "sim_code": sim_code,
+        "start_ns": start_ns,
+        "num_fields": len(field_index),
+        "reference_code": reference_code,
+    }
+
+    if max_workers is not None and max_workers > 1 and len(comparison_codes) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(max_workers, len(comparison_codes)),
+            initializer=partial(_set_matched_delta_args, **matched_delta_args),
+        ) as executor:
+            sim_delta_stats = list(executor.map(_compute_matched_delta_stats_in_worker, comparison_codes))
+    else:
+        compute_sim_stats = partial(_compute_matched_delta_stats_for_sim, **matched_delta_args)
+        sim_delta_stats = [compute_sim_stats(comparison_code=code) for code in comparison_codes]
+
+    delta_stats_list = []
+    for comparison_code, these_delta_stats in zip(comparison_codes, sim_delta_stats):
+        these_delta_stats.index = field_index[these_delta_stats.index]
+        these_delta_stats[sim_identifier_column] = sim_values[comparison_code]
         delta_stats_list.append(these_delta_stats)
 
     matched_visit_delta_stats = (
@@ -1,15 +1,13 @@
-import datetime
 import warnings
 
 import astropy.units as u
 import numpy as np
 import pandas as pd
 from astropy.coordinates import SkyCoord, search_around_sky
-from astropy.time import Time
 from rubin_scheduler.site_models import SeeingModel
 
 import schedview.compute
-from schedview import band_column
+from schedview import DayObsArray, band_column
 
 
 def add_day_obs(visits):
@@ -26,13 +24,10 @@ def add_day_obs(visits):
         The modified DataFRame with additonal columns: day_obs_date,
         day_obs_mjd, and day_obs_iso8601.
     """
-    day_obs_mjd = np.floor(visits["observationStartMJD"] - 0.5).astype("int")
-    day_obs_datetime = Time(day_obs_mjd, format="mjd").datetime
-    day_obs_date = [datetime.date(t.year, t.month, t.day) for t in day_obs_datetime]
-    day_obs_iso8601 = tuple(str(d) for d in day_obs_date)
-    visits.insert(1, "day_obs_mjd", day_obs_mjd)
-    visits.insert(2, "day_obs_date", day_obs_date)
-    visits.insert(3, "day_obs_iso8601", day_obs_iso8601)
+    day_obs = DayObsArray.from_times(visits["observationStartMJD"])
+    visits.insert(1, "day_obs_mjd", day_obs.mjd)
+    visits.insert(2, "day_obs_date", day_obs.date.tolist())
+    visits.insert(3, "day_obs_iso8601", day_obs.iso8601.tolist())
     return visits
 
 
@@ -1,12 +1,18 @@
 import copy
 import datetime
+import os
+import sqlite3
+import threading
+import weakref
 from dataclasses import dataclass
 from functools import cached_property, partial
+from pathlib import Path
 from typing import Literal, Self
 
 import astropy.units as u
 import dateutil.parser
 import numpy as np
+import pandas as pd
 import scipy.optimize
 from astropy.coordinates import AltAz, EarthLocation, HADec, SkyCoord, get_body
 from astropy.time import Time
@@ -14,6 +20,7 @@ from astropy.time import Time
 DAYOBS_TZ = datetime.timezone(datetime.timedelta(hours=-12))
 MJD_EPOCH = datetime.date(1858, 11, 17)
 ONE_DAY = datetime.timedelta(days=1)
+_MJD_EPOCH_DATETIME64 = np.datetime64(MJD_EPOCH, "D")
 
 LSE30_ATMOSPHERE = {
     "pressure": 750.0 * 100 * u.Pa,
@@ -23,6 +30,37 @@ LSE30_ATMOSPHERE = {
 
 IntDateFormat = Literal["mjd", "yyyymmdd", "auto"]
 
+# The body, altitude, and direction of each event computed for a DayObs.
+DAYOBS_EVENTS: dict[str, tuple[Literal["sun", "moon"], float, Literal["rise", "set"]]] = {
+    "sunset": ("sun", 0.0, "set"),
+    "sun_n12_setting": ("sun", -12.0, "set"),
+    "sun_n18_setting": ("sun", -18.0, "set"),
+    "sun_n18_rising": ("sun", -18.0, "rise"),
+    "sun_n12_rising": ("sun", -12.0, "rise"),
+    "sunrise": ("sun", 0.0, "rise"),
+    "moonset": ("moon", 0.0, "set"),
+    "moonrise": ("moon", 0.0, "rise"),
+}
+
+# Tables of event times registered with register_dayobs_events, each with
+# the key of the site and atmosphere for which it was computed, from which
+# DayObs instances take event times rather than computing them.
+_DAYOBS_EVENT_TABLES: list[tuple[str, pd.DataFrame]] = []
+
+# Equal DayObs instances returned by DayObs.from_date and DayObs.from_time
+# are the same object, and all instances for the same night and site share
+# event times, so that they are computed at most once per process.
+# If the environment variable is set (or set_dayobs_event_cache_path is
+# called), event times are also saved in an sqlite3 database at that path,
+# and shared across processes.
+DAYOBS_EVENT_CACHE_ENV_VAR = "SCHEDVIEW_DAYOBS_EVENT_CACHE"
+_DAYOBS_LOCK = threading.Lock()
+_DAYOBS_INSTANCES: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+_DAYOBS_EVENT_CACHE: dict[tuple[str, int], dict[str, float]] = {}
+_dayobs_event_cache_path: Path | None = (
+    Path(os.environ[DAYOBS_EVENT_CACHE_ENV_VAR]) if os.environ.get(DAYOBS_EVENT_CACHE_ENV_VAR) else None
+)
+
 
 # Use a frozen dataclass so that we can used cached properties without
 # having to worry about updating them.
@@ -111,7 +149,7 @@ class DayObs:
 
         match arg:
             case DayObs():
-                return copy.deepcopy(arg)
+                return cls._interned(arg.date, arg.int_format, arg.atmosphere, arg.location)
             case datetime.date():
                 date = arg
             case int() | np.int64():
@@ -142,12 +180,7 @@ class DayObs:
             case _:
                 raise NotImplementedError()
 
-        if location is None:
-            day_obs = cls(date, int_format, atmosphere=atmosphere)
-        else:
-            day_obs = cls(date, int_format, location=location, atmosphere=atmosphere)
-
-        return day_obs
+        return cls._interned(date, int_format, atmosphere, location)
 
     @classmethod
     def from_time(
@@ -222,10 +255,46 @@ class DayObs:
 
         dayobs_date = dayobs_datetime.astimezone(DAYOBS_TZ).date()
 
+        return cls._interned(dayobs_date, int_format, atmosphere, location)
+
+    @classmethod
+    def _interned(
+        cls,
+        date: datetime.date,
+        int_format: IntDateFormat,
+        atmosphere: dict | None,
+        location: EarthLocation | None,
+    ) -> Self:
+        """Return the one instance with the given parameters.
+
+        Parameters
+        ----------
+        date : `datetime.date`
+            The calendar date.
+        int_format : `str`
+            The integer representation, as for `DayObs`.
+        atmosphere : `dict` or `None`
+            Atmospheric conditions, as for `DayObs`.
+        location : `astropy.coordinates.EarthLocation` or `None`
+            The location of the observatory, or `None` for the default.
+
+        Returns
+        -------
+        day_obs : `DayObs`
+            An existing instance with these parameters, if there is one,
+            otherwise a new one.
+        """
         if location is None:
-            day_obs = cls(dayobs_date, int_format, atmosphere=atmosphere)
-        else:
-            day_obs = cls(dayobs_date, int_format, location=location, atmosphere=atmosphere)
+            location = cls.__dataclass_fields__["location"].default
+
+        key = (cls, date, int_format, _site_key(location, atmosphere))
+        with _DAYOBS_LOCK:
+            day_obs = _DAYOBS_INSTANCES.get(key)
+            if day_obs is None:
+                # Copy the atmosphere so that later changes to the dict
+                # passed cannot make the instance differ from its key.
+                day_obs = cls(date, int_format, atmosphere=copy.deepcopy(atmosphere), location=location)
+                _DAYOBS_INSTANCES[key] = day_obs
 
         return day_obs
 
@@ -471,48 +540,578 @@ class DayObs:
 
         return optimized_time
 
+    def _event_time(self, event: str, **kwargs) -> Time:
+        """Look up or compute the time of an event.
+
+        Parameters
+        ----------
+        event : `str`
+            The name of the event, a key of `DAYOBS_EVENTS`.
+        **kwargs
+            Additional arguments passed to `body_time` if the event time is
+            not already known.
+
+        Returns
+        -------
+        event_time : `Time`
+            The time of the event.
+        """
+        site_key = _site_key(self.location, self.atmosphere)
+        event_mjd = _get_cached_event_mjd(site_key, self.mjd, event)
+
+        if event_mjd is None:
+            event_mjd = np.nan
+            with _DAYOBS_LOCK:
+                event_tables = list(_DAYOBS_EVENT_TABLES)
+            for events_site_key, events in event_tables:
+                if events_site_key == site_key and self.mjd in events.index:
+                    event_mjd = float(events.at[self.mjd, event])
+                    break
+            else:
+                body, alt, direction = DAYOBS_EVENTS[event]
+                try:
+                    event_mjd = self.body_time(body, alt=alt, direction=direction, **kwargs).mjd
+                except ValueError:
+                    # Record that the event does not happen on this night.
+                    pass
+            _set_cached_event_mjd(site_key, self.mjd, event, event_mjd)
+
+        if np.isnan(event_mjd):
+            body, alt, direction = DAYOBS_EVENTS[event]
+            raise ValueError(f"The body {body} never reaches {alt} during {direction}")
+
+        return Time(event_mjd, format="mjd")
+
     @cached_property
     def sunset(self) -> Time:
         """`Time` of sunset on the day of observing."""
-        return self.body_time("sun", alt=0.0, direction="set")
+        return self._event_time("sunset")
 
     @cached_property
     def sunrise(self):
         """`Time` of sunrise on the day of observing."""
-        return self.body_time("sun", alt=0.0, direction="rise")
+        return self._event_time("sunrise")
 
     @cached_property
     def sun_n12_setting(self):
         """`Time` of evening naut. twilight during the night of observing."""
-        return self.body_time("sun", alt=-12.0, direction="set")
+        return self._event_time("sun_n12_setting")
 
     @cached_property
     def sun_n18_rising(self):
         """`Time` of morning astron. twilight during the night of observing."""
-        return self.body_time("sun", alt=-18.0, direction="rise")
+        return self._event_time("sun_n18_rising")
 
     @cached_property
     def sun_n18_setting(self):
         """`Time` of evening astron. twilight during the night of observing."""
-        return self.body_time("sun", alt=-18.0, direction="set")
+        return self._event_time("sun_n18_setting")
 
     @cached_property
     def sun_n12_rising(self):
         """`Time` of morning naut. twilight during the night of observing."""
-        return self.body_time("sun", alt=-12.0, direction="rise")
+        return self._event_time("sun_n12_rising")
 
     @cached_property
     def moonset(self):
         """`Time` of moonrise during the night of observing."""
-        return self.body_time("moon", alt=0.0, direction="set", num_rough_iterations=3)
+        return self._event_time("moonset", num_rough_iterations=3)
 
     @cached_property
     def moonrise(self):
         """`Time` of moonset during the night of observing."""
-        return self.body_time("moon", alt=0.0, direction="rise", num_rough_iterations=3)
+        return self._event_time("moonrise", num_rough_iterations=3)
 
     def __int__(self) -> int:
         return self.mjd if self.int_format in ("auto", "mjd") else self.yyyymmdd
 
     def __str__(self):
         return self.date.isoformat()
+
+
+@dataclass(frozen=True, eq=False)
+class DayObsArray:
+    """Represent an array of days of observation, dayobs, as defined in
+    SITCOMTN-032, following the same rules as `DayObs`.
+
+    Parameters
+    ----------
+    mjd : `numpy.ndarray`
+        The Modified Julian Dates of the dayobs, as integers.
+    int_format : `str`
+        ``yyyymmdd`` if an integer representation is a mapping of decimal
+        digits to year, month, and day; ``mjd`` if the integer representation
+        is the Modified Julian Date. The default is ``mjd``.
+    """
+
+    mjd: np.ndarray
+    int_format: IntDateFormat = "mjd"
+
+    def __post_init__(self):
+        object.__setattr__(self, "mjd", np.atleast_1d(np.asarray(self.mjd, dtype=np.int64)))
+
+    @classmethod
+    def from_dates(
+        cls,
+        arg: "DayObsArray | pd.Series | pd.Index | np.ndarray | list",
+        int_format: IntDateFormat = "auto",
+    ) -> Self:
+        """Create a representation of the dayobs for an array of dates.
+        As with `DayObs.from_date`, the dates are already in the -12hr
+        timezone as defined in SITCOMTN-032, not dates and times.
+
+        Parameters
+        ----------
+        arg : `DayObsArray`, `pandas.Series`, `pandas.Index`,
+              `numpy.ndarray`, or `list`
+            The representations of the dayobs: `datetime.date` instances,
+            ``datetime64`` values, ISO 8601 date strings, or integers,
+            interpreted according to the ``int_format`` argument.
+        int_format : `str` (optional)
+            One of ``mjd``, in which case integers are interpreted as Modified
+            Julian Dates,
+            ``yyyymmdd``, in which case integers encode year, month, and day
+            into decimal digits,
+            or ``auto``, in which case 8 digit decimals are interpretd as
+            yyyymmdd and others as mjd.
+
+        Returns
+        -------
+        day_obs_array : `DayObsArray`
+            A new instance of the converter.
+        """
+        array_int_format: IntDateFormat = "mjd" if int_format == "auto" else int_format
+        if isinstance(arg, DayObsArray):
+            return cls(arg.mjd, array_int_format)
+
+        values = np.atleast_1d(np.asarray(arg))
+
+        # Strings of only digits are integers.
+        if values.dtype.kind in ("U", "S", "O") and len(values) > 0:
+            if all(isinstance(v, str) and v.isdigit() for v in values):
+                values = values.astype(np.int64)
+
+        match values.dtype.kind:
+            case "i" | "u":
+                values = values.astype(np.int64)
+                if int_format == "yyyymmdd":
+                    is_yyyymmdd = np.full(values.shape, True)
+                elif int_format in ("auto", "mjd"):
+                    is_yyyymmdd = (values >= 10_000_000) & (values <= 99_999_999) & (int_format == "auto")
+                else:
+                    raise ValueError("Invalid integer format.")
+
+                dates = _yyyymmdd_to_datetime64(np.where(is_yyyymmdd, values, 19700101))
+                mjd = np.where(is_yyyymmdd, (dates - _MJD_EPOCH_DATETIME64).astype(np.int64), values)
+            case _:
+                mjd = (values.astype("datetime64[D]") - _MJD_EPOCH_DATETIME64).astype(np.int64)
+
+        return cls(mjd, array_int_format)
+
+    @classmethod
+    def from_times(
+        cls,
+        arg: "Time | pd.Series | pd.Index | np.ndarray | list",
+        int_format: IntDateFormat = "mjd",
+    ) -> Self:
+        """Create a representation of the dayobs that include given times.
+
+        Parameters
+        ----------
+        arg : `astropy.time.Time`, `pandas.Series`, `pandas.Index`,
+              `numpy.ndarray`, or `list`
+            Times in the dates to return the dayobs of.
+            Floats are interpreted as Modified Julian Dates (in UTC).
+            Representations without timezones are assumed to be in UTC.
+        int_format : `str`
+            If `mjd`, represent the dates as MJDs when cast to integers.
+            If `yyyymmdd`, encode year month and day into decimal digits
+            instead.
+            `mjd` by default.
+
+        Returns
+        -------
+        day_obs_array : `DayObsArray`
+            A new instance of the converter.
+        """
+        if isinstance(arg, Time):
+            mjd = np.floor(np.atleast_1d(arg.utc.mjd) - 0.5)
+        else:
+            values = arg if isinstance(arg, (pd.Series, pd.Index)) else np.atleast_1d(np.asarray(arg))
+            if values.dtype.kind in ("i", "u", "f"):
+                mjd = np.floor(np.asarray(values, dtype=float) - 0.5)
+            else:
+                utc_datetimes = pd.DatetimeIndex(pd.to_datetime(values, utc=True)).tz_localize(None)
+                dayobs_dates = (utc_datetimes - pd.Timedelta(hours=12)).to_numpy().astype("datetime64[D]")
+                mjd = (dayobs_dates - _MJD_EPOCH_DATETIME64).astype(np.int64)
+
+        return cls(mjd, int_format)
+
+    @cached_property
+    def date(self) -> np.ndarray:
+        """The calendar dates, as ``datetime64[D]``."""
+        return _MJD_EPOCH_DATETIME64 + self.mjd.astype("timedelta64[D]")
+
+    @cached_property
+    def yyyymmdd(self) -> np.ndarray:
+        """The years, months, and days of the dayobs encoded into decimal."""
+        years = self.date.astype("datetime64[Y]")
+        months = self.date.astype("datetime64[M]")
+        year = years.astype(np.int64) + 1970
+        month = (months - years).astype(np.int64) + 1
+        day = (self.date - months).astype(np.int64) + 1
+        return day + 100 * (month + 100 * year)
+
+    @cached_property
+    def iso8601(self) -> np.ndarray:
+        """The dates in ISO 8601 (YYYY-MM-DD) format."""
+        return np.datetime_as_string(self.date, unit="D")
+
+    @cached_property
+    def jd(self) -> np.ndarray:
+        """True, unmodified Julian dates for the whole dayobs."""
+        # The start of each dayobs is at noon UTC, when the JD rolls over.
+        return self.mjd + 2400001
+
+    @cached_property
+    def start_mjd(self) -> np.ndarray:
+        """The MJDs of the starts of the dayobs."""
+        return self.mjd + 0.5
+
+    @cached_property
+    def end_mjd(self) -> np.ndarray:
+        """The MJDs of the ends of the dayobs."""
+        return self.mjd + 1.5
+
+    @cached_property
+    def start(self) -> Time:
+        """The `astropy.time.Time` of the starts of the dayobs."""
+        return Time(self.start_mjd, format="mjd", scale="utc")
+
+    @cached_property
+    def end(self) -> Time:
+        """The `astropy.time.Time` of the ends of the dayobs."""
+        return Time(self.end_mjd, format="mjd", scale="utc")
+
+    def lookup(self, table: pd.DataFrame, on: str | None = None) -> pd.DataFrame:
+        """Look up the rows of a per-night table for each dayobs.
+
+        Parameters
+        ----------
+        table : `pandas.DataFrame`
+            A table with one row per dayobs, indexed by dayobs MJD (such as
+            that returned by `compute_dayobs_events`).
+        on : `str` or `None`
+            A column of ``table`` with the dayobs MJD, to use instead of
+            the index.
+
+        Returns
+        -------
+        rows : `pandas.DataFrame`
+            The row of ``table`` for each dayobs, in order, indexed by dayobs
+            MJD, with missing values for dayobs not in the table.
+        """
+        if on is not None:
+            table = table.set_index(on)
+        return table.reindex(pd.Index(self.mjd, name=table.index.name))
+
+    def __len__(self) -> int:
+        return len(self.mjd)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return DayObs.from_date(MJD_EPOCH + datetime.timedelta(days=int(self.mjd[key])), self.int_format)
+        return type(self)(self.mjd[key], self.int_format)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __array__(self, dtype=None, copy=None):
+        int_values = self.mjd if self.int_format in ("auto", "mjd") else self.yyyymmdd
+        return np.asarray(int_values, dtype=dtype)
+
+
+def _yyyymmdd_to_datetime64(yyyymmdd: np.ndarray) -> np.ndarray:
+    # Decode integers with year, month, and day in decimal digits.
+    years = (yyyymmdd // 10000 - 1970).astype("datetime64[Y]")
+    months = years.astype("datetime64[M]") + (yyyymmdd // 100 % 100 - 1).astype("timedelta64[M]")
+    return months.astype("datetime64[D]") + (yyyymmdd % 100 - 1).astype("timedelta64[D]")
+
+
+def _site_key(location: EarthLocation, atmosphere: dict | None) -> str:
+    # A hashable representation of a site and atmosphere, which is
+    # the same in every process.
+    geocentric = tuple(round(float(c.to_value(u.m)), 3) for c in location.geocentric)
+    atmosphere_items = () if atmosphere is None else tuple(sorted((k, str(v)) for k, v in atmosphere.items()))
+    return repr((geocentric, atmosphere_items))
+
+
+def _connect_event_cache(path: Path) -> sqlite3.Connection:
+    connection = sqlite3.connect(path, timeout=60)
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS dayobs_events "
+        "(site TEXT, day_obs_mjd INTEGER, event TEXT, mjd REAL, PRIMARY KEY (site, day_obs_mjd, event))"
+    )
+    return connection
+
+
+def _get_cached_event_mjd(site_key: str, day_obs_mjd: int, event: str) -> float | None:
+    # Return the cached MJD of an event, NaN if it is known not to happen,
+    # or None if it is not cached.
+    with _DAYOBS_LOCK:
+        night_events = _DAYOBS_EVENT_CACHE.get((site_key, day_obs_mjd))
+        if night_events is not None and event in night_events:
+            return night_events[event]
+        cache_path = _dayobs_event_cache_path
+
+    if cache_path is None:
+        return None
+
+    with _connect_event_cache(cache_path) as connection:
+        rows = connection.execute(
+            "SELECT event, mjd FROM dayobs_events WHERE site = ? AND day_obs_mjd = ?",
+            (site_key, int(day_obs_mjd)),
+        ).fetchall()
+    connection.close()
+
+    # sqlite3 stores NaN as NULL.
+    stored_events = {row[0]: np.nan if row[1] is None else row[1] for row in rows}
+    with _DAYOBS_LOCK:
+        _DAYOBS_EVENT_CACHE.setdefault((site_key, day_obs_mjd), {}).update(stored_events)
+
+    return stored_events.get(event)
+
+
+def _set_cached_event_mjd(site_key: str, day_obs_mjd: int, event: str, event_mjd: float) -> None:
+    with _DAYOBS_LOCK:
+        _DAYOBS_EVENT_CACHE.setdefault((site_key, day_obs_mjd), {})[event] = event_mjd
+        cache_path = _dayobs_event_cache_path
+
+    if cache_path is not None:
+        with _connect_event_cache(cache_path) as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO dayobs_events VALUES (?, ?, ?, ?)",
+                (site_key, int(day_obs_mjd), event, None if np.isnan(event_mjd) else event_mjd),
+            )
+        connection.close()
+
+
+def set_dayobs_event_cache_path(path: str | Path | None) -> None:
+    """Set the file in which to save DayObs event times across processes.
+
+    Parameters
+    ----------
+    path : `str` or `pathlib.Path` or `None`
+        The path of an sqlite3 database in which to save event times
+        computed by `DayObs` instances, and from which to read them, or
+        `None` to keep them only in memory. The default is the value of the
+        ``SCHEDVIEW_DAYOBS_EVENT_CACHE`` environment variable, if it is set.
+    """
+    global _dayobs_event_cache_path
+    with _DAYOBS_LOCK:
+        _dayobs_event_cache_path = None if path is None else Path(path)
+
+
+def clear_dayobs_cache() -> None:
+    """Forget interned `DayObs` instances and event times held in memory."""
+    with _DAYOBS_LOCK:
+        _DAYOBS_INSTANCES.clear()
+        _DAYOBS_EVENT_CACHE.clear()
+
+
+def _body_alt(
+    body: str, mjd: np.ndarray, location: EarthLocation, atmosphere: dict | None = None
+) -> np.ndarray:
+    # Compute the alt of a body at many times in one astropy call.
+    obstime = Time(mjd, format="mjd")
+    altaz_kwargs = {} if atmosphere is None else atmosphere
+    altaz = AltAz(obstime=obstime, location=location, **altaz_kwargs)
+    return get_body(body, obstime).transform_to(altaz).alt.deg
+
+
+def compute_dayobs_events(
+    first_day_obs: datetime.date | int | str | DayObs,
+    last_day_obs: datetime.date | int | str | DayObs,
+    atmosphere: dict | None = None,
+    location: EarthLocation | None = None,
+    step_minutes: float = 60.0,
+    num_refinements: int = 3,
+) -> pd.DataFrame:
+    """Compute the times of sun and moon events for a range of nights.
+
+    Parameters
+    ----------
+    first_day_obs : `datetime.date` or `int` or `str` or `DayObs`
+        The first day_obs for which to compute events.
+    last_day_obs : `datetime.date` or `int` or `str` or `DayObs`
+        The last day_obs (inclusive) for which to compute events.
+    atmosphere : `dict` or `None`
+        A dictionary with atmospheric conditions, as for `DayObs`.
+        Defaults to None, which is vaccuum.
+    location : `astropy.coordinates.EarthLocation`
+        The location of the observatory. Defaults to the Simonyi telescope.
+    step_minutes : `float`
+        The spacing of the grid of times on which the alt of each body is
+        computed to find the events, in minutes. It should divide a day
+        evenly, and be short enough that no body crosses the alt of an event
+        twice within one step. Defaults to 60.
+    num_refinements : `int`
+        The number of refinement iterations of each event time after it is
+        bracketed by the grid. Defaults to 3.
+
+    Returns
+    -------
+    events : `pandas.DataFrame`
+        A table indexed by the MJD of each day_obs (``day_obs_mjd``), with one
+        column for each event in `DAYOBS_EVENTS` giving its MJD, or NaN if the
+        event does not happen during that day_obs. The location and
+        atmosphere are recorded in the ``attrs`` of the table.
+
+    Notes
+    -----
+    The alt of each body is computed on a coarse grid of times spanning all
+    nights in one call to astropy, and the times at which the alt crosses
+    the alt of each event are refined with the secant method, again for all
+    events in one call per iteration.
+    Pass the table to `register_dayobs_events` to have `DayObs` instances
+    use its event times.
+    """
+    first_day_obs = DayObs.from_date(first_day_obs)
+    last_day_obs = DayObs.from_date(last_day_obs)
+    if location is None:
+        location = DayObs.__dataclass_fields__["location"].default
+
+    day_obs_mjds = np.arange(first_day_obs.mjd, last_day_obs.mjd + 1)
+    num_nights = len(day_obs_mjds)
+
+    # Each day_obs starts at 12:00 UTC, and grid points fall on the start
+    # of each day_obs, so that no grid interval spans two nights.
+    steps_per_day = int(np.round(24 * 60 / step_minutes))
+    grid_mjds = first_day_obs.mjd + 0.5 + np.arange(num_nights * steps_per_day + 1) / steps_per_day
+    grid_night = np.arange(len(grid_mjds) - 1) // steps_per_day
+
+    event_mjds = {}
+    for body in ("sun", "moon"):
+        body_events = [e for e in DAYOBS_EVENTS if DAYOBS_EVENTS[e][0] == body]
+        grid_alts = _body_alt(body, grid_mjds, location, atmosphere)
+
+        # Find the grid intervals in which each event happens.
+        bracket_events, bracket_starts, target_alts = [], [], []
+        for event in body_events:
+            _, event_alt, direction = DAYOBS_EVENTS[event]
+            above = grid_alts >= event_alt
+            crossed = (above[:-1] & ~above[1:]) if direction == "set" else (~above[:-1] & above[1:])
+            starts = np.flatnonzero(crossed)
+            bracket_events.append(np.full(len(starts), event, dtype=object))
+            bracket_starts.append(starts)
+            target_alts.append(np.full(len(starts), event_alt))
+
+        bracket_event = np.concatenate(bracket_events)
+        bracket_start = np.concatenate(bracket_starts)
+        target_alt = np.concatenate(target_alts)
+
+        # Refine all event times at once with the secant method, starting
+        # from the ends of the bracketing grid interval.
+        previous_mjd, mjd = grid_mjds[bracket_start], grid_mjds[bracket_start + 1]
+        previous_delta = grid_alts[bracket_start] - target_alt
+        delta = grid_alts[bracket_start + 1] - target_alt
+        for refinement in range(num_refinements):
+            converged = delta == previous_delta
+            slope = np.where(converged, 1.0, (delta - previous_delta) / (mjd - previous_mjd))
+            previous_mjd, previous_delta = mjd, delta
+            mjd = np.where(converged, mjd, mjd - delta / slope)
+            if refinement < num_refinements - 1:
+                delta = _body_alt(body, mjd, location, atmosphere) - target_alt
+
+        # If an event happens more than once in a night, use the first.
+        brackets = pd.DataFrame(
+            {"event": bracket_event, "day_obs_mjd": day_obs_mjds[grid_night[bracket_start]], "mjd": mjd}
+        )
+        first_events = brackets.groupby(["event", "day_obs_mjd"])["mjd"].min()
+        for event in body_events:
+            event_mjds[event] = (
+                first_events.loc[event] if event in first_events.index.get_level_values("event") else None
+            )
+
+    events = pd.DataFrame(index=pd.Index(day_obs_mjds, name="day_obs_mjd"))
+    for event in DAYOBS_EVENTS:
+        events[event] = (
+            np.nan if event_mjds[event] is None else event_mjds[event].reindex(day_obs_mjds).values
+        )
+
+    events.attrs["location"] = location
+    events.attrs["atmosphere"] = atmosphere
+    return events
+
+
+def register_dayobs_events(
+    events: pd.DataFrame,
+    location: EarthLocation | None = None,
+    atmosphere: dict | None = None,
+) -> None:
+    """Have `DayObs` instances take event times from a table.
+
+    Parameters
+    ----------
+    events : `pandas.DataFrame`
+        A table of event times, as returned by `compute_dayobs_events`.
+        It is used by instances of `DayObs` with the same location and
+        atmosphere, for nights it covers, whose event times have not
+        already been computed.
+    location : `astropy.coordinates.EarthLocation` or `None`
+        The location of the observatory for which the events were computed.
+        If `None`, the location and atmosphere are taken from the ``attrs``
+        of ``events``, where `compute_dayobs_events` records them.
+    atmosphere : `dict` or `None`
+        The atmospheric conditions for which the events were computed,
+        as for `DayObs`. Ignored if ``location`` is `None`. Defaults to None,
+        which is vaccuum.
+
+    Raises
+    ------
+    ValueError
+        If ``location`` is `None` and the ``attrs`` of ``events`` do not
+        record the location and atmosphere, or if ``events`` is missing
+        columns for any events in `DAYOBS_EVENTS`.
+    """
+    if location is None:
+        if "location" not in events.attrs or "atmosphere" not in events.attrs:
+            raise ValueError("The events table attrs do not record its location and atmosphere.")
+        location = events.attrs["location"]
+        atmosphere = events.attrs["atmosphere"]
+
+    missing_events = [event for event in DAYOBS_EVENTS if event not in events.columns]
+    if len(missing_events) > 0:
+        raise ValueError(f"The events table has no columns for {missing_events}.")
+
+    site_key = _site_key(location, atmosphere)
+    with _DAYOBS_LOCK:
+        _DAYOBS_EVENT_TABLES.insert(0, (site_key, events))
+
+
+def unregister_dayobs_events(events: pd.DataFrame) -> None:
+    """Stop `DayObs` instances from taking event times from a table.
+
+    Parameters
+    ----------
+    events : `pandas.DataFrame`
+        A table of event times previously passed to `register_dayobs_events`.
+
+    Raises
+    ------
+    ValueError
+        If ``events`` is not registered.
+
+    Notes
+    -----
+    Event times already taken from the table remain in the cache of event
+    times; call `clear_dayobs_cache` to forget them.
+    """
+    with _DAYOBS_LOCK:
+        num_tables = len(_DAYOBS_EVENT_TABLES)
+        _DAYOBS_EVENT_TABLES[:] = [
+            (site_key, table) for site_key, table in _DAYOBS_EVENT_TABLES if table is not events
+        ]
+        if len(_DAYOBS_EVENT_TABLES) == num_tables:
+            raise ValueError("The events table is not registered.")
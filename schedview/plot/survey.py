@@ -421,7 +421,7 @@ def create_hpix_visit_map_grid(hpix_maps, visits, conditions, **kwargs):
 
 
 def create_metric_visit_map_grid(
-    metric, metric_visits, visits, observatory, nside=32, use_matplotlib=False, **kwargs
+    metric, metric_visits, visits, observatory, nside=32, use_matplotlib=False, max_workers=None, **kwargs
 ) -> Figure | UIElement | None:
     """Create a grid of maps of metric values with visits overplotted.
 
@@ -440,6 +440,9 @@ def create_metric_visit_map_grid(
         The nside with which to compute the metric.
     use_matplotlib: `bool`
         Use matplotlib instead of bokeh? Defaults to False.
+    max_workers: `int` or `None`
+        The maximum number of processes to use to compute the metric
+        in different bands. Defaults to None (compute in this process).
 
     Returns
     -------
@@ -448,7 +451,9 @@ def create_metric_visit_map_grid(
     """
 
     if len(metric_visits):
-        metric_hpix = compute_hpix_metric_in_bands(metric_visits, metric, nside=nside)
+        metric_hpix = compute_hpix_metric_in_bands(
+            metric_visits, metric, nside=nside, max_workers=max_workers
+        )
     else:
         metric_hpix = {b: np.zeros(hp.nside2npix(nside)) for b in visits[band_column(visits)].unique()}
 
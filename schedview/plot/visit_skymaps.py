@@ -21,7 +21,6 @@ import bokeh.transform
 import healpy as hp
 import numpy as np
 import pandas as pd
-from astropy.coordinates import SkyCoord, get_body
 from astropy.time import Time
 from bokeh.models.sources import DataSource
 from bokeh.models.ui.ui_element import UIElement
@@ -38,6 +37,7 @@ from uranography.api import (
 from schedview import DayObs
 from schedview.collect import load_bright_stars
 from schedview.compute.camera import LsstCameraFootprintPerimeter
+from schedview.compute.ephemeris import compute_body_coords
 from schedview.compute.footprint import find_healpix_area_polygons
 from schedview.plot import PLOT_BAND_COLORS
 
@@ -785,11 +785,9 @@ class VisitMapBuilder:
             mjds = np.arange(first_mjd, last_mjd, time_step).tolist()
 
         ap_times = Time(mjds, format="mjd", scale="utc")
-        body_coords_all_times = get_body(body, ap_times)
-        assert isinstance(body_coords_all_times, SkyCoord)
+        body_ras, body_decls = compute_body_coords(body, np.asarray(mjds))
 
-        for mjd, ap_time, body_coords in zip(mjds, ap_times, body_coords_all_times):
-            assert isinstance(body_coords, SkyCoord)
+        for mjd, ap_time, body_ra, body_decl in zip(mjds, ap_times, body_ras, body_decls):
             assert isinstance(ap_time, Time)
 
             body_name = body if len(mjds) == 1 else body + ap_time.strftime("%Y%m%d%H%M%S")
@@ -816,8 +814,8 @@ class VisitMapBuilder:
             }
 
             self.body_ds[body_name] = self.ref_map.add_marker(
-                ra=body_coords.ra.deg,
-                decl=body_coords.dec.deg,
+                ra=body_ra,
+                decl=body_decl,
                 name=body_name,
                 glyph_size=size,
                 circle_kwargs=circle_kwargs,
@@ -0,0 +1,220 @@
+"""Read-only arrays shared by all processes and threads that use them.
+
+Arrays registered here are computed at most once in each process, however
+many threads request them. If a directory for them is set (with the
+``directory`` argument or the ``SCHEDVIEW_SHARED_CACHE_DIR`` environment
+variable), they are computed by the first process that needs them, saved
+there, and memory-mapped by every process, so that (for example) the
+workers of a multi-process panel deployment share one copy in the page
+cache rather than each loading their own.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+__all__ = ["SHARED_CACHE_DIR_ENV_VAR", "clear_shared_cache", "get_shared_array", "get_shared_dataframe"]
+
+SHARED_CACHE_DIR_ENV_VAR = "SCHEDVIEW_SHARED_CACHE_DIR"
+
+# Arrays already loaded in this process, keyed by name and directory, and
+# locks that make sure each is loaded only once.
+_SHARED_CACHE_LOCK = threading.Lock()
+_SHARED_ARRAYS: dict[tuple[str, str | None], np.ndarray] = {}
+_SHARED_ARRAY_LOCKS: dict[tuple[str, str | None], threading.Lock] = {}
+
+# Data frames already reconstructed from shared arrays in this process,
+# keyed as the arrays are.
+_SHARED_DATAFRAMES: dict[tuple[str, str | None], pd.DataFrame] = {}
+
+# Suffix of fields holding the missing value mask of string columns
+# of data frames saved as structured arrays.
+_ISNA_SUFFIX = "__isna"
+
+
+@contextmanager
+def _exclusive_file_lock(lock_path: Path):
+    # Keep other processes from computing the same array at the same time.
+    # Where file locks are not available, processes may duplicate the work,
+    # but still never see partially written files.
+    if fcntl is None:
+        yield
+        return
+
+    with open(lock_path, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _load_or_create_array(name: str, compute: Callable[[], np.ndarray], directory: str | None) -> np.ndarray:
+    if directory is None:
+        array = np.asarray(compute())
+        array.flags.writeable = False
+        return array
+
+    path = Path(directory).joinpath(f"{name}.npy")
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with _exclusive_file_lock(path.with_suffix(".lock")):
+            # Another process may have written it while we waited.
+            if not path.exists():
+                temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+                with open(temp_path, "wb") as temp_file:
+                    np.save(temp_file, np.asarray(compute()))
+                os.replace(temp_path, path)
+
+    return np.load(path, mmap_mode="r")
+
+
+def get_shared_array(
+    name: str, compute: Callable[[], np.ndarray], directory: str | Path | None = None
+) -> np.ndarray:
+    """Get a read-only array, computing it only if no process already has.
+
+    Parameters
+    ----------
+    name : `str`
+        The name of the array, used as the base of the file name. Names
+        should include anything that the values depend on, including
+        a version of the code that computes them.
+    compute : `Callable` [[], `numpy.ndarray`]
+        A function that computes the array. Object arrays cannot be
+        shared between processes.
+    directory : `str` or `pathlib.Path` or `None`
+        The directory in which to save the array, and from which to
+        memory-map it. By default, the directory set in the
+        ``SCHEDVIEW_SHARED_CACHE_DIR`` environment variable, or, if that is
+        not set, keep the array in the memory of this process only.
+
+    Returns
+    -------
+    array : `numpy.ndarray`
+        The array, which cannot be modified.
+    """
+    if directory is None:
+        directory = os.environ.get(SHARED_CACHE_DIR_ENV_VAR) or None
+    key = (name, None if directory is None else str(directory))
+
+    with _SHARED_CACHE_LOCK:
+        if key in _SHARED_ARRAYS:
+            return _SHARED_ARRAYS[key]
+        array_lock = _SHARED_ARRAY_LOCKS.setdefault(key, threading.Lock())
+
+    # Hold only the lock for this array while loading it, so that threads
+    # can load different arrays at the same time.
+    with array_lock:
+        with _SHARED_CACHE_LOCK:
+            if key in _SHARED_ARRAYS:
+                return _SHARED_ARRAYS[key]
+
+        array = _load_or_create_array(name, compute, key[1])
+
+        with _SHARED_CACHE_LOCK:
+            _SHARED_ARRAYS[key] = array
+
+    return array
+
+
+def _dataframe_to_records(df: pd.DataFrame) -> np.ndarray:
+    # Convert columns of strings to fixed width unicode, with a mask of
+    # missing values, so that the result can be saved and memory-mapped.
+    # Numeric, boolean, and (timezone naive) datetime and timedelta columns
+    # are saved as they are. Other columns cannot be saved faithfully.
+    columns = {}
+    for column in df.columns:
+        values = df[column]
+        if isinstance(values.dtype, np.dtype) and values.dtype.kind in "biufcmM":
+            columns[column] = values.to_numpy()
+        elif pd.api.types.infer_dtype(values, skipna=True) in ("string", "empty"):
+            isna = values.isna().to_numpy()
+            columns[column] = np.where(isna, "", values.astype(str).to_numpy()).astype(str)
+            columns[column + _ISNA_SUFFIX] = isna
+        else:
+            raise ValueError(f"Column {column} of type {values.dtype} cannot be shared.")
+
+    records = np.zeros(len(df), dtype=[(column, values.dtype) for column, values in columns.items()])
+    for column, values in columns.items():
+        records[column] = values
+    return records
+
+
+def _records_to_dataframe(records: np.ndarray) -> pd.DataFrame:
+    columns = {}
+    for column in records.dtype.names:
+        if column.endswith(_ISNA_SUFFIX):
+            continue
+        if column + _ISNA_SUFFIX in records.dtype.names:
+            values = records[column].astype(object)
+            values[records[column + _ISNA_SUFFIX]] = np.nan
+            columns[column] = values
+        else:
+            columns[column] = records[column]
+    return pd.DataFrame(columns)
+
+
+def get_shared_dataframe(
+    name: str, compute: Callable[[], pd.DataFrame], directory: str | Path | None = None
+) -> pd.DataFrame:
+    """Get a `pandas.DataFrame`, computing it only if no process already has.
+
+    Parameters
+    ----------
+    name : `str`
+        The name of the table, as for `get_shared_array`.
+    compute : `Callable` [[], `pandas.DataFrame`]
+        A function that computes the table. Its index is not kept.
+        Its columns must be numeric, boolean, timezone naive datetime or
+        timedelta, or strings (with missing values).
+    directory : `str` or `pathlib.Path` or `None`
+        The directory in which to save the table, as for `get_shared_array`.
+
+    Returns
+    -------
+    df : `pandas.DataFrame`
+        A new copy of the table, which may be modified.
+
+    Raises
+    ------
+    ValueError
+        If the table computed has columns of other types.
+
+    Notes
+    -----
+    The table is reconstructed from the shared array once in each process,
+    and each call returns a copy of that reconstruction.
+    """
+    if directory is None:
+        directory = os.environ.get(SHARED_CACHE_DIR_ENV_VAR) or None
+    key = (name, None if directory is None else str(directory))
+
+    with _SHARED_CACHE_LOCK:
+        df = _SHARED_DATAFRAMES.get(key)
+
+    if df is None:
+        records = get_shared_array(name, lambda: _dataframe_to_records(compute()), directory)
+        with _SHARED_CACHE_LOCK:
+            # If another thread reconstructed it first, use theirs.
+            df = _SHARED_DATAFRAMES.setdefault(key, _records_to_dataframe(records))
+
+    return df.copy()
+
+
+def clear_shared_cache() -> None:
+    """Forget arrays and tables loaded by this process, but not saved files."""
+    with _SHARED_CACHE_LOCK:
+        _SHARED_ARRAYS.clear()
+        _SHARED_ARRAY_LOCKS.clear()
+        _SHARED_DATAFRAMES.clear()
@@ -6,24 +6,28 @@ def offset_sep_bear(ra, decl, sep, bearing, degrees=False):
 
     Parameters
     ----------
-    ra : `float`
+    ra : `float` or `np.ndarray`
        R.A. as a float in radians
-    decl : `float`
+    decl : `float` or `np.ndarray`
        declination as a float in radians
-    sep : `float`
+    sep : `float` or `np.ndarray`
        separation in radians
-    bearing : `float`
+    bearing : `float` or `np.ndarray`
        bearing (east of north) in radians
     degrees : `bool`
         arguments and returnes are in degrees (False for radians).
 
     Returns
     -------
-    ra : `float`
+    ra : `float` or `np.ndarray`
        R.A. Right Ascension
-    decl : `float`
+    decl : `float` or `np.ndarray`
        declination
 
+    Notes
+    -----
+    Array arguments are broadcast against each other.
+
     """
     # Use cos formula:
     # cos(a)=cos(b)*cos(c)+sin(b)*sin(c)*cos(A)
@@ -48,8 +52,8 @@ def offset_sep_bear(ra, decl, sep, bearing, degrees=False):
 
     # Hack to match astropy behaviour at poles
     near_pole = np.abs(np.cos(decl)) < 1e-12
-    if near_pole:
-        dra = np.pi / 2 + np.cos(np_sep) * (np.pi / 2 - bearing)
+    if np.any(near_pole):
+        dra = np.where(near_pole, np.pi / 2 + np.cos(np_sep) * (np.pi / 2 - bearing), dra)
 
     new_ra = ra + dra
 
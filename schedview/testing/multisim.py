@@ -0,0 +1,218 @@
+import time
+import tracemalloc
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from schedview.compute.multisim import (
+    compute_matched_visit_delta_statistics,
+    count_visits_by_sim,
+    make_fraction_common_matrix,
+    match_visits_across_sims,
+    often_repeated_fields,
+)
+
+__all__ = [
+    "MULTISIM_SCALING_FUNCTIONS",
+    "make_synthetic_multisim_visits",
+    "measure_multisim_scaling",
+]
+
+BANDS = ("u", "g", "r", "i", "z", "y")
+
+
+def make_synthetic_multisim_visits(
+    num_sims: int = 5,
+    num_visits: int = 1000,
+    num_fields: int | None = None,
+    dither: float = 0.0,
+    jitter: float = 30.0,
+    replace_fraction: float = 0.1,
+    start_time: str = "2025-09-15T00:00:00Z",
+    seed: int = 6563,
+) -> pd.DataFrame:
+    """Make a reproducible table of visits from several similar simulations.
+
+    Each simulation follows the same underlying sequence of visits, with
+    some visits replaced by visits to other fields, and with random
+    perturbations of visit times and pointings.
+
+    Parameters
+    ----------
+    num_sims : `int`, optional
+        The number of simulations, by default 5.
+    num_visits : `int`, optional
+        The number of visits in each simulation, by default 1000.
+    num_fields : `int` or `None`, optional
+        The number of distinct fields (pointing, band, and exposure time
+        combinations) visited. By default, one for every four visits.
+    dither : `float`, optional
+        The standard deviation of random offsets of each visit's pointing
+        from its field center, in degrees, by default 0.
+    jitter : `float`, optional
+        The standard deviation of random offsets of each visit's start time
+        from the underlying sequence, in seconds, by default 30.
+    replace_fraction : `float`, optional
+        The fraction of visits in each simulation replaced by a visit to
+        a random field, by default 0.1.
+    start_time : `str`, optional
+        The start time of the first visit in the underlying sequence,
+        by default ``"2025-09-15T00:00:00Z"``.
+    seed : `int`, optional
+        The random number generator seed, by default 6563.
+
+    Returns
+    -------
+    visits : `pd.DataFrame`
+        Visits with ``fieldRA``, ``fieldDec``, ``band``,
+        ``visitExposureTime``, ``sim_index`` (starting at 1), ``label``,
+        ``start_timestamp``, and ``observationStartMJD`` columns, indexed
+        by ``observationId``.
+    """
+    rng = np.random.default_rng(seed=seed)
+    if num_fields is None:
+        num_fields = max(1, num_visits // 4)
+
+    field_ra = rng.uniform(0, 360, num_fields)
+    field_decl = np.degrees(np.arcsin(rng.uniform(-1, np.sin(np.radians(10)), num_fields)))
+    field_band = rng.choice(BANDS, num_fields)
+    field_exptime = np.where(rng.uniform(size=num_fields) < 0.1, 15.0, 30.0)
+
+    base_field = rng.integers(0, num_fields, num_visits)
+    base_seconds = np.cumsum(rng.uniform(30, 45, num_visits))
+
+    sim_visits_list = []
+    for sim_index in range(1, num_sims + 1):
+        field = base_field.copy()
+        replaced = rng.uniform(size=num_visits) < replace_fraction
+        field[replaced] = rng.integers(0, num_fields, np.count_nonzero(replaced))
+        seconds = np.sort(base_seconds + rng.normal(0, jitter, num_visits))
+        decl = np.clip(field_decl[field] + rng.normal(0, dither, num_visits), -90, 90)
+        ra = (field_ra[field] + rng.normal(0, dither, num_visits) / np.cos(np.radians(decl))) % 360
+        start_timestamp = pd.to_datetime(start_time) + pd.to_timedelta(seconds, unit="s")
+
+        sim_visits_list.append(
+            pd.DataFrame(
+                {
+                    "fieldRA": ra,
+                    "fieldDec": decl,
+                    "band": field_band[field],
+                    "visitExposureTime": field_exptime[field],
+                    "sim_index": sim_index,
+                    "label": f"Sim {sim_index}",
+                    "start_timestamp": start_timestamp,
+                    "observationStartMJD": start_timestamp.to_julian_date() - 2400000.5,
+                },
+                index=pd.Index(np.arange(num_visits), name="observationId"),
+            )
+        )
+
+    visits = pd.concat(sim_visits_list)
+    return visits
+
+
+MULTISIM_SCALING_FUNCTIONS: dict[str, Callable[[dict], object]] = {
+    "often_repeated_fields": lambda inputs: often_repeated_fields(inputs["visits"]),
+    "count_visits_by_sim": lambda inputs: count_visits_by_sim(inputs["visits"]),
+    "make_fraction_common_matrix": lambda inputs: make_fraction_common_matrix(inputs["visit_counts"]),
+    "match_visits_across_sims": lambda inputs: match_visits_across_sims(inputs["start_times"], (1, 2)),
+    "compute_matched_visit_delta_statistics": lambda inputs: compute_matched_visit_delta_statistics(
+        inputs["visits"]
+    ),
+}
+
+
+def measure_multisim_scaling(
+    scales: tuple[int, ...] = (1, 10, 100),
+    base_num_visits: int = 20,
+    num_sims: int = 5,
+    functions: dict[str, Callable[[dict], object]] | None = None,
+    seed: int = 6563,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Measure how the time and memory used by multisim functions scale.
+
+    Parameters
+    ----------
+    scales : `tuple` [`int`], optional
+        Factors by which to multiply ``base_num_visits``,
+        by default (1, 10, 100).
+    base_num_visits : `int`, optional
+        The number of visits in each simulation at a scale of 1,
+        by default 20.
+    num_sims : `int`, optional
+        The number of simulations, by default 5.
+    functions : `dict` or `None`, optional
+        Functions to measure, keyed by name. Each is called with a `dict`
+        of inputs: ``visits`` (from `make_synthetic_multisim_visits`),
+        ``visit_counts`` (from
+        `schedview.compute.multisim.count_visits_by_sim`), and
+        ``start_times`` (the start times of visits in simulations 1 and 2,
+        indexed by ``sim_index``). By default, `MULTISIM_SCALING_FUNCTIONS`.
+    seed : `int`, optional
+        The random number generator seed, by default 6563.
+
+    Returns
+    -------
+    measurements : `pd.DataFrame`
+        One row for each function at each scale, with columns ``function``,
+        ``scale``, ``num_visits`` (per simulation), ``seconds`` (wall clock
+        time), and ``peak_memory`` (peak memory allocated through Python,
+        in bytes).
+    exponents : `pd.DataFrame`
+        Indexed by function, the ``seconds`` and ``peak_memory`` columns
+        hold the slopes of a linear fit of the log of each against the log
+        of the number of visits: 1 for linear scaling, 2 for quadratic.
+    """
+    if functions is None:
+        functions = MULTISIM_SCALING_FUNCTIONS
+
+    measurement_list = []
+    for scale in scales:
+        num_visits = scale * base_num_visits
+        visits = make_synthetic_multisim_visits(num_sims=num_sims, num_visits=num_visits, seed=seed)
+        inputs = {
+            "visits": visits,
+            "visit_counts": count_visits_by_sim(visits),
+            "start_times": visits.loc[visits.sim_index.isin((1, 2)), :]
+            .set_index("sim_index")
+            .start_timestamp,
+        }
+
+        for name, function in functions.items():
+            start_seconds = time.perf_counter()
+            function(inputs)
+            seconds = time.perf_counter() - start_seconds
+
+            # Measure memory in a separate call, so that the overhead of
+            # tracing allocations does not inflate the time.
+            tracemalloc.start()
+            function(inputs)
+            _, peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            measurement_list.append(
+                {
+                    "function": name,
+                    "scale": scale,
+                    "num_visits": num_visits,
+                    "seconds": seconds,
+                    "peak_memory": peak_memory,
+                }
+            )
+
+    measurements = pd.DataFrame(measurement_list)
+
+    def _log_log_slope(these_measurements: pd.DataFrame) -> pd.Series:
+        log_num_visits = np.log(these_measurements["num_visits"])
+        return pd.Series(
+            {
+                column: np.polyfit(log_num_visits, np.log(these_measurements[column]), 1)[0]
+                for column in ("seconds", "peak_memory")
+            }
+        )
+
+    exponents = measurements.groupby("function", sort=False)[["num_visits", "seconds", "peak_memory"]].apply(
+        _log_log_slope
+    )
+
+    return measurements, exponents
@@ -0,0 +1,192 @@
+import datetime
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+from uuid import UUID
+
+import numpy as np
+import pandas as pd
+from rubin_scheduler.scheduler.utils import ObservationArray, SchemaConverter
+
+import schedview.collect.multisim
+from schedview import DayObs
+from schedview.collect.multisim import (
+    _stackers_for_columns,
+    read_multiple_prenights,
+    read_multiple_prenights_normalized,
+)
+from schedview.collect.visits import NIGHT_STACKERS
+from schedview.compute.multisim import encode_field_key
+
+TEST_DAY_OBS = DayObs.from_date("2025-10-29")
+TEST_URLS = ("s3://dummy/visits_1.h5", "s3://dummy/visits_2.h5")
+
+
+def _make_test_visits(seed):
+    rng = np.random.default_rng(seed)
+    num_visits = 40
+    visits = SchemaConverter().obs2opsim(ObservationArray(num_visits)).reset_index(drop=True)
+    visit_gaps = rng.uniform(30, 300, num_visits) / 86400
+    visits["observationStartMJD"] = TEST_DAY_OBS.mjd + 1.0 + np.cumsum(visit_gaps)
+    visits["observationStartLST"] = rng.uniform(0, 360, num_visits)
+    visits["fieldRA"] = rng.uniform(0, 360, num_visits)
+    visits["fieldDec"] = rng.uniform(-80, 10, num_visits)
+    visits["visitTime"] = 34.0
+    visits["visitExposureTime"] = 30.0
+    visits["band"] = rng.choice(["g", "r", "i"], num_visits)
+    visits["target_name"] = rng.choice(["", "DD:COSMOS"], num_visits)
+    # A visit from the following night, which should never be returned.
+    visits.iloc[num_visits - 1, visits.columns.get_loc("observationStartMJD")] += 1.0
+    return visits
+
+
+TEST_VISITS = {url: _make_test_visits(seed) for seed, url in enumerate(TEST_URLS)}
+
+TEST_PRENIGHT_INDEX = pd.DataFrame(
+    [
+        {
+            "visitseq_uuid": UUID(f"60a4a166-3dbc-4de0-8d38-d9933e243b9{daily_id}"),
+            "visitseq_url": url,
+            "visitseq_label": f"Test simulation {daily_id}",
+            "config_url": None,
+            "scheduler_version": "v3.18.1",
+            "sim_runner_kwargs": None,
+            "sim_creation_day_obs": datetime.date(2025, 10, 29),
+            "daily_id": daily_id,
+            "tags": ["ideal", "nominal", "prenight"],
+        }
+        for daily_id, url in enumerate(TEST_URLS, start=1)
+    ]
+).set_index("visitseq_uuid")
+
+
+TEST_QUERIES = []
+
+
+def _stub_get_visits(visitseq_url, query=None, stackers=None):
+    # Like get_visits, apply the query before running the stackers.
+    TEST_QUERIES.append(query)
+    visits = TEST_VISITS[visitseq_url]
+    if query is not None:
+        visits = visits.query(query)
+    if stackers:
+        visit_records = visits.to_records(index=False)
+        for stacker in stackers:
+            visit_records = stacker.run(visit_records)
+        visits = pd.DataFrame(visit_records)
+    return visits.copy()
+
+
+@patch.object(schedview.collect.multisim, "HAVE_SIM_ARCHIVE", True)
+@patch.object(
+    schedview.collect.multisim,
+    "get_prenight_index",
+    lambda *args, **kwargs: TEST_PRENIGHT_INDEX,
+    create=True,
+)
+@patch.object(
+    schedview.collect.multisim,
+    "vseqarchive",
+    SimpleNamespace(get_visits=_stub_get_visits),
+    create=True,
+)
+class TestReadMultiplePrenights(unittest.TestCase):
+    def test_read_multiple_prenights(self):
+        visits = read_multiple_prenights(TEST_DAY_OBS, TEST_DAY_OBS)
+        assert set(visits["sim_index"]) == {1, 2}
+        assert len(visits) == sum(len(v) - 1 for v in TEST_VISITS.values())
+        assert "overhead" in visits.columns
+        assert "coords" in visits.columns
+        assert "label" in visits.columns
+        assert "fieldKey" not in visits.columns
+
+    def test_read_multiple_prenights_normalized(self):
+        visits, simulations = read_multiple_prenights_normalized(TEST_DAY_OBS, TEST_DAY_OBS)
+        assert "label" not in visits.columns
+        assert set(visits["sim_index"]) == set(simulations.index) == {1, 2}
+        assert simulations.loc[2, "label"] == "Test simulation 2"
+        assert "visitseq_uuid" in simulations.columns
+
+    def test_columns(self):
+        columns = ["observationStartMJD", "band", "overhead", "label"]
+        visits = read_multiple_prenights(TEST_DAY_OBS, TEST_DAY_OBS, columns=columns)
+        assert set(visits.columns) == set(columns) | {"sim_index"}
+
+        all_visits = read_multiple_prenights(TEST_DAY_OBS, TEST_DAY_OBS)
+        pd.testing.assert_frame_equal(visits, all_visits.loc[:, visits.columns], check_dtype=False)
+
+    def test_field_key_column(self):
+        visits = read_multiple_prenights(TEST_DAY_OBS, TEST_DAY_OBS, columns=["fieldKey"])
+        all_visits = read_multiple_prenights(TEST_DAY_OBS, TEST_DAY_OBS)
+        assert set(visits.columns) == {"fieldKey", "sim_index"}
+        np.testing.assert_array_equal(visits["fieldKey"], encode_field_key(all_visits))
+
+    def test_stackers_for_columns(self):
+        stacker_a = SimpleNamespace(cols_added=["a"], cols_req=["x"])
+        stacker_b = SimpleNamespace(cols_added=["b"], cols_req=["a", "y"])
+        stacker_c = SimpleNamespace(cols_added=["c"], cols_req=["z"])
+        stackers = [stacker_a, stacker_b, stacker_c]
+
+        needed_stackers, needed_columns = _stackers_for_columns(stackers, ["b"])
+        assert needed_stackers == [stacker_a, stacker_b]
+        assert needed_columns == {"a", "b", "x", "y"}
+
+        needed_stackers, needed_columns = _stackers_for_columns(stackers, ["coords"])
+        assert needed_stackers == []
+        assert needed_columns == {"coords", "fieldRA", "fieldDec"}
+
+        needed_stackers, needed_columns = _stackers_for_columns(NIGHT_STACKERS, ["overhead"])
+        assert [type(s).__name__ for s in needed_stackers] == ["OverheadStacker"]
+        assert "observationStartMJD" in needed_columns
+
+    def test_filters(self):
+        all_visits = read_multiple_prenights(TEST_DAY_OBS, TEST_DAY_OBS)
+
+        visits = read_multiple_prenights(TEST_DAY_OBS, TEST_DAY_OBS, bands=["r", "i"])
+        assert len(visits) == np.sum(all_visits["band"].isin(["r", "i"]))
+        assert set(visits["band"]) <= {"r", "i"}
+
+        mjd_range = (TEST_DAY_OBS.mjd + 1.02, TEST_DAY_OBS.mjd + 1.05)
+        visits = read_multiple_prenights(TEST_DAY_OBS, TEST_DAY_OBS, mjd_range=mjd_range)
+        in_range = (all_visits["observationStartMJD"] >= mjd_range[0]) & (
+            all_visits["observationStartMJD"] < mjd_range[1]
+        )
+        assert 0 < len(visits) == np.sum(in_range)
+
+        visits = read_multiple_prenights(TEST_DAY_OBS, TEST_DAY_OBS, target_names=["DD:COSMOS"])
+        assert len(visits) == np.sum(all_visits["target_name"] == "DD:COSMOS")
+        assert set(visits["target_name"]) == {"DD:COSMOS"}
+
+    def test_filters_in_query(self):
+        # Without stackers, filters are applied by the archive query.
+        TEST_QUERIES.clear()
+        visits = read_multiple_prenights(
+            TEST_DAY_OBS, TEST_DAY_OBS, stackers=None, bands=["r"], target_names=["DD:COSMOS"]
+        )
+        assert len(TEST_QUERIES) == len(TEST_URLS)
+        assert all("band in" in query and "target_name in" in query for query in TEST_QUERIES)
+        assert set(visits["band"]) == {"r"}
+        assert set(visits["target_name"]) == {"DD:COSMOS"}
+
+        TEST_QUERIES.clear()
+        visits = read_multiple_prenights(
+            TEST_DAY_OBS, TEST_DAY_OBS, columns=["observationStartMJD", "band"], bands=["r"]
+        )
+        assert all("band in" in query for query in TEST_QUERIES)
+        assert set(visits["band"]) == {"r"}
+
+        # With stackers, the query selects the whole night.
+        TEST_QUERIES.clear()
+        read_multiple_prenights(TEST_DAY_OBS, TEST_DAY_OBS, bands=["r"])
+        assert not any("band in" in query for query in TEST_QUERIES)
+
+    def test_filtered_overhead(self):
+        all_visits = read_multiple_prenights(TEST_DAY_OBS, TEST_DAY_OBS)
+        for columns in (None, ["observationStartMJD", "overhead"]):
+            visits = read_multiple_prenights(
+                TEST_DAY_OBS, TEST_DAY_OBS, columns=columns, bands=["r"], target_names=[""]
+            )
+            assert len(visits) > 0
+            expected = all_visits.loc[(all_visits["band"] == "r") & (all_visits["target_name"] == "")]
+            np.testing.assert_array_equal(visits.index, expected.index)
+            np.testing.assert_allclose(visits["overhead"], expected["overhead"])
@@ -1,9 +1,23 @@
+import datetime
+import os
 import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
 
 import numpy as np
 import pandas as pd
 
-from schedview.compute.astro import compute_central_night, night_events
+from schedview.compute.astro import (
+    MODEL_SKY_SUMMARY_DIR_ENV_VAR,
+    NIGHT_EVENT_NAMES,
+    compute_central_night,
+    convert_evening_date_to_night_of_survey,
+    get_median_model_sky,
+    night_events,
+    write_model_sky_summary_table,
+    write_night_events_table,
+)
+from schedview.dayobs import DayObs
 
 TEST_MJDS = [60000.6, 60000.8, 60001.2]
 
@@ -23,3 +37,34 @@ class TestComputeAstro(unittest.TestCase):
             computed_night_events = night_events(computed_night)
             computed_night_middle_mjd = computed_night_events.loc["night_middle", "MJD"]
             assert np.abs(computed_night_middle_mjd - mjd) <= 0.5
+
+    def test_night_events_table(self):
+        night_date = datetime.date(2025, 6, 1)
+        events = night_events(night_date)
+        assert list(events.index) == list(NIGHT_EVENT_NAMES)
+        assert events.loc["sunset", "MJD"] < events.loc["night_middle", "MJD"] < events.loc["sunrise", "MJD"]
+
+        with TemporaryDirectory() as temp_dir:
+            table_path = write_night_events_table(temp_dir)
+            table = np.load(table_path, mmap_mode="r")
+            night = convert_evening_date_to_night_of_survey(night_date)
+            row = table[table["night"] == night][0]
+            for event in NIGHT_EVENT_NAMES:
+                assert row[event] == events.loc[event, "MJD"]
+                assert row[f"{event}_lst"] == events.loc[event, "LST"]
+
+    def test_model_sky_summary_table(self):
+        day_obs = DayObs.from_date("2025-11-21")
+        model_sky = get_median_model_sky(day_obs, bands=("g", "r"))
+
+        with TemporaryDirectory() as temp_dir:
+            table_path = write_model_sky_summary_table(temp_dir, day_obs, day_obs, percentiles=(10, 90))
+            table = np.load(table_path, mmap_mode="r")
+            assert set(table["day_obs_mjd"]) == {day_obs.mjd}
+
+            with patch.dict(os.environ, {MODEL_SKY_SUMMARY_DIR_ENV_VAR: temp_dir}):
+                summarized_model_sky = get_median_model_sky(day_obs, bands=("g", "r"), percentiles=(10, 90))
+
+        pd.testing.assert_frame_equal(summarized_model_sky[model_sky.columns], model_sky)
+        assert np.all(summarized_model_sky["r_p10"] <= summarized_model_sky["r"])
+        assert np.all(summarized_model_sky["r"] <= summarized_model_sky["r_p90"])
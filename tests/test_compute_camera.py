@@ -0,0 +1,43 @@
+import unittest
+
+import numpy as np
+from numpy.random import default_rng
+
+from schedview.compute.camera import LsstCameraFootprintPerimeter
+
+
+class TestLsstCameraFootprintPerimeter(unittest.TestCase):
+    def test_eq_vertices(self):
+        rng = default_rng(6563)
+        num_pointings = 50
+        ra = rng.uniform(0, 360, num_pointings)
+        decl = np.degrees(np.arcsin(rng.uniform(-1, 1, num_pointings)))
+        rotation = rng.uniform(-180, 180, num_pointings)
+
+        # Include pointings near the RA wrap and the poles
+        ra[:3] = [0.0, 359.9, 0.1]
+        decl[3:6] = [90.0, -89.5, 88.2]
+
+        camera_perimeter = LsstCameraFootprintPerimeter()
+        vertex_ras, vertex_decls = camera_perimeter.eq_vertices(ra, decl, rotation)
+        self.assertEqual(vertex_ras.shape, (num_pointings, 13))
+        self.assertEqual(vertex_decls.shape, (num_pointings, 13))
+        self.assertTrue(np.all((vertex_ras >= 0) & (vertex_ras < 360)))
+
+        for i in range(num_pointings):
+            astropy_ras, astropy_decls = camera_perimeter.single_eq_vertices(ra[i], decl[i], rotation[i])
+            delta_ra = (vertex_ras[i] - astropy_ras + 180) % 360 - 180
+            delta_ra_arcsec = 3600 * np.abs(delta_ra * np.cos(np.radians(astropy_decls)))
+            self.assertLess(np.max(delta_ra_arcsec), 1e-3)
+            self.assertLess(3600 * np.max(np.abs(vertex_decls[i] - astropy_decls)), 1e-3)
+
+    def test_call(self):
+        camera_perimeter = LsstCameraFootprintPerimeter()
+        ra = np.array([10.0, 200.0])
+        decl = np.array([-30.0, 5.0])
+        vertex_ras, vertex_decls = camera_perimeter(ra, decl, 20.0)
+        self.assertEqual(len(vertex_ras), 2)
+        self.assertEqual(len(vertex_decls), 2)
+        for vertex_ra, this_ra in zip(vertex_ras, ra):
+            self.assertEqual(vertex_ra.shape, (13,))
+            self.assertLess(np.max(np.abs(vertex_ra - this_ra)), 3.0)
@@ -5,15 +5,19 @@ import healpy as hp
 import numpy as np
 import numpy.typing as npt
 import pandas as pd
+from astropy.coordinates import SkyCoord
 
 from schedview import DECL_COL, POINTING_COL, RA_COL
 from schedview.compute.comparesim import (
+    ReferencePointingMatcher,
+    combine_completed_with_normalized_sims,
     combine_completed_with_sims,
     compute_obs_sim_offsets,
     compute_offset_stats,
     find_nearest_pointing_ids,
     offsets_of_coord_band,
 )
+from schedview.compute.multisim import join_sim_metadata
 
 RANDOM_NUMBER_GENERATOR = np.random.default_rng(6563)
 
@@ -179,6 +183,21 @@ class TestComputeObsSimOffsets(unittest.TestCase):
         sim_indexes = result.index.get_level_values("sim_index").unique()
         assert set(sim_indexes) == set(range(self.num_sims + 1)) - set([0])
 
+    def test_compute_obs_sim_offsets_unequal_counts(self):
+        # Drop some visits so fields have different numbers of visits in
+        # different simulations, and compare with matching field by field.
+        visits = self.visits.iloc[::4]
+        result = compute_obs_sim_offsets(visits, obs_index=0)
+        for sim_index, pointing_id, band in (
+            visits.query("sim_index != 0").groupby(["sim_index", POINTING_COL, "band"]).groups
+        ):
+            field_visits = visits.loc[(visits[POINTING_COL] == pointing_id) & (visits["band"] == band)]
+            expected = offsets_of_coord_band(sim_index, field_visits, 0)
+            if len(expected) == 0:
+                continue
+            these_deltas = result.loc[[(sim_index, pointing_id, band)], "delta"]
+            np.testing.assert_array_equal(these_deltas.to_numpy(), expected["delta"].to_numpy())
+
 
 class TestComputeOffsetStats(unittest.TestCase):
 
@@ -223,6 +242,22 @@ class TestFindNearestPointingIds(unittest.TestCase):
         np.testing.assert_array_equal(matched_ids, expected_ids)
         np.testing.assert_array_almost_equal(match_separation, expected_separation, decimal=10)
 
+    def test_reference_pointing_matcher(self):
+        pointing_ids = np.arange(100, 300)
+        pointing_ras = RANDOM_NUMBER_GENERATOR.uniform(0, 360, len(pointing_ids))
+        pointing_decls = np.degrees(np.arcsin(RANDOM_NUMBER_GENERATOR.uniform(-1, 1, len(pointing_ids))))
+        matcher = ReferencePointingMatcher(pointing_ids, pointing_ras, pointing_decls)
+
+        ra = RANDOM_NUMBER_GENERATOR.uniform(0, 360, 50)
+        decl = RANDOM_NUMBER_GENERATOR.uniform(-90, 90, 50)
+        matched_ids, match_separation = matcher.match(ra, decl)
+
+        coords = SkyCoord(ra, decl, unit="deg")
+        reference_coords = SkyCoord(pointing_ras, pointing_decls, unit="deg")
+        match_index, expected_separation, _ = coords.match_to_catalog_sky(reference_coords)
+        np.testing.assert_array_equal(matched_ids, pointing_ids[match_index])
+        np.testing.assert_array_almost_equal(match_separation, expected_separation.deg, decimal=10)
+
 
 class TestComputeCommonFractions(unittest.TestCase):
 
@@ -297,6 +332,27 @@ class TestCombineCompletedWithSims(unittest.TestCase):
         self.assertEqual(len(simulated_rows), 2)
         self.assertTrue(np.all(simulated_rows["sim_index"].isin([1, 2])))
 
+    def test_combine_completed_with_sims_normalized(self):
+        simulations = pd.DataFrame(
+            {"label": ["Sim 1", "Sim 2"], "scheduler_version": ["v1", "v2"]},
+            index=pd.Index([1, 2], name="sim_index"),
+        )
+        visits, combined_simulations = combine_completed_with_normalized_sims(
+            simulated_visits=self.simulated_visits,
+            simulations=simulations,
+            completed_visits=self.completed_visits,
+            scheduler_version="test_version",
+        )
+
+        self.assertEqual(len(visits), 4)
+        self.assertNotIn("label", visits.columns)
+        self.assertEqual(combined_simulations.loc[0, "label"], "Completed")
+        self.assertEqual(combined_simulations.loc[0, "scheduler_version"], "test_version")
+        self.assertEqual(combined_simulations.loc[2, "label"], "Sim 2")
+
+        labels = join_sim_metadata(visits, combined_simulations, ["label"])["label"]
+        self.assertEqual(list(labels), ["Completed", "Completed", "Sim 1", "Sim 2"])
+
     def test_combine_completed_with_sims_no_completed(self):
 
         result = combine_completed_with_sims(
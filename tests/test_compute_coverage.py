@@ -0,0 +1,79 @@
+import unittest
+from tempfile import TemporaryDirectory
+
+import healpy as hp
+import numpy as np
+import pandas as pd
+from numpy.random import default_rng
+
+from schedview.compute.coverage import compute_hpix_coverage_map, compute_visit_coverage
+
+NSIDE = 256
+
+
+class TestVisitCoverage(unittest.TestCase):
+    def setUp(self):
+        rng = default_rng(6563)
+        num_visits = 200
+        self.visits = pd.DataFrame(
+            {
+                "fieldRA": rng.uniform(0, 360, num_visits),
+                "fieldDec": np.degrees(np.arcsin(rng.uniform(-1, 0.3, num_visits))),
+                "rotSkyPos": rng.uniform(0, 360, num_visits),
+                "band": rng.choice(["g", "r", "i"], num_visits),
+                "visitExposureTime": rng.choice([15.0, 30.0], num_visits),
+            }
+        )
+
+    def test_compute_visit_coverage(self):
+        coverage = compute_visit_coverage(self.visits, nside=NSIDE)
+        self.assertEqual(coverage.shape, (len(self.visits), hp.nside2npix(NSIDE)))
+
+        pixel_area = hp.nside2pixarea(NSIDE, degrees=True)
+        for visit_index, visit in self.visits.iterrows():
+            covered_hpids = coverage[[visit_index], :].indices
+
+            # The footprint covers 21 rafts, each 0.7 degrees on a side.
+            self.assertAlmostEqual(len(covered_hpids) * pixel_area, 21 * 0.7**2, delta=1.0)
+
+            # The healpixel at the pointing is covered, and covered healpixels
+            # are close to it.
+            self.assertIn(hp.ang2pix(NSIDE, visit.fieldRA, visit.fieldDec, lonlat=True), covered_hpids)
+            center = hp.ang2vec(visit.fieldRA, visit.fieldDec, lonlat=True)
+            hpix_vecs = np.array(hp.pix2vec(NSIDE, covered_hpids)).T
+            max_sep = np.degrees(np.arccos(np.min(hpix_vecs @ center)))
+            self.assertLessEqual(max_sep, np.sqrt(2) * 3.5 / 2)
+
+    def test_rotation(self):
+        nside = 512
+        visits = pd.DataFrame({"fieldRA": [30.0, 30.0], "fieldDec": [-20.0, -20.0], "rotSkyPos": [0.0, 45.0]})
+        coverage = compute_visit_coverage(visits, nside=nside)
+
+        # A point 1.6 degrees north of the pointing is inside the unrotated
+        # footprint, but in a missing corner raft when rotated by 45 degrees.
+        north_hpid = hp.ang2pix(nside, 30.0, -18.4, lonlat=True)
+        self.assertIn(north_hpid, coverage[[0], :].indices)
+        self.assertNotIn(north_hpid, coverage[[1], :].indices)
+
+    def test_compute_hpix_coverage_map(self):
+        coverage = compute_visit_coverage(self.visits, nside=NSIDE)
+        in_g = (self.visits.band == "g").to_numpy()
+        g_counts = compute_hpix_coverage_map(coverage, visit_mask=in_g)
+        g_exptime = compute_hpix_coverage_map(coverage, visit_mask=in_g, values=self.visits.visitExposureTime)
+
+        g_coverage = compute_visit_coverage(self.visits.loc[in_g, :], nside=NSIDE)
+        np.testing.assert_array_equal(g_counts, g_coverage.sum(axis=0))
+        np.testing.assert_array_equal(
+            g_exptime, g_coverage.T @ self.visits.loc[in_g, "visitExposureTime"].to_numpy()
+        )
+        self.assertEqual(compute_hpix_coverage_map(coverage).sum(), coverage.sum())
+
+    def test_cache(self):
+        with TemporaryDirectory() as cache_dir:
+            coverage = compute_visit_coverage(self.visits, nside=NSIDE, cache_dir=cache_dir)
+            cached_coverage = compute_visit_coverage(self.visits, nside=NSIDE, cache_dir=cache_dir)
+            self.assertEqual((coverage != cached_coverage).nnz, 0)
+
+            other_visits = self.visits.assign(rotSkyPos=self.visits.rotSkyPos + 10)
+            other_coverage = compute_visit_coverage(other_visits, nside=NSIDE, cache_dir=cache_dir)
+            self.assertNotEqual((coverage != other_coverage).nnz, 0)
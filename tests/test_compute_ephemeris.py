@@ -0,0 +1,57 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+import astropy.units as u
+import numpy as np
+from astropy.coordinates import SkyCoord, get_body
+from astropy.time import Time
+from numpy.random import default_rng
+
+from schedview.compute.ephemeris import EPHEMERIS_ACCURACY_ARCSEC, EPHEMERIS_GRID_STEPS, compute_body_coords
+
+
+class TestEphemeris(unittest.TestCase):
+    def setUp(self):
+        rng = default_rng(6563)
+        self.mjds = np.sort(rng.uniform(60900, 61000, 100))
+
+    def test_compute_body_coords(self):
+        for body in ("sun", "moon", "mars"):
+            ra, decl = compute_body_coords(body, self.mjds)
+            body_coords = get_body(body, Time(self.mjds, format="mjd", scale="utc"))
+            separation = (
+                SkyCoord(ra * u.deg, decl * u.deg)
+                .separation(SkyCoord(body_coords.ra, body_coords.dec))
+                .arcsec
+            )
+            self.assertLess(np.max(separation), EPHEMERIS_ACCURACY_ARCSEC)
+
+    def test_body_names(self):
+        ra, decl = compute_body_coords("moon", self.mjds)
+        capitalized_ra, capitalized_decl = compute_body_coords("Moon", self.mjds)
+        np.testing.assert_array_equal(capitalized_ra, ra)
+        np.testing.assert_array_equal(capitalized_decl, decl)
+
+        # Bodies without a grid fall back on get_body.
+        with patch.dict(EPHEMERIS_GRID_STEPS):
+            del EPHEMERIS_GRID_STEPS["mars"]
+            ra, decl = compute_body_coords("Mars", self.mjds)
+        body_coords = get_body("mars", Time(self.mjds, format="mjd", scale="utc"))
+        np.testing.assert_allclose(ra, body_coords.ra.deg)
+        np.testing.assert_allclose(decl, body_coords.dec.deg)
+
+    def test_scalar_mjd(self):
+        ra, decl = compute_body_coords("moon", self.mjds[0])
+        self.assertEqual(ra.shape, (1,))
+        self.assertEqual(decl.shape, (1,))
+
+    def test_cache_dir(self):
+        with TemporaryDirectory() as temp_dir:
+            ra, decl = compute_body_coords("moon", self.mjds, cache_dir=temp_dir)
+            self.assertGreater(len(os.listdir(temp_dir)), 0)
+            cached_ra, cached_decl = compute_body_coords("moon", self.mjds, cache_dir=temp_dir)
+
+        np.testing.assert_allclose(cached_ra, ra)
+        np.testing.assert_allclose(cached_decl, decl)
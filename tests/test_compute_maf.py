@@ -8,7 +8,12 @@ from rubin_sim.data import get_baseline
 
 from schedview import DayObs
 from schedview.collect import read_opsim
-from schedview.compute.maf import make_metric_progress_df
+from schedview.compute.maf import (
+    _constraints_need_sqlite,
+    _constraints_translatable,
+    constraint_to_mask,
+    make_metric_progress_df,
+)
 
 try:
     from rubin_sim import maf
@@ -20,6 +25,7 @@ try:
         compute_mixed_scalar_metric,
         compute_scalar_metric_at_mjds,
         compute_scalar_metric_at_one_mjd,
+        compute_scalar_metric_at_sorted_mjds,
     )
 except ModuleNotFoundError:
     HAVE_MAF = False
@@ -48,6 +54,17 @@ class TestComputeMAF(unittest.TestCase):
         self.assertGreater(np.min(values), 0.0)
         self.assertLess(np.max(values), 300)
 
+    @unittest.skipUnless(HAVE_MAF, "No maf installation")
+    def test_compute_metric_by_visit_engines(self):
+        visits = self.visits
+        constraint = f"observationStartMjd BETWEEN {self.start_mjd} AND {self.start_mjd+1}"
+        metric = maf.SumMetric(col="t_eff", metric_name="Total Teff")
+        default_values = compute_metric_by_visit(visits, metric, constraint=constraint)
+        sqlite_values = compute_metric_by_visit(visits, metric, constraint=constraint, sqlite=True)
+        memory_values = compute_metric_by_visit(visits, metric, constraint=constraint, sqlite=False)
+        pd.testing.assert_series_equal(default_values, sqlite_values)
+        np.testing.assert_allclose(memory_values.dropna(), sqlite_values.dropna())
+
     @unittest.skipUnless(HAVE_MAF, "No maf installation")
     def test_compute_hpix_metric_in_bands(self):
         visits = self.visits.query(f"observationStartMJD < {self.start_mjd + 1}")
@@ -60,6 +77,17 @@ class TestComputeMAF(unittest.TestCase):
                 self.assertGreater(np.min(values[band]), 0.0)
                 self.assertLess(np.max(values[band]), 300)
 
+    @unittest.skipUnless(HAVE_MAF, "No maf installation")
+    def test_compute_hpix_metric_in_bands_single_pass(self):
+        visits = self.visits.query(f"observationStartMJD < {self.start_mjd + 1}")
+        metric = maf.SumMetric(col="t_eff", metric_name="Total Teff")
+        by_band = compute_hpix_metric_in_bands(visits, metric, single_pass=False)
+        single_pass = compute_hpix_metric_in_bands(visits, metric, single_pass=True)
+        self.assertEqual(list(by_band.keys()), list(single_pass.keys()))
+        for band in by_band:
+            np.testing.assert_array_equal(by_band[band].mask, single_pass[band].mask)
+            np.testing.assert_allclose(by_band[band].compressed(), single_pass[band].compressed())
+
     @unittest.skipUnless(HAVE_MAF, "No maf installation")
     def test_compute_scalar_metric_at_one_mjd(self):
         visits = self.visits
@@ -121,6 +149,55 @@ class TestComputeMAF(unittest.TestCase):
             self.assertIsInstance(value, (int, float))
             self.assertGreaterEqual(value, 0.0)
 
+    @unittest.skipUnless(HAVE_MAF, "No maf installation")
+    def test_compute_scalar_metric_at_sorted_mjds(self):
+        visits = self.visits[self.visits.observationStartMJD < self.start_mjd + 10]
+        mjds = self.start_mjd + np.arange(-1, 10, 1.5)
+        for metric, summary_metric in (
+            (maf.CountMetric(col="observationStartMJD", metric_name="count"), None),
+            (maf.Coaddm5Metric(), maf.MedianMetric()),
+            (maf.MeanMetric(col="fiveSigmaDepth"), maf.MeanMetric()),
+        ):
+            independent = compute_scalar_metric_at_mjds(
+                mjds,
+                visits,
+                maf.HealpixSlicer(nside=8, verbose=False),
+                metric,
+                summary_metric=summary_metric,
+                incremental=False,
+            )
+            incremental = compute_scalar_metric_at_sorted_mjds(
+                mjds, visits, maf.HealpixSlicer(nside=8, verbose=False), metric, summary_metric=summary_metric
+            )
+            self.assertEqual(independent.name, incremental.name)
+            np.testing.assert_array_equal(independent.index, incremental.index)
+            np.testing.assert_allclose(independent.values, incremental.values)
+
+        with self.assertRaises(ValueError):
+            compute_scalar_metric_at_sorted_mjds(mjds[::-1], visits, maf.UniSlicer(), maf.CountMetric())
+
+    @unittest.skipUnless(HAVE_MAF, "No maf installation")
+    def test_compute_scalar_metric_at_mjds_data_dependent_slicer(self):
+        # The bins of a OneDSlicer depend on the visits, so sorted MJDs
+        # must not switch to the incremental computation by default.
+        visits = self.visits[self.visits.observationStartMJD < self.start_mjd + 10]
+        mjds = self.start_mjd + np.arange(-1, 10, 1.5)
+
+        def compute(**kwargs):
+            return compute_scalar_metric_at_mjds(
+                mjds,
+                visits,
+                maf.OneDSlicer("fiveSigmaDepth", bin_size=0.1),
+                maf.CountMetric(col="observationStartMJD", metric_name="count"),
+                summary_metric=maf.MaxMetric(),
+                **kwargs,
+            )
+
+        independent = compute(incremental=False)
+        by_default = compute()
+        np.testing.assert_array_equal(independent.index, by_default.index)
+        np.testing.assert_allclose(independent.values, by_default.values)
+
     @unittest.skipUnless(HAVE_MAF, "No maf installation")
     def test_compute_mixed_scalar_metric(self):
 
@@ -158,6 +235,79 @@ class TestComputeMAF(unittest.TestCase):
             self.assertIsInstance(value, (int, float))
             self.assertGreaterEqual(value, 0.0)
 
+    @unittest.skipUnless(HAVE_MAF, "No maf installation")
+    def test_compute_mixed_scalar_metric_matches_concatenation(self):
+        end_visits = self.visits[self.visits.observationStartMJD < self.start_mjd + 10]
+        start_visits = end_visits.sample(n=100, random_state=42).copy()
+        start_visits["observationStartMJD"] = start_visits["observationStartMJD"] + 0.00005
+        end_mjd = self.start_mjd + 8
+        # Deliberately out of order
+        transition_mjds = self.start_mjd + np.array([5, 1, 3])
+
+        result = compute_mixed_scalar_metric(
+            start_visits,
+            end_visits,
+            transition_mjds,
+            mjd=end_mjd,
+            slicer=maf.HealpixSlicer(nside=8, verbose=False),
+            metric=maf.Coaddm5Metric(),
+            summary_metric=maf.MedianMetric(),
+        )
+        np.testing.assert_array_equal(result.index, transition_mjds)
+
+        for transition_mjd in transition_mjds:
+            visits = pd.concat(
+                [
+                    start_visits.query(f"observationStartMJD <= {transition_mjd}"),
+                    end_visits.query(f"observationStartMJD > {transition_mjd}"),
+                ]
+            )
+            expected = compute_scalar_metric_at_one_mjd(
+                end_mjd,
+                visits,
+                maf.HealpixSlicer(nside=8, verbose=False),
+                maf.Coaddm5Metric(),
+                summary_metric=maf.MedianMetric(),
+            )
+            self.assertAlmostEqual(result[transition_mjd], expected[result.name])
+
+    @unittest.skipUnless(HAVE_MAF, "No maf installation")
+    def test_compute_mixed_scalar_metric_data_dependent_slicer(self):
+        # The bins of a OneDSlicer depend on the visits, so it must be set up
+        # separately for each transition.
+        end_visits = self.visits[self.visits.observationStartMJD < self.start_mjd + 10]
+        start_visits = end_visits.sample(n=100, random_state=42).copy()
+        start_visits["fiveSigmaDepth"] = start_visits["fiveSigmaDepth"] + 1.0
+        end_mjd = self.start_mjd + 8
+        transition_mjds = self.start_mjd + np.array([1, 3, 5])
+
+        result = compute_mixed_scalar_metric(
+            start_visits,
+            end_visits,
+            transition_mjds,
+            mjd=end_mjd,
+            slicer=maf.OneDSlicer("fiveSigmaDepth", bin_size=0.1),
+            metric=maf.CountMetric(col="observationStartMJD", metric_name="count"),
+            summary_metric=maf.MaxMetric(),
+        )
+        np.testing.assert_array_equal(result.index, transition_mjds)
+
+        for transition_mjd in transition_mjds:
+            visits = pd.concat(
+                [
+                    start_visits.query(f"observationStartMJD <= {transition_mjd}"),
+                    end_visits.query(f"observationStartMJD > {transition_mjd}"),
+                ]
+            )
+            expected = compute_scalar_metric_at_one_mjd(
+                end_mjd,
+                visits,
+                maf.OneDSlicer("fiveSigmaDepth", bin_size=0.1),
+                maf.CountMetric(col="observationStartMJD", metric_name="count"),
+                summary_metric=maf.MaxMetric(),
+            )
+            self.assertAlmostEqual(result[transition_mjd], expected[result.name])
+
     @unittest.skipUnless(HAVE_MAF, "No maf installation")
     def test_make_metric_progress_df(self):
         # Create some sample data for completed and baseline visits
@@ -217,3 +367,64 @@ class TestComputeMAF(unittest.TestCase):
         assert np.all(np.isnan(result.loc[current_dayobs.end.jd :, "snapshot"]))
         assert np.all(result.loc[: current_dayobs.end.jd, "chimera"] >= 0)
         assert np.all(np.isnan(result.loc[current_dayobs.end.jd :, "chimera"]))
+
+    @unittest.skipUnless(HAVE_MAF, "No maf installation")
+    def test_make_metric_progress_df_parallel(self):
+        current_mjd = self.start_mjd + 5.0
+        progress_kwargs = {
+            "completed_visits": self.visits[self.visits.observationStartMJD < current_mjd],
+            "baseline_visits": self.visits[self.visits.observationStartMJD < current_mjd + 10],
+            "start_dayobs": self.start_dayobs,
+            "last_completed_dayobs": DayObs.from_time(current_mjd),
+            "extrapolation_dayobs": DayObs.from_time(current_mjd + 8),
+            "slicer_factory": maf.UniSlicer,
+            "metric_factory": partial(maf.CountMetric, col="observationStartMJD", metric_name="count"),
+            "freq": "D",
+        }
+        serial_result = make_metric_progress_df(**progress_kwargs)
+        parallel_result = make_metric_progress_df(**progress_kwargs, max_workers=2)
+        pd.testing.assert_frame_equal(serial_result, parallel_result)
+
+
+class TestConstraintToMask(unittest.TestCase):
+
+    def setUp(self):
+        self.visits = pd.DataFrame(
+            {
+                "observationStartMJD": 60000.0 + np.arange(10),
+                "band": list("ugrizyugri"),
+                "scheduler_note": ["DD:COSMOS", "blob_long"] * 5,
+                "night": np.arange(10),
+            }
+        )
+
+    def test_constraint_to_mask(self):
+        cases = {
+            "": np.arange(10),
+            "observationStartMjd BETWEEN 60001 AND 60003": [1, 2, 3],
+            "band = 'r'": [2, 8],
+            'band="r"': [2, 8],
+            "band in ('u', 'g') AND night > 2": [6, 7],
+            "NOT (night < 3 OR night >= 8)": [3, 4, 5, 6, 7],
+            "scheduler_note not like 'DD%'": [1, 3, 5, 7, 9],
+            "(night + 1) * 2 > 10": [5, 6, 7, 8, 9],
+        }
+        for constraint, expected in cases.items():
+            mask = constraint_to_mask(self.visits, constraint)
+            np.testing.assert_array_equal(np.flatnonzero(mask), expected, err_msg=constraint)
+
+    def test_untranslatable_constraint(self):
+        for constraint in ("no_such_column < 3", "night <", "night ~ 3"):
+            with self.assertRaises(ValueError):
+                constraint_to_mask(self.visits, constraint)
+
+    def test_constraints_translatable(self):
+        assert _constraints_translatable(self.visits, ["band = 'r'", "night > 2"])
+        assert not _constraints_translatable(self.visits, ["band = 'r'", "no_such_column < 3"])
+        # Type errors only appear when evaluated on data, and should also
+        # send the computation back to sqlite.
+        assert not _constraints_translatable(self.visits, ["band > 1"])
+
+    def test_constraints_need_sqlite(self):
+        assert not _constraints_need_sqlite(["", None])
+        assert _constraints_need_sqlite(["", "night > 2"])
@@ -1,6 +1,10 @@
 import datetime
 import unittest
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
 
 import astropy.units as u
 import numpy as np
@@ -8,7 +12,16 @@ import pandas as pd
 from astropy.coordinates import AltAz, get_body
 from astropy.time import Time
 
-from schedview import DayObs
+from schedview import DayObs, DayObsArray
+from schedview.dayobs import (
+    DAYOBS_EVENTS,
+    LSE30_ATMOSPHERE,
+    clear_dayobs_cache,
+    compute_dayobs_events,
+    register_dayobs_events,
+    set_dayobs_event_cache_path,
+    unregister_dayobs_events,
+)
 
 try:
     from rubin_scheduler.site_models.almanac import Almanac
@@ -74,6 +87,41 @@ class TestDayObs(unittest.TestCase):
                 self.assert_equal(DayObs.from_time(t.iso), d)
                 self.assert_equal(DayObs.from_time(t.mjd), d)
 
+    def test_dayobs_array(self):
+        expected = [DayObs.from_date(d.date) for d in self.test_values]
+        expected_mjds = [d.mjd for d in self.test_values]
+        for day_obs_array in (
+            DayObsArray.from_dates([d.date for d in self.test_values]),
+            DayObsArray.from_dates([d.yyyymmdd for d in self.test_values]),
+            DayObsArray.from_dates([d.iso_date for d in self.test_values]),
+            DayObsArray.from_dates(np.array(expected_mjds)),
+            DayObsArray.from_times([d.iso_times[0] for d in self.test_values]),
+            DayObsArray.from_times(Time([d.iso_times[1] for d in self.test_values])),
+            DayObsArray.from_times(Time([d.iso_times[1] for d in self.test_values]).mjd),
+            DayObsArray.from_times(Time([d.iso_times[1] for d in self.test_values]).datetime64),
+        ):
+            assert list(day_obs_array.mjd) == expected_mjds
+            assert list(day_obs_array.yyyymmdd) == [d.yyyymmdd for d in self.test_values]
+            assert list(day_obs_array.iso8601) == [d.iso_date for d in self.test_values]
+            assert day_obs_array.date.tolist() == [d.date for d in self.test_values]
+            assert list(day_obs_array.start_mjd) == [d.start.mjd for d in expected]
+            assert list(day_obs_array.end_mjd) == [d.end.mjd for d in expected]
+            assert [d.mjd for d in day_obs_array] == expected_mjds
+
+        # Times on either side of the rollover
+        rollover_mjd = self.test_values[0].mjd + 0.5
+        day_obs_array = DayObsArray.from_times(np.array([rollover_mjd - 1e-6, rollover_mjd]))
+        assert list(day_obs_array.mjd) == [
+            DayObs.from_time(rollover_mjd - 1e-6).mjd,
+            DayObs.from_time(rollover_mjd).mjd,
+        ]
+
+    def test_dayobs_array_lookup(self):
+        events = pd.DataFrame({"sunset": [0.9, 1.9]}, index=pd.Index([60556, 60557], name="day_obs_mjd"))
+        rows = DayObsArray.from_dates([60557, 60556, 60557, 60000]).lookup(events)
+        assert list(rows.index) == [60557, 60556, 60557, 60000]
+        np.testing.assert_array_equal(rows["sunset"], [1.9, 0.9, 1.9, np.nan])
+
     def test_rs_time(self):
         num_nights_tested = 2
 
@@ -184,3 +232,84 @@ class TestDayObs(unittest.TestCase):
             except ValueError:
                 # There might not be a moonrise on this day_obs
                 assert DayObs.from_time(night_times.moonrise).mjd != day_obs.mjd
+
+    def test_compute_dayobs_events(self):
+        first_mjd = DayObs.from_date("2025-03-01").mjd
+        events = compute_dayobs_events(first_mjd, first_mjd + 2)
+        assert list(events.index) == [first_mjd, first_mjd + 1, first_mjd + 2]
+        assert list(events.columns) == list(DAYOBS_EVENTS)
+
+        for mjd, night_events in events.iterrows():
+            day_obs = DayObs.from_date(mjd, int_format="mjd")
+            for event, (body, alt, direction) in DAYOBS_EVENTS.items():
+                try:
+                    event_mjd = day_obs.body_time(body, alt, direction, num_rough_iterations=3).mjd
+                except ValueError:
+                    assert np.isnan(night_events[event])
+                    continue
+                assert np.isclose(night_events[event], event_mjd, rtol=self.time_rtol, atol=self.time_atol)
+
+    def test_register_dayobs_events(self):
+        day_obs_mjd = DayObs.from_date("2025-03-01").mjd
+        events = compute_dayobs_events(day_obs_mjd, day_obs_mjd)
+
+        # Use an obviously wrong time to tell that it came from the table.
+        events.loc[day_obs_mjd, "sunset"] = day_obs_mjd + 0.25
+        register_dayobs_events(events)
+        try:
+            assert DayObs.from_date(day_obs_mjd, int_format="mjd").sunset.mjd == day_obs_mjd + 0.25
+
+            # Instances with a different atmosphere compute their own.
+            day_obs = DayObs.from_date(day_obs_mjd, int_format="mjd", atmosphere=LSE30_ATMOSPHERE)
+            assert day_obs.sunset.mjd != day_obs_mjd + 0.25
+        finally:
+            unregister_dayobs_events(events)
+            clear_dayobs_cache()
+
+        # Tables that have lost their attrs need the site passed explicitly.
+        events.attrs.clear()
+        with self.assertRaises(ValueError):
+            register_dayobs_events(events)
+
+        register_dayobs_events(events, location=DayObs.from_date(day_obs_mjd, int_format="mjd").location)
+        try:
+            assert DayObs.from_date(day_obs_mjd, int_format="mjd").sunset.mjd == day_obs_mjd + 0.25
+        finally:
+            unregister_dayobs_events(events)
+            clear_dayobs_cache()
+
+        with self.assertRaises(ValueError):
+            unregister_dayobs_events(events)
+
+    def test_interned(self):
+        try:
+            day_obs = DayObs.from_date("2025-06-01")
+            assert DayObs.from_date(20250601) is day_obs
+            assert DayObs.from_time("2025-06-02T03:00:00Z", int_format="auto") is day_obs
+            assert DayObs.from_date(day_obs) is day_obs
+            assert DayObs.from_date(20250601, int_format="yyyymmdd") is not day_obs
+            assert DayObs.from_date(20250601, atmosphere=LSE30_ATMOSPHERE) is not day_obs
+
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                instances = list(executor.map(lambda _: DayObs.from_date("2025-06-01"), range(20)))
+            assert all(instance is day_obs for instance in instances)
+
+            # Separately constructed instances share event times.
+            sunset = day_obs.sunset
+            assert DayObs(day_obs.date, "yyyymmdd").sunset == sunset
+        finally:
+            clear_dayobs_cache()
+
+    def test_event_cache_path(self):
+        with TemporaryDirectory() as temp_dir:
+            set_dayobs_event_cache_path(Path(temp_dir).joinpath("dayobs_events.db"))
+            try:
+                sunset = DayObs.from_date("2025-07-01").sunset
+                clear_dayobs_cache()
+
+                # The time is read from the file rather than recomputed.
+                with patch.object(DayObs, "body_time", side_effect=AssertionError("recomputed")):
+                    assert DayObs.from_date("2025-07-01").sunset == sunset
+            finally:
+                set_dayobs_event_cache_path(None)
+                clear_dayobs_cache()
@@ -40,6 +40,33 @@ class TestFootprint(unittest.TestCase):
             assert np.all(footprint_polygons.loc[:, coord] <= 1)
             assert np.all(footprint_polygons.loc[:, coord] >= -1)
 
+    def test_find_healpix_area_polygons_loops(self):
+        nside = 32
+        center = hp.ang2vec(30.0, -20.0, lonlat=True)
+        footprint_regions = np.full(hp.nside2npix(nside), "", dtype=object)
+        footprint_regions[hp.query_disc(nside, center, np.radians(10))] = "ring"
+        footprint_regions[hp.query_disc(nside, center, np.radians(5))] = "disc"
+        footprint_polygons = schedview.compute.footprint.find_healpix_area_polygons(footprint_regions)
+
+        # The disc has one loop, and the ring has an outer and inner loop.
+        num_loops = footprint_polygons.groupby("region").apply(
+            lambda df: df.index.get_level_values("loop").nunique()
+        )
+        assert num_loops["disc"] == 1
+        assert num_loops["ring"] == 2
+
+        # Each loop is closed.
+        for _, loop in footprint_polygons.groupby(["region", "loop"]):
+            assert np.all(loop.iloc[0] == loop.iloc[-1])
+
+        # The disc outline is the inner loop of the ring.
+        disc_vertexes = set(map(tuple, footprint_polygons.loc["disc", ["x", "y", "z"]].values))
+        ring_loop_vertexes = [
+            set(map(tuple, loop.loc[:, ["x", "y", "z"]].values))
+            for _, loop in footprint_polygons.loc[["ring"]].groupby("loop")
+        ]
+        assert disc_vertexes in ring_loop_vertexes
+
     def test_add_footprint_to_skymaps(self):
         footprint = get_current_footprint(NSIDE)[0]["g"]
         psphere = Planisphere()
@@ -1,11 +1,14 @@
+import itertools
 import unittest
 
 import bokeh.models
+import healpy as hp
 import numpy as np
 import pandas as pd
 
 import schedview.compute.multisim
 import schedview.plot.multisim
+import schedview.testing.multisim
 
 NUM_TEST_FIELDS = 5
 TEST_RND_SEED = 6563
@@ -72,6 +75,51 @@ class TestMultisim(unittest.TestCase):
             specified_count = this_field_sequence.count(field_ids.loc[index_value])  # type: ignore
             assert row["count"] == specified_count
 
+    def test_often_repeated_fields_with_tolerance(self):
+        min_counts = 3
+        rng = np.random.default_rng(seed=TEST_RND_SEED)
+        dithered_visits = self.visits.copy()
+        dithered_visits["fieldRA"] += rng.uniform(-1e-4, 1e-4, len(dithered_visits))
+        dithered_visits["fieldDec"] += rng.uniform(-1e-4, 1e-4, len(dithered_visits))
+        often_repeated_fields, often_repeated_field_stats = schedview.compute.multisim.often_repeated_fields(
+            dithered_visits, min_counts=min_counts, tolerance=0.01
+        )
+        # Only fields 2 and 4 are visited at least three times in any sim.
+        assert len(often_repeated_fields) == 2
+
+        for (field_ra, field_decl, band, sim_index), row in often_repeated_field_stats.iterrows():
+            field_id = np.argmin(np.hypot(self.fields.fieldRA - field_ra, self.fields.fieldDec - field_decl))
+            assert self.fields.loc[field_id, "band"] == band
+            assert row["count"] == FIELD_SEQUENCE_IN_SIMS[sim_index].count(field_id)
+
+    def test_cluster_pointings_chain(self):
+        # A chain of pointings, each within the tolerance of the next, but
+        # spanning many times the tolerance.
+        tolerance = 0.01
+        decl = np.arange(20) * 0.8 * tolerance - 30
+        ra = np.full_like(decl, 45.0)
+        field_id, field_ra, field_decl = schedview.compute.multisim.cluster_pointings(ra, decl, tolerance)
+        assert len(field_ra) == len(field_decl) == np.max(field_id) + 1 > 1
+        for this_field_id in np.unique(field_id):
+            field_decls = decl[field_id == this_field_id]
+            assert np.ptp(field_decls) <= 2 * tolerance
+            assert np.all(np.abs(field_decls - field_decl[this_field_id]) <= 2 * tolerance)
+
+        # Repeated pointings still form one field.
+        field_id, _, _ = schedview.compute.multisim.cluster_pointings(
+            np.repeat(ra[:2], 3), np.repeat(decl[:2], 3), tolerance
+        )
+        assert np.all(field_id == 0)
+
+    def test_normalize_sim_metadata(self):
+        visits, simulations = schedview.compute.multisim.normalize_sim_metadata(self.visits)
+        assert "label" not in visits.columns
+        assert list(simulations.index) == list(range(len(FIELD_SEQUENCE_IN_SIMS)))
+        assert list(simulations["label"]) == [f"sim{i}" for i in range(len(FIELD_SEQUENCE_IN_SIMS))]
+
+        joined_visits = schedview.compute.multisim.join_sim_metadata(visits, simulations)
+        pd.testing.assert_frame_equal(joined_visits, self.visits.loc[:, joined_visits.columns])
+
     def test_count_visits_by_sim(self):
         visit_spec_columns = ("fieldRA", "fieldDec", "band", "visitExposureTime")
         counts_df = schedview.compute.multisim.count_visits_by_sim(
@@ -81,6 +129,29 @@ class TestMultisim(unittest.TestCase):
             for sim_id, field_sequence in enumerate(FIELD_SEQUENCE_IN_SIMS):
                 assert counts_df.loc[tuple(field_row), sim_id] == field_sequence.count(field_id)
 
+    def test_field_key(self):
+        nside = 2**18
+        field_key = schedview.compute.multisim.encode_field_key(self.visits, nside=nside)
+        assert field_key.dtype == np.int64
+        fields = schedview.compute.multisim.decode_field_key(field_key, nside=nside)
+        hpid = hp.ang2pix(nside, self.visits.fieldRA, self.visits.fieldDec, lonlat=True)
+        assert np.all(fields["fieldHpid"].to_numpy() == hpid.to_numpy())
+        assert np.all(fields["band"].to_numpy() == self.visits["band"].to_numpy())
+        assert np.all(fields["visitExposureTime"].to_numpy() == self.visits["visitExposureTime"].to_numpy())
+
+        # Counts should not depend on whether the key is precomputed.
+        visits_with_key = self.visits.assign(fieldKey=field_key)
+        pd.testing.assert_frame_equal(
+            schedview.compute.multisim.count_visits_by_sim(visits_with_key),
+            schedview.compute.multisim.count_visits_by_sim(self.visits),
+        )
+
+        # Stored keys are made with nside 2**18, so are not used with others.
+        pd.testing.assert_frame_equal(
+            schedview.compute.multisim.count_visits_by_sim(visits_with_key, nside=2**10),
+            schedview.compute.multisim.count_visits_by_sim(self.visits, nside=2**10),
+        )
+
     def test_common_fraction(self):
         visit_counts = schedview.compute.multisim.count_visits_by_sim(self.visits)
         for sim1, field_tuple1 in enumerate(FIELD_SEQUENCE_IN_SIMS):
@@ -142,6 +213,44 @@ class TestMultisim(unittest.TestCase):
         )
         assert len(matched_visits) == 0
 
+    def test_match_visits_across_sims_is_optimal(self):
+        rng = np.random.default_rng(seed=TEST_RND_SEED)
+        max_match_dist = 300
+        for num_longer, num_shorter in ((5, 3), (7, 4), (6, 6), (8, 2)):
+            start_times = pd.Series(
+                pd.to_datetime("2025-09-15T02:00:00Z")
+                + pd.to_timedelta(
+                    np.concatenate(
+                        [
+                            np.sort(rng.uniform(0, 3600, num_longer)),
+                            np.sort(rng.uniform(0, 3600, num_shorter)),
+                        ]
+                    ),
+                    unit="s",
+                ),
+                index=pd.Index([1] * num_longer + [2] * num_shorter, name="sim_index"),
+            )
+            matched_visits = schedview.compute.multisim.match_visits_across_sims(
+                start_times, sim_indexes=(1, 2), max_match_dist=max_match_dist
+            )
+
+            # Compare with an exhaustive search over all ordered pairings.
+            longer = start_times.loc[1].to_numpy(dtype="datetime64[ns]")
+            shorter = start_times.loc[2].to_numpy(dtype="datetime64[ns]")
+            best_objective = None
+            for longer_indexes in itertools.combinations(range(num_longer), num_shorter):
+                delta = (shorter - longer[list(longer_indexes)]) / np.timedelta64(1, "s")
+                objective = (
+                    -np.sum(np.abs(delta) < max_match_dist),
+                    np.max(np.abs(delta)),
+                    np.mean(delta**2),
+                )
+                if best_objective is None or objective < best_objective:
+                    best_objective = objective
+                    best_delta = delta[np.abs(delta) < max_match_dist]
+
+            assert np.allclose(matched_visits["delta"], best_delta)
+
     def test_compute_matched_visit_delta_statistics(self):
         matched_visit_stats = schedview.compute.multisim.compute_matched_visit_delta_statistics(self.visits)
         assert set(matched_visit_stats.index.names) == {
@@ -162,6 +271,23 @@ class TestMultisim(unittest.TestCase):
             "max",
         )
 
+    def test_compute_matched_visit_delta_statistics_values(self):
+        visit_spec_columns = ("fieldRA", "fieldDec", "band", "visitExposureTime")
+        matched_visit_stats = schedview.compute.multisim.compute_matched_visit_delta_statistics(
+            self.visits, visit_spec_columns=visit_spec_columns
+        )
+        for (*field_spec, sim_index), stats in matched_visit_stats.iterrows():
+            these_visits = self.visits.set_index(list(visit_spec_columns)).loc[tuple(field_spec)]
+            matched_visits = schedview.compute.multisim.match_visits_across_sims(
+                these_visits.set_index("sim_index").start_timestamp, (1, sim_index)
+            )
+            assert np.allclose(stats, matched_visits["delta"].describe(), equal_nan=True)
+
+        parallel_matched_visit_stats = schedview.compute.multisim.compute_matched_visit_delta_statistics(
+            self.visits, visit_spec_columns=visit_spec_columns, max_workers=2
+        )
+        pd.testing.assert_frame_equal(matched_visit_stats, parallel_matched_visit_stats)
+
     def test_generate_sim_indicators(self):
         sim_labels = ["hen", "ducks", "geese", "oysters"]
         indicators = schedview.plot.multisim.generate_sim_indicators(sim_labels)
@@ -179,3 +305,33 @@ class TestMultisim(unittest.TestCase):
             self.visits, "fieldDec", np.arange(-90, 90, 1), 0.1
         )
         self.assertIsInstance(fig, bokeh.models.layouts.LayoutDOM)
+
+
+class TestSyntheticMultisim(unittest.TestCase):
+
+    def test_make_synthetic_multisim_visits(self):
+        num_sims, num_visits = 3, 40
+        visits = schedview.testing.multisim.make_synthetic_multisim_visits(
+            num_sims=num_sims, num_visits=num_visits, dither=0.001
+        )
+        assert len(visits) == num_sims * num_visits
+        assert set(visits.sim_index) == set(range(1, num_sims + 1))
+        assert visits.groupby("sim_index")["start_timestamp"].is_monotonic_increasing.all()
+
+        # The same seed should give the same visits.
+        pd.testing.assert_frame_equal(
+            visits,
+            schedview.testing.multisim.make_synthetic_multisim_visits(
+                num_sims=num_sims, num_visits=num_visits, dither=0.001
+            ),
+        )
+
+    def test_measure_multisim_scaling(self):
+        scales = (1, 2)
+        measurements, exponents = schedview.testing.multisim.measure_multisim_scaling(
+            scales=scales, base_num_visits=10, num_sims=3
+        )
+        functions = schedview.testing.multisim.MULTISIM_SCALING_FUNCTIONS
+        assert len(measurements) == len(scales) * len(functions)
+        assert list(exponents.index) == list(functions)
+        assert np.all(np.isfinite(exponents.to_numpy()))
@@ -0,0 +1,94 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import numpy as np
+import pandas as pd
+
+from schedview.sharedcache import clear_shared_cache, get_shared_array, get_shared_dataframe
+
+
+class TestSharedCache(unittest.TestCase):
+    def setUp(self):
+        clear_shared_cache()
+
+    def tearDown(self):
+        clear_shared_cache()
+
+    def test_get_shared_array(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return np.arange(10.0)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            arrays = list(executor.map(lambda _: get_shared_array("test_array", compute), range(20)))
+
+        assert len(calls) == 1
+        assert all(array is arrays[0] for array in arrays)
+        assert not arrays[0].flags.writeable
+        np.testing.assert_array_equal(arrays[0], np.arange(10.0))
+
+    def test_shared_array_directory(self):
+        with TemporaryDirectory() as temp_dir:
+            array = get_shared_array("test_array", lambda: np.arange(10.0), temp_dir)
+            assert isinstance(array, np.memmap)
+            assert Path(temp_dir).joinpath("test_array.npy").exists()
+
+            # Another process would load the saved array rather than
+            # computing it.
+            clear_shared_cache()
+            loaded_array = get_shared_array("test_array", lambda: np.zeros(10), temp_dir)
+            np.testing.assert_array_equal(loaded_array, array)
+            del array, loaded_array
+
+    def test_get_shared_dataframe(self):
+        df = pd.DataFrame(
+            {"name": ["Sirius", None, "Vega"], "mag": [-1.46, 2.0, 0.03], "hr": [2491, 1, 7001]}
+        )
+        with TemporaryDirectory() as temp_dir:
+            shared_df = get_shared_dataframe("test_df", lambda: df, temp_dir)
+            pd.testing.assert_frame_equal(shared_df, df)
+
+            # Changes to the returned copy do not change the shared table.
+            shared_df.loc[0, "mag"] = 99.0
+            pd.testing.assert_frame_equal(get_shared_dataframe("test_df", lambda: df, temp_dir), df)
+            del shared_df
+            clear_shared_cache()
+
+    def test_shared_dataframe_cached(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return pd.DataFrame({"mag": [-1.46, 0.03]})
+
+        first_df = get_shared_dataframe("test_df", compute)
+        first_df.loc[0, "mag"] = 99.0
+        second_df = get_shared_dataframe("test_df", compute)
+        assert len(calls) == 1
+        assert second_df is not first_df
+        assert second_df.loc[0, "mag"] == -1.46
+
+    def test_shared_dataframe_column_types(self):
+        df = pd.DataFrame(
+            {
+                "time": pd.to_datetime(["2025-01-01T00:00:00", None, "2025-01-02T12:00:00"]),
+                "duration": pd.to_timedelta([1, 2, None], unit="s"),
+                "flag": [True, False, True],
+            }
+        )
+        with TemporaryDirectory() as temp_dir:
+            pd.testing.assert_frame_equal(get_shared_dataframe("test_df", lambda: df, temp_dir), df)
+            clear_shared_cache()
+
+        # Columns that cannot be saved faithfully are rejected, rather than
+        # converted to strings.
+        for column in (
+            pd.to_datetime(["2025-01-01T00:00:00"]).tz_localize("UTC"),
+            pd.Series([[1, 2]]),
+        ):
+            with self.assertRaises(ValueError):
+                get_shared_dataframe("test_bad_df", lambda: pd.DataFrame({"column": column}))
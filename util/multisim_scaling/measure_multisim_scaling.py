@@ -0,0 +1,51 @@
+import argparse
+
+from schedview.testing.multisim import measure_multisim_scaling
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure how the time and memory used by schedview multisim functions scale."
+    )
+    parser.add_argument(
+        "--scales",
+        type=int,
+        nargs="+",
+        default=[1, 10, 100],
+        help="Factors by which to multiply the base number of visits.",
+    )
+    parser.add_argument(
+        "--base_num_visits",
+        type=int,
+        default=20,
+        help="The number of visits in each simulation at a scale of 1.",
+    )
+    parser.add_argument(
+        "--num_sims",
+        type=int,
+        default=5,
+        help="The number of simulations.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=6563,
+        help="The random number generator seed.",
+    )
+    args = parser.parse_args()
+
+    measurements, exponents = measure_multisim_scaling(
+        scales=tuple(args.scales),
+        base_num_visits=args.base_num_visits,
+        num_sims=args.num_sims,
+        seed=args.seed,
+    )
+
+    print(measurements.to_string(index=False))
+    print()
+    print("Scaling exponents (slope of log(resource) vs. log(number of visits)):")
+    print(exponents.to_string())
+
+
+if __name__ == "__main__":
+    main()